@@ -45,20 +45,58 @@ EOF
 touch "$SKILLS_DIR/$NOM_SKILL/locale/en-us.vocab"
 touch "$SKILLS_DIR/$NOM_SKILL/locale/fr-fr.vocab"
 
-# Créer le fichier __init__.py du skill
+# Créer le fichier __init__.py du skill (latence mesurée via ../../ovos_latency.py, voir ovos_replay.py)
 cat > "$SKILLS_DIR/$NOM_SKILL/__init__.py" << EOF
-from ovos_bus_client.skills.ovos import OVOSSkill
+import os
+import sys
+import subprocess
+
+from ovos_workshop.skills.ovos import OVOSSkill
+
+# Couche de latence partagée (../../ovos_latency.py) ; le skill fonctionne sans elle
+_OVOS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _OVOS_DIR not in sys.path:
+    sys.path.append(_OVOS_DIR)
+try:
+    from ovos_latency import PreforkLauncher, instrument_bus, mark, timed_handler
+except ImportError:
+    PreforkLauncher = None
+
+    def instrument_bus(bus):
+        return False
+
+    def mark(message, stage):
+        pass
+
+    def timed_handler(name, recorder=None):
+        return lambda func: func
+
 
 class ${NOM_SKILL^}Skill(OVOSSkill):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        self.launcher = None
+        super().__init__(*args, **kwargs)
 
     def initialize(self):
-        @self.intent_handler("${NOM_SKILL}.intent")
-        def handle_intent(_):
-            self.log.info("Commande reçue : lancement de $COMMANDE")
-            import subprocess
-            subprocess.Popen(["$COMMANDE"])
+        instrument_bus(self.bus)
+        # settings.json : "command" (défaut $COMMANDE), "launcher": "prefork" pour le lanceur pré-forké
+        if self.settings.get("launcher") == "prefork" and PreforkLauncher is not None:
+            self.launcher = PreforkLauncher()
+        self.register_intent_file("${NOM_SKILL}.intent", self.handle_intent)
+
+    @timed_handler("${NOM_SKILL}.intent")
+    def handle_intent(self, message):
+        command = self.settings.get("command", "$COMMANDE")
+        self.log.info(f"Commande reçue : lancement de {command}")
+        if self.launcher is not None:
+            self.launcher.spawn([command])
+        else:
+            subprocess.Popen([command])
+        mark(message, "spawn")
+
+    def shutdown(self):
+        if self.launcher is not None:
+            self.launcher.close()
 EOF
 
 # Vérifier si config OVOS existe sinon créer config minimale
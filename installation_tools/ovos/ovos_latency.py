@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nom du script : ovos_latency.py
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Target usage : Mesure de la latence intention -> action des skills OVOS (réception sur le bus, entrée du
+               handler, lancement du processus) et lanceur pré-forké pour les skills qui lancent une commande.
+Version : v1.1 - Date : 2025-08-26
+
+Fonctionnalités :
+- instrument_bus(bus) : horodatage de chaque message à sa réception (emitter du client de bus)
+- @timed_handler(nom) : horodatage à l'entrée du handler, trace enregistrée à sa sortie
+- mark(message, "spawn") : horodatage après création du processus, à appeler dans le handler
+- Traces en mémoire (bornées) ; en JSONL uniquement si $OVOS_LATENCY_LOG est défini (non vide), message
+  d'origine inclus : le fichier se rejoue tel quel avec ovos_replay.py --intents
+- PreforkLauncher : petit processus lanceur démarré avec le skill, la commande lui est passée par un pipe
+  (pas de fork du processus OVOS au moment de la commande vocale)
+- python3 ovos_latency.py --summary [FICHIER] : p50/p99 par étape des traces enregistrées
+  (défaut: $OVOS_LATENCY_LOG)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import functools
+import threading
+import subprocess
+from collections import deque
+
+CONTEXT_KEY = "latency_ts"
+STAGES = ("bus", "handler", "spawn")
+SEGMENTS = (("bus", "handler"), ("handler", "spawn"), ("bus", "spawn"))
+MAX_TRACES = 10000
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def summarize(traces):
+    """{"bus>handler": {"n", "p50", "p99"}, ...} en millisecondes, étapes absentes ignorées."""
+    result = {}
+    for start, end in SEGMENTS:
+        values = sorted((t[end] - t[start]) * 1000.0 for t in traces if start in t and end in t)
+        result[f"{start}>{end}"] = {"n": len(values), "p50": round(percentile(values, 50), 3),
+                                    "p99": round(percentile(values, 99), 3)}
+    return result
+
+
+def serialize_message(message):
+    context = {k: v for k, v in (getattr(message, "context", None) or {}).items() if k != CONTEXT_KEY}
+    return {"type": getattr(message, "msg_type", ""), "data": getattr(message, "data", None) or {},
+            "context": context}
+
+
+class LatencyRecorder:
+    """Traces en mémoire (bornées) et, si un chemin est donné, en JSONL."""
+
+    def __init__(self, path=None):
+        self.path = path or None
+        self.lock = threading.Lock()
+        self.traces = deque(maxlen=MAX_TRACES)
+
+    def record(self, name, message):
+        stamps = (getattr(message, "context", None) or {}).get(CONTEXT_KEY, {})
+        trace = {"intent": name, "time": time.time()}
+        trace.update((stage, stamps[stage]) for stage in STAGES if stage in stamps)
+        with self.lock:
+            self.traces.append(trace)
+            if self.path:
+                try:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(dict(trace, message=serialize_message(message)), ensure_ascii=False) + "\n")
+                except OSError:
+                    self.path = None
+        return trace
+
+    def reset(self):
+        with self.lock:
+            self.traces.clear()
+
+    def summary(self):
+        with self.lock:
+            return summarize(list(self.traces))
+
+
+RECORDER = LatencyRecorder(os.environ.get("OVOS_LATENCY_LOG"))
+
+
+def mark(message, stage):
+    """Horodatage (time.monotonic) d'une étape dans le contexte du message."""
+    context = getattr(message, "context", None)
+    if isinstance(context, dict):
+        context.setdefault(CONTEXT_KEY, {})[stage] = time.monotonic()
+
+
+def instrument_bus(bus):
+    """Horodate "bus" à l'émission locale de chaque message reçu, avant la distribution aux handlers."""
+    emitter = getattr(bus, "emitter", None)
+    if emitter is None or getattr(emitter, "_latency_wrapped", False):
+        return False
+    original = emitter.emit
+
+    def emit(event, *args, **kwargs):
+        if args:
+            mark(args[0], "bus")
+        return original(event, *args, **kwargs)
+
+    emitter.emit = emit
+    emitter._latency_wrapped = True
+    return True
+
+
+def timed_handler(name, recorder=None):
+    """Décorateur de handler d'intention (fonction ou méthode, le message est le dernier argument)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            message = args[-1] if args else kwargs.get("message")
+            mark(message, "handler")
+            try:
+                return func(*args, **kwargs)
+            finally:
+                (recorder or RECORDER).record(name, message)
+        return wrapper
+    return decorator
+
+
+class PreforkLauncher:
+    """Processus lanceur démarré à l'initialisation ; spawn() attend l'accusé (processus créé)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--launcher"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+
+    def spawn(self, argv):
+        with self.lock:
+            self.proc.stdin.write(json.dumps(list(argv)) + "\n")
+            self.proc.stdin.flush()
+            reply = self.proc.stdout.readline().split(maxsplit=1)
+        if not reply or reply[0] != "ok":
+            raise OSError(reply[1].strip() if len(reply) > 1 else "lanceur terminé")
+        return int(reply[1])
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+
+
+def launcher_loop():
+    for line in sys.stdin:
+        try:
+            # stdout du lanceur = canal des accusés : jamais hérité par la commande
+            proc = subprocess.Popen(json.loads(line), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                    start_new_session=True)
+            print("ok", proc.pid, flush=True)
+        except (OSError, ValueError) as exc:
+            print("err", exc, flush=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Latence intention -> action des skills OVOS.")
+    parser.add_argument('--summary', nargs='?', const=os.environ.get("OVOS_LATENCY_LOG", ""), metavar='FICHIER',
+                        help='Affiche p50/p99 des traces enregistrées (défaut: $OVOS_LATENCY_LOG).')
+    parser.add_argument('--launcher', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.launcher:
+        launcher_loop()
+        return 0
+    if args.summary is None:
+        print("Rien à faire (voir --help).")
+        return 1
+    if not args.summary:
+        print("[ERREUR] --summary : aucun fichier donné et OVOS_LATENCY_LOG non défini.")
+        return 1
+    traces = {}
+    with open(args.summary, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                trace = json.loads(line)
+                traces.setdefault(trace.get("intent", "?"), []).append(trace)
+    for intent, items in sorted(traces.items()):
+        print(f"{intent} ({len(items)} trace(s))")
+        for segment, stats in summarize(items).items():
+            print(f"  {segment:<16} n={stats['n']:<6} p50={stats['p50']:8.3f} ms  p99={stats['p99']:8.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nom du script : ovos_replay.py
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Target usage : Rejouer des intentions enregistrées sur un bus de messages local vers un skill OVOS (sans
+               ovos-core ni micro) et mesurer la latence bus -> handler -> processus, à froid et à chaud.
+Version : v1.0 - Date : 2025-08-26
+
+Fonctionnalités :
+- FakeBus : imite MessageBusClient (message brut puis message décodé émis sur bus.emitter, handlers
+  exécutés dans un pool de threads), messages sortants du skill conservés
+- Intentions : fichier JSONL (traces de ovos_latency.py ou messages {type, data, context}) ou messages
+  synthétiques ; le type est réécrit vers le skill_id du banc
+- warm : skill chargé une fois, --warmup premiers messages ignorés ; cold : un processus neuf par
+  intention (import + initialisation + premier appel), temps de chargement rapporté
+- --launcher popen|prefork|both (settings "launcher" du skill), --command (défaut: true)
+- Sans ovos_workshop installé : classe de base OVOSSkill minimale du banc (bus, settings, log,
+  register_intent_file, shutdown)
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import logging
+import argparse
+import importlib.util
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import ovos_latency
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SKILL = os.path.join(SCRIPT_DIR, "skills", "ouvrirTerminal")
+DEFAULT_INTENT = "ouvrirTerminal.intent"
+DEFAULT_COUNT = 200
+DEFAULT_COLD = 20
+DEFAULT_WARMUP = 10
+SKILL_ID = "replay.harness"
+
+
+class ReplayMessage:
+    """Message du bus (msg_type, data, context) si ovos_bus_client n'est pas installé."""
+
+    def __init__(self, msg_type, data=None, context=None):
+        self.msg_type = msg_type
+        self.data = data or {}
+        self.context = context or {}
+
+
+class FakeEmitter:
+    def __init__(self, workers=4):
+        self.handlers = defaultdict(list)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def on(self, event, handler):
+        self.handlers[event].append(handler)
+
+    def remove(self, event, handler):
+        if handler in self.handlers.get(event, []):
+            self.handlers[event].remove(handler)
+
+    def emit(self, event, *args):
+        return [self.pool.submit(handler, *args) for handler in list(self.handlers.get(event, ()))]
+
+
+class FakeBus:
+    """Bus local : on_message(raw) suit le chemin de MessageBusClient.on_message."""
+
+    def __init__(self, message_class):
+        self.emitter = FakeEmitter()
+        self.message_class = message_class
+        self.sent = []
+
+    def on(self, msg_type, handler):
+        self.emitter.on(msg_type, handler)
+
+    def once(self, msg_type, handler):
+        self.emitter.on(msg_type, handler)
+
+    def remove(self, msg_type, handler):
+        self.emitter.remove(msg_type, handler)
+
+    def remove_all_listeners(self, msg_type):
+        self.emitter.handlers.pop(msg_type, None)
+
+    def emit(self, message):
+        self.sent.append(message)
+
+    def wait_for_response(self, message, *args, **kwargs):
+        self.sent.append(message)
+        return None
+
+    def on_message(self, raw):
+        """Distribue un message brut et attend la fin de ses handlers."""
+        self.emitter.emit("message", raw)
+        parsed = json.loads(raw)
+        message = self.message_class(parsed["type"], parsed.get("data"), parsed.get("context"))
+        for future in self.emitter.emit(message.msg_type, message):
+            future.result()
+
+    def close(self):
+        self.emitter.pool.shutdown(wait=True)
+
+
+class HarnessSkill:
+    """Base OVOSSkill minimale, utilisée uniquement quand ovos_workshop est absent."""
+
+    def __init__(self, *args, bus=None, skill_id="", settings=None, **kwargs):
+        self.skill_id = skill_id
+        self.settings = dict(settings or {})
+        self.log = logging.getLogger(skill_id or self.__class__.__name__)
+        self.bus = None
+        if bus is not None:
+            self._startup(bus, skill_id)
+
+    def _startup(self, bus, skill_id=""):
+        self.bus = bus
+        self.skill_id = skill_id or self.skill_id
+        self.initialize()
+
+    def initialize(self):
+        pass
+
+    def register_intent_file(self, intent_file, handler):
+        self.bus.on(f"{self.skill_id}:{intent_file}", handler)
+
+    def shutdown(self):
+        pass
+
+
+def message_class():
+    try:
+        from ovos_bus_client.message import Message
+        return Message
+    except ImportError:
+        return ReplayMessage
+
+
+def ensure_skill_base():
+    if "ovos_workshop" in sys.modules or importlib.util.find_spec("ovos_workshop") is not None:
+        return False
+    for name in ("ovos_workshop", "ovos_workshop.skills", "ovos_workshop.skills.ovos"):
+        sys.modules.setdefault(name, types.ModuleType(name))
+    sys.modules["ovos_workshop.skills.ovos"].OVOSSkill = HarnessSkill
+    return True
+
+
+def load_skill(skill_dir, bus, settings):
+    ensure_skill_base()
+    from ovos_workshop.skills.ovos import OVOSSkill
+    name = "replay_" + os.path.basename(os.path.normpath(skill_dir))
+    spec = importlib.util.spec_from_file_location(name, os.path.join(skill_dir, "__init__.py"),
+                                                  submodule_search_locations=[skill_dir])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    classes = [obj for obj in vars(module).values()
+               if isinstance(obj, type) and issubclass(obj, OVOSSkill) and obj is not OVOSSkill]
+    if not classes:
+        raise SystemExit(f"[ERREUR] Aucune classe OVOSSkill dans {skill_dir}")
+    return classes[0](bus=bus, skill_id=SKILL_ID, settings=settings)
+
+
+def load_intents(path, count, intent):
+    """Messages bruts rejoués, type réécrit en <skill_id>:<intention>."""
+    messages = []
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                messages.append(item.get("message", item))
+    else:
+        messages = [{"type": intent, "data": {"utterance": "ouvrir terminal", "lang": "fr-fr"},
+                     "context": {"source": "audio", "destination": ["skills"]}}]
+    raws = []
+    for i in range(count):
+        item = messages[i % len(messages)]
+        raws.append(json.dumps({"type": f"{SKILL_ID}:{item['type'].split(':', 1)[-1]}",
+                                "data": item.get("data", {}), "context": item.get("context", {})}))
+    return raws
+
+
+def run_warm(args, launcher, raws, warmup):
+    """Traces du processus courant (skill chargé une fois) ; temps de chargement en secondes."""
+    start = time.monotonic()
+    bus = FakeBus(message_class())
+    skill = load_skill(args.skill, bus, {"command": args.command, "launcher": launcher})
+    load_s = time.monotonic() - start
+    ovos_latency.RECORDER.reset()
+    try:
+        for raw in raws:
+            bus.on_message(raw)
+    finally:
+        skill.shutdown()
+        bus.close()
+    traces = list(ovos_latency.RECORDER.traces)[warmup:]
+    return traces, load_s
+
+
+def run_cold(args, launcher, raws):
+    traces, loads = [], []
+    for raw in raws:
+        cmd = [sys.executable, os.path.abspath(__file__), "--single", "--skill", args.skill,
+               "--command", args.command, "--launcher", launcher]
+        result = subprocess.run(cmd, input=raw, capture_output=True, text=True, env=dict(os.environ, OVOS_LATENCY_LOG=""))
+        if result.returncode != 0:
+            raise SystemExit(f"[ERREUR] Rejeu à froid : {result.stderr.strip()}")
+        item = json.loads(result.stdout)
+        traces.extend(item["traces"])
+        loads.append(item["load_s"] * 1000.0)
+    return traces, sorted(loads)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rejeu d'intentions OVOS sur un bus local, latences p50/p99.")
+    parser.add_argument('--skill', default=DEFAULT_SKILL, help='Dossier du skill (défaut: skills/ouvrirTerminal).')
+    parser.add_argument('--intents', help='JSONL des intentions enregistrées (défaut: messages synthétiques).')
+    parser.add_argument('--intent', default=DEFAULT_INTENT, help=f'Intention synthétique (défaut: {DEFAULT_INTENT}).')
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT, help=f'Messages à chaud (défaut: {DEFAULT_COUNT}).')
+    parser.add_argument('--cold', type=int, default=DEFAULT_COLD, help=f'Processus à froid, 0 = aucun (défaut: {DEFAULT_COLD}).')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help=f'Messages ignorés à chaud (défaut: {DEFAULT_WARMUP}).')
+    parser.add_argument('--launcher', choices=["popen", "prefork", "both"], default="both",
+                        help='Lancement de la commande par le skill (défaut: both).')
+    parser.add_argument('--command', default="true", help='Commande lancée par le skill (défaut: true).')
+    parser.add_argument('--json', action='store_true', help='Résultats en JSON.')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.single:
+        raw = sys.stdin.read().strip()
+        traces, load_s = run_warm(args, args.launcher, [raw], 0)
+        print(json.dumps({"traces": traces, "load_s": load_s}))
+        return 0
+
+    os.environ["OVOS_LATENCY_LOG"] = ""
+    ovos_latency.RECORDER.path = None
+    if ensure_skill_base():
+        print("ℹ️ ovos_workshop absent : classe de base OVOSSkill minimale du banc.", file=sys.stderr)
+    launchers = ["popen", "prefork"] if args.launcher == "both" else [args.launcher]
+    results = []
+    for launcher in launchers:
+        if args.count > 0:
+            raws = load_intents(args.intents, args.count + args.warmup, args.intent)
+            traces, load_s = run_warm(args, launcher, raws, args.warmup)
+            results.append({"mode": "warm", "launcher": launcher, "load_ms": {"p50": round(load_s * 1000.0, 3)},
+                            "latency": ovos_latency.summarize(traces)})
+        if args.cold > 0:
+            raws = load_intents(args.intents, args.cold, args.intent)
+            traces, loads = run_cold(args, launcher, raws)
+            results.append({"mode": "cold", "launcher": launcher,
+                            "load_ms": {"p50": round(ovos_latency.percentile(loads, 50), 3),
+                                        "p99": round(ovos_latency.percentile(loads, 99), 3)},
+                            "latency": ovos_latency.summarize(traces)})
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+    if not results:
+        return 0
+    print(f"{'Mode':<5} {'Lanceur':<8} {'n':>5}  {'chargement':>10}  "
+          + "  ".join(f"{segment + ' p50/p99 (ms)':>28}" for segment in results[0]["latency"]))
+    for item in results:
+        latency = item["latency"]
+        n = max(stats["n"] for stats in latency.values())
+        print(f"{item['mode']:<5} {item['launcher']:<8} {n:>5}  {item['load_ms']['p50']:>8.1f}ms  "
+              + "  ".join(f"{stats['p50']:>13.3f} / {stats['p99']:<12.3f}" for stats in latency.values()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
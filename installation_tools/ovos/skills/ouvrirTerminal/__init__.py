@@ -1,12 +1,50 @@
-from ovos_bus_client.skills.ovos import OVOSSkill
+import os
+import sys
+import subprocess
+
+from ovos_workshop.skills.ovos import OVOSSkill
+
+# Couche de latence partagée (../../ovos_latency.py) ; le skill fonctionne sans elle
+_OVOS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _OVOS_DIR not in sys.path:
+    sys.path.append(_OVOS_DIR)
+try:
+    from ovos_latency import PreforkLauncher, instrument_bus, mark, timed_handler
+except ImportError:
+    PreforkLauncher = None
+
+    def instrument_bus(bus):
+        return False
+
+    def mark(message, stage):
+        pass
+
+    def timed_handler(name, recorder=None):
+        return lambda func: func
+
 
 class OuvrirTerminalSkill(OVOSSkill):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        self.launcher = None
+        super().__init__(*args, **kwargs)
 
     def initialize(self):
-        @self.intent_handler("ouvrirTerminal.intent")
-        def handle_intent(_):
-            self.log.info("Commande reçue : lancement de gnome-terminal")
-            import subprocess
-            subprocess.Popen(["gnome-terminal"])
+        instrument_bus(self.bus)
+        # settings.json : "command" (défaut gnome-terminal), "launcher": "prefork" pour le lanceur pré-forké
+        if self.settings.get("launcher") == "prefork" and PreforkLauncher is not None:
+            self.launcher = PreforkLauncher()
+        self.register_intent_file("ouvrirTerminal.intent", self.handle_intent)
+
+    @timed_handler("ouvrirTerminal.intent")
+    def handle_intent(self, message):
+        command = self.settings.get("command", "gnome-terminal")
+        self.log.info(f"Commande reçue : lancement de {command}")
+        if self.launcher is not None:
+            self.launcher.spawn([command])
+        else:
+            subprocess.Popen([command])
+        mark(message, "spawn")
+
+    def shutdown(self):
+        if self.launcher is not None:
+            self.launcher.close()
@@ -8,7 +8,7 @@
 # Email           : bruno.delnoz@protonmail.com
 # Target usage    : Parcours récursif d'un dossier source, compression
 #                   maximale/forte des vidéos en conservant l'arborescence.
-# Version         : v2.6 - Date : 2025-08-23
+# Version         : v2.11 - Date : 2025-08-26
 # ---------------------------------------------------------------------
 # Changelog (historique complet obligatoire) :
 #   - v2.3 (2025-08-11) : Version précédente avec estimation temps/tailles
@@ -20,16 +20,46 @@
 #   - v2.5 (2025-08-23) : Ajout profil target_MAX : Compression extrême
 #                         * H.265 360p CRF 35, bitrate 200k, audio 24k mono
 #   - v2.6 (2025-08-23) : Ajout option --custom_ffmpeg_filter pour filtres personnalisés
+#   - v2.7 (2025-08-24) : Ajout option --jobs N : encodages ffmpeg en parallèle
+#                         * cœurs répartis entre jobs (threads/job = nproc / jobs si --threads auto)
+#                         * log ffmpeg par job, une ligne de synthèse par job dans le log principal
+#                         * encodage vers fichier .part puis renommage (--resume fiable)
+#                         * débit global affiché en Mo/s et fichiers/heure
+#   - v2.8 (2025-08-24) : Estimations apprises de l'historique des encodages :
+#                         * history.compress_videos.tsv : une ligne par fichier compressé
+#                           (paramètres, extension, tailles entrée/sortie, durée)
+#                         * prédiction taille/temps par fichier (paramètres exacts puis
+#                           codec+preset, heuristique si moins de 3 échantillons)
+#                         * --order input|sjf|savings : ordre de traitement
+#                         * ETA recalibré après chaque fichier
+#   - v2.9 (2025-08-25) : Index des médias partagé avec transcribe_mp4.sh (../media_index.py) :
+#                         * empreinte partielle du contenu, taille, durée ; rescan incrémental
+#                         * fichier renommé/déplacé déjà compressé avec les mêmes paramètres : ignoré
+#                         * doublon d'un contenu déjà compressé : sortie existante liée (ln/cp)
+#                         * doublons dans la même passe : encodé une fois, lié ensuite
+#                         * --no_index pour désactiver
+#   - v2.10 (2025-08-26) : Index des médias consulté seulement avec --resume ou --use_index
+#                         (sans option, les fichiers déjà indexés sont de nouveau compressés) ;
+#                         les sorties restent enregistrées dans l'index ; pas de pause pour les
+#                         fichiers ignorés via l'index
+#   - v2.11 (2025-08-26) : --jobs : dossier temporaire des jobs supprimé à la sortie (trap EXIT),
+#                         log ffmpeg des jobs en échec recopié dans le log principal ;
+#                         -x265-params pools uniquement en mode parallèle (--jobs > 1) ;
+#                         sorties réutilisées via l'index listées avant la confirmation, liées après
+#                         (rien n'est créé si la réponse est N), comptées dans le récapitulatif
 # =====================================================================
 set -euo pipefail
 IFS=$'\n\t'
 # --------------------------- Métadonnées ------------------------------
 SCRIPT_NAME="$(basename "$0")"
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
-VERSION="v2.6"
-DATE="2025-08-23"
+VERSION="v2.11"
+DATE="2025-08-26"
 LOGFILE="$SCRIPT_DIR/log.${SCRIPT_NAME%.sh}.${VERSION}.log"
 BACKUP_BASE_DIR="$SCRIPT_DIR/backup_$(date +%Y%m%d_%H%M%S)"
+HISTORY_FILE="$SCRIPT_DIR/history.${SCRIPT_NAME%.sh}.tsv"
+HISTORY_MIN_SAMPLES=3         # Échantillons minimum pour utiliser l'historique
+MEDIA_INDEX_PY="${MEDIA_INDEX_PY:-$SCRIPT_DIR/../media_index.py}"   # Index partagé (base : $MEDIA_INDEX_DB)
 # ---------------------------------------------------------------------
 # --------------------------- Valeurs par défaut (target_compressed_max) -----------------------
 DEFAULT_CRF=28
@@ -54,6 +84,8 @@ DEFAULT_SIZE_MIN="1M"         # Taille minimale des fichiers à traiter
 DEFAULT_SIZE_MAX=""           # Pas de limite maximale par défaut
 DEFAULT_RETRY_COUNT=2         # Nombre de tentatives en cas d'échec ffmpeg
 DEFAULT_PROFILE_NAME="target_compressed_max" # Profil par défaut
+DEFAULT_JOBS=1                # Nombre d'encodages ffmpeg simultanés
+DEFAULT_ORDER="input"         # Ordre de traitement : input, sjf, savings
 # ---------------------------------------------------------------------
 # --------------------------- Variables runtime ------------------------
 CRF_VALUE=""
@@ -79,11 +111,16 @@ SIZE_MIN=""
 SIZE_MAX=""
 RETRY_COUNT=""
 PROFILE_NAME=""
+JOBS=""            # Encodages simultanés (--jobs)
+JOBS_DIR=""        # Dossier temporaire des logs/résultats par job
+ORDER=""           # Ordre de traitement (--order)
 EXEC_FLAG=0
 SIMULATE_FLAG=0
 DELETE_ONLY=0
 SKIP_IDENTICAL=0
 RESUME_MODE=0
+USE_INDEX=1
+INDEX_LOOKUP=0     # Consultation de l'index (--resume ou --use_index)
 PROCESSED_FILES=()   # fichiers créés
 ACTION_LOGS=()       # actions réalisées
 FILES_TO_PROCESS=()
@@ -91,6 +128,12 @@ SKIPPED_FILES=()     # fichiers ignorés
 FAILED_FILES=()      # fichiers ayant échoué
 declare -A SIZE_BEFORE
 declare -A SIZE_AFTER
+declare -A TIME_EST      # Temps d'encodage prédit par fichier (s)
+declare -A HIST_RATIO    # Modèle historique : "niveau:ext" -> ratio sortie/entrée
+declare -A HIST_SPB      # Modèle historique : "niveau:ext" -> secondes par octet d'entrée
+declare -A HIST_N        # Modèle historique : "niveau:ext" -> nombre d'échantillons
+declare -A INDEX_REUSE=()   # Index : fichier source -> sortie existante d'un contenu identique
+declare -A INDEX_DUP_OF=()  # Index : fichier source -> premier fichier identique de la même passe
 # ---------------------------------------------------------------------
 # --------------------------- Profils prédéfinis -----------------------
 apply_profile() {
@@ -164,7 +207,8 @@ apply_profile() {
 # ---------------------------------------------------------------------
 # --------------------------- HELP (obligatoire) -----------------------
 show_help() {
-cat <<'EOF'
+# Nom du log construit comme LOGFILE (suit la version)
+sed "s|__LOGFILE__|${LOGFILE##*/}|" <<'EOF'
 Usage : ./compress_videos.sh --exec [options]
       ./compress_videos.sh --simulate [options]
       ./compress_videos.sh --delete [--source_dir <chemin>] [--outdir <chemin>]
@@ -175,6 +219,9 @@ Options principales :
  --delete               Supprime tout le dossier de sortie (backup préalable)
  --resume               Reprend un traitement interrompu (ignore fichiers déjà traités)
  --skip_identical       Ignore les fichiers déjà présents dans le dossier de sortie
+ --use_index            Consulte l'index des médias (media_index.py) : fichiers renommés, déplacés
+                        ou en double déjà compressés ignorés ou liés (implicite avec --resume)
+ --no_index             N'utilise pas l'index des médias : ni consultation, ni enregistrement
  --source_dir <chemin>  Dossier source contenant les vidéos (défaut: dossier courant)
  --outdir <dossier>     Dossier de sortie (défaut: parent(source)/compressed)
  --formats "<liste>"    Extensions à traiter (ex: "mp4 mov avi") (si vide -> détection / fallback)
@@ -200,6 +247,12 @@ Options vidéo avancées (remplacent profil si spécifiées) :
  --tune <tune>          Tune ffmpeg (défaut profil: psnr/zerolatency)
  --threads <count>      Nombre de threads (défaut: 0=auto)
  --retry <count>        Nombre de tentatives en cas d'échec (défaut: 2)
+ --jobs <N>             Encodages ffmpeg simultanés (défaut: 1). Si --threads est auto,
+                        chaque job reçoit nproc/N threads.
+ --order <mode>         Ordre de traitement (défaut: input) :
+   input                Ordre du parcours du dossier source
+   sjf                  Plus courts d'abord (temps prédit croissant)
+   savings              Plus gros gains d'abord (octets économisés prédits décroissants)
  --custom_ffmpeg_filter "<filtre>" Filtre vidéo personnalisé (ex: "mpdecimate=hi=64*12:lo=64*5:frac=0.05,setpts=N/FRAME_RATE/TB")
 Options audio avancées (remplacent profil si spécifiées) :
  --audio <codec>        Codec audio (défaut profil: aac)
@@ -217,6 +270,8 @@ Exemples :
  ./compress_videos.sh --exec --quality 20 --width 1920 --height 1080 --abitrate 128k
  # Simulation avec profil compression extrême
  ./compress_videos.sh --simulate --profile target_MAX
+ # Compression parallèle : 4 encodages simultanés, cœurs répartis entre les jobs
+ ./compress_videos.sh --exec --profile target_whisper --jobs 4 --resume --source_dir /mnt/videos
  # Utilisation d'un filtre personnalisé pour supprimer les frames dupliquées
  ./compress_videos.sh --exec --profile target_whisper --custom_ffmpeg_filter "mpdecimate=hi=64*12:lo=64*5:frac=0.05,setpts=N/FRAME_RATE/TB" --source_dir /mnt/videos
 Profils détaillés :
@@ -224,7 +279,10 @@ Profils détaillés :
  target_compressed_max : H.265 Main10 854×480 24fps ~500k + AAC stéréo 32k (bon compromis)
  target_MAX           : H.265 Main10 640×360 15fps ~150k + AAC mono 24k@22kHz (EXTRÊME)
  custom               : Paramètres manuels ou défauts target_compressed_max
-Logs détaillés : log.compress_videos.v2.6.log
+Logs détaillés : __LOGFILE__
+Historique des encodages (estimations) : history.compress_videos.tsv
+Index des médias (partagé avec transcribe_mp4.sh) : ../media_index.py, base $MEDIA_INDEX_DB
+                  ou ~/.local/share/media_index/media_index.db ("media_index.py stats" pour un résumé)
 Backup avant suppression : backup_YYYYMMDD_HHMMSS
 ATTENTION : Le profil target_MAX produit une qualité vidéo très dégradée mais une taille
            de fichier minimale. Réservé aux cas où l'espace disque est critique.
@@ -234,7 +292,7 @@ EOF
 # --------------------------- Pré-requis --------------------------------
 check_prerequisites() {
  local miss=0
- for cmd in ffmpeg find mkdir cp date awk sed stat numfmt basename dirname printf du; do
+ for cmd in ffmpeg find mkdir cp date awk sed stat numfmt basename dirname printf du nproc mktemp; do
    if ! command -v "${cmd%% *}" >/dev/null 2>&1 ; then
      echo "[ERREUR] commande requise manquante : $cmd" | tee -a "$LOGFILE"
      miss=1
@@ -337,17 +395,19 @@ build_find_expr() {
  done
  find_expr+=( ')' -print0 )
 }
-# Vérification si fichier de sortie existe déjà
-output_file_exists() {
+# Chemin du fichier de sortie correspondant à un fichier source
+output_path_for() {
  local infile="$1"
  local SOURCE_ABS="$2"
  local OUTDIR_ABS="$3"
  local relpath="${infile#$SOURCE_ABS/}"
  local dirpath="$(dirname "$relpath")"
- local target_dir="$OUTDIR_ABS/$dirpath"
  local base_name="$(basename "${infile%.*}")"
- local OUTPUT_FILE="$target_dir/${base_name}_mini.mp4"
- [ -f "$OUTPUT_FILE" ]
+ echo "$OUTDIR_ABS/$dirpath/${base_name}_mini.mp4"
+}
+# Vérification si fichier de sortie existe déjà
+output_file_exists() {
+ [ -f "$(output_path_for "$1" "$2" "$3")" ]
 }
 # Récupération fichiers dans FILES_TO_PROCESS (gestion espaces + filtres)
 gather_files() {
@@ -368,6 +428,78 @@ gather_files() {
    fi
    FILES_TO_PROCESS+=("$file")
  done < <(find "$SOURCE_ABS" "${find_expr[@]}")
+ if [ "$USE_INDEX" -eq 1 ] && { [ "$INDEX_LOOKUP" -eq 1 ] || [ "$RESUME_MODE" -eq 1 ]; }; then
+   index_classify_files "$SOURCE_ABS" "$OUTDIR_ABS"
+ fi
+}
+# Paramètres qui déterminent le contenu de la sortie (clé des sorties dans l'index)
+index_params_key() {
+ local filter_sig="none"
+ if [ -n "$CUSTOM_FFMPEG_FILTER" ]; then
+   filter_sig="$(printf '%s' "$CUSTOM_FFMPEG_FILTER" | cksum | awk '{print $1}')"
+ fi
+ printf '%s|%s|%s|%s|%s|%sx%s|%s|%s|%s|%s|%s|%s|%s|%s' "$VIDEO_CODEC" "$PROFILE" "$PIX_FMT" "$CRF_VALUE" "$PRESET" \
+        "$MAX_WIDTH" "$MAX_HEIGHT" "$VBITRATE" "$FPS" "${TUNE:-none}" "$AUDIO_CODEC" "$AUDIO_BITRATE" "$SAMPLE_RATE" "$AC" "$filter_sig"
+}
+# Consultation de l'index pour tous les fichiers retenus, en un seul appel :
+# contenu déjà compressé avec les mêmes paramètres -> ignoré (sortie présente) ou sortie réutilisée,
+# doublon d'un fichier de la même passe -> lié après l'encodage du premier
+index_classify_files() {
+ local SOURCE_ABS="$1"
+ local OUTDIR_ABS="$2"
+ if ! command -v python3 >/dev/null 2>&1 || [ ! -f "$MEDIA_INDEX_PY" ] || [ ${#FILES_TO_PROCESS[@]} -eq 0 ]; then
+   [ ${#FILES_TO_PROCESS[@]} -eq 0 ] || echo "[INFO] Index des médias indisponible (python3 ou $MEDIA_INDEX_PY absent)" | tee -a "$LOGFILE"
+   return 0
+ fi
+ local index_start=$(date +%s)
+ local kept=() path status ref
+ declare -A status_of=() ref_of=()
+ while IFS=$'\t' read -r path status ref _; do
+   status_of["$path"]="$status"
+   ref_of["$path"]="$ref"
+ done < <(printf '%s\0' "${FILES_TO_PROCESS[@]}" | python3 "$MEDIA_INDEX_PY" find --pipeline compress --params "$(index_params_key)" --stdin0 2>>"$LOGFILE")
+ for file in "${FILES_TO_PROCESS[@]}"; do
+   case "${status_of["$file"]:-new}" in
+     found)
+       if output_file_exists "$file" "$SOURCE_ABS" "$OUTDIR_ABS"; then
+         SKIPPED_FILES+=("$file (déjà traité, index)")
+       else
+         INDEX_REUSE["$file"]="${ref_of["$file"]}"
+       fi
+       ;;
+     batchdup) INDEX_DUP_OF["$file"]="${ref_of["$file"]}" ;;
+     *) kept+=("$file") ;;
+   esac
+ done
+ FILES_TO_PROCESS=("${kept[@]}")
+ echo "[INFO] Index des médias : ${#INDEX_REUSE[@]} sortie(s) réutilisable(s), ${#INDEX_DUP_OF[@]} doublon(s) dans la passe ($(( $(date +%s) - index_start ))s)" | tee -a "$LOGFILE"
+}
+# Enregistrement d'une sortie produite dans l'index
+index_record() {
+ [ "$USE_INDEX" -eq 1 ] && [ -f "$MEDIA_INDEX_PY" ] || return 0
+ python3 "$MEDIA_INDEX_PY" record --pipeline compress --params "$(index_params_key)" "$1" "$2" 2>>"$LOGFILE" \
+   || echo "[WARN] Enregistrement dans l'index impossible : $1" | tee -a "$LOGFILE"
+}
+# Création de la sortie d'un fichier à partir d'une sortie existante d'un contenu identique
+link_existing_output() {
+ local infile="$1"
+ local existing="$2"
+ local output_file="$(output_path_for "$infile" "$SOURCE_ABS" "$OUTDIR_ABS")"
+ if [ "$SIMULATE_FLAG" -eq 1 ]; then
+   echo "[SIMULATION] Réutilisation : $infile -> $output_file (depuis $existing)" | tee -a "$LOGFILE"
+   return 0
+ fi
+ if [ ! -f "$existing" ]; then
+   echo "[ÉCHEC] Sortie à réutiliser absente : $existing (pour $infile)" | tee -a "$LOGFILE"
+   FAILED_FILES+=("$infile")
+   return 1
+ fi
+ mkdir -p "$(dirname "$output_file")"
+ ln -f "$existing" "$output_file" 2>/dev/null || cp -f "$existing" "$output_file"
+ index_record "$infile" "$output_file"
+ PROCESSED_FILES+=("$output_file")
+ ACTION_LOGS+=("[index] Réutilisé: $infile -> $output_file (contenu identique à $existing)")
+ echo "[OK] Réutilisé (contenu identique) : $infile -> $output_file" | tee -a "$LOGFILE"
 }
 human_size() {
  if command -v numfmt >/dev/null 2>&1; then
@@ -485,10 +617,110 @@ format_time() {
    printf "%ds" "$seconds"
  fi
 }
+# Signature des paramètres d'encodage influant taille/temps (clé de l'historique)
+params_key() {
+ local filter_sig="none"
+ if [ -n "$CUSTOM_FFMPEG_FILTER" ]; then
+   filter_sig="$(printf '%s' "$CUSTOM_FFMPEG_FILTER" | cksum | awk '{print $1}')"
+ fi
+ printf '%s|%s|%s|%sx%s|%s|%s|%s|%s|t%s' "$VIDEO_CODEC" "$CRF_VALUE" "$PRESET" "$MAX_WIDTH" "$MAX_HEIGHT" \
+        "$VBITRATE" "$FPS" "$AUDIO_BITRATE" "$filter_sig" "$THREADS"
+}
+file_ext() {
+ local name="${1##*/}"
+ [[ "$name" == *.* ]] || { echo "-"; return; }
+ name="${name##*.}"
+ echo "${name,,}"
+}
+# Chargement du modèle : agrégats par extension (et "*") pour les paramètres exacts
+# ("exact") et pour le même codec+preset ("coarse"), en une passe awk sur l'historique
+load_history_model() {
+ HIST_RATIO=()
+ HIST_SPB=()
+ HIST_N=()
+ [ -f "$HISTORY_FILE" ] || return 0
+ local level ext ratio spb n
+ while IFS=$'\t' read -r level ext ratio spb n; do
+   HIST_RATIO["$level:$ext"]="$ratio"
+   HIST_SPB["$level:$ext"]="$spb"
+   HIST_N["$level:$ext"]="$n"
+ done < <(awk -F'\t' -v k="$(params_key)" -v c="$VIDEO_CODEC|$PRESET" '
+   $5 <= 0 { next }
+   {
+     if ($2 == k) lv = "exact"; else if ($3 == c) lv = "coarse"; else next
+     split(lv "," $4 "|" lv ",*", keys, "|")
+     for (j in keys) { ib[keys[j]] += $5; ob[keys[j]] += $6; sec[keys[j]] += $7; n[keys[j]]++ }
+   }
+   END {
+     for (x in n) { split(x, p, ","); printf "%s\t%s\t%.6f\t%.12f\t%d\n", p[1], p[2], ob[x]/ib[x], sec[x]/ib[x], n[x] }
+   }' "$HISTORY_FILE")
+}
+# Prédiction taille de sortie et temps pour un fichier -> PRED_SIZE, PRED_TIME, PRED_SRC
+predict_file() {
+ local f="$1"
+ local size="$2"
+ local ext
+ ext="$(file_ext "$f")"
+ local k
+ for k in "exact:$ext" "exact:*" "coarse:$ext" "coarse:*"; do
+   if [ "${HIST_N[$k]:-0}" -ge "$HISTORY_MIN_SAMPLES" ]; then
+     read -r PRED_SIZE PRED_TIME < <(awk -v s="$size" -v r="${HIST_RATIO[$k]}" -v t="${HIST_SPB[$k]}" \
+                                      'BEGIN{printf("%.0f\t%.0f\n", s*r, s*t)}')
+     PRED_SRC="historique $k (n=${HIST_N[$k]})"
+     return 0
+   fi
+ done
+ PRED_SIZE=$(awk -v s="$size" -v r="$HEURISTIC_RATIO" 'BEGIN{printf("%.0f", s*r)}')
+ PRED_TIME=$(estimate_processing_time "$size" "$VIDEO_CODEC" "$PRESET" "$MAX_WIDTH" "$MAX_HEIGHT")
+ PRED_SRC="heuristique (ratio $HEURISTIC_RATIO)"
+}
+# Ajout d'un encodage réussi à l'historique
+append_history() {
+ local infile="$1"
+ local in_bytes="$2"
+ local out_bytes="$3"
+ local seconds="$4"
+ printf '%s\t%s\t%s\t%s\t%s\t%s\t%s\n' "$(date +%Y-%m-%dT%H:%M:%S)" "$(params_key)" "$VIDEO_CODEC|$PRESET" \
+        "$(file_ext "$infile")" "$in_bytes" "$out_bytes" "$seconds" >> "$HISTORY_FILE"
+}
+# Réordonne FILES_TO_PROCESS selon --order à partir des prédictions
+order_files() {
+ [ "$ORDER" = "input" ] && return 0
+ local idx key sorted=()
+ local sort_opts=(-t $'\t' -k1,1g)
+ [ "$ORDER" = "savings" ] && sort_opts=(-t $'\t' -k1,1gr)
+ while IFS= read -r idx; do
+   sorted+=("${FILES_TO_PROCESS[$idx]}")
+ done < <(
+   for idx in "${!FILES_TO_PROCESS[@]}"; do
+     f="${FILES_TO_PROCESS[$idx]}"
+     if [ "$ORDER" = "sjf" ]; then
+       key="${TIME_EST[$f]}"
+     else
+       key=$(( ${SIZE_BEFORE[$f]} - ${SIZE_AFTER[$f]} ))
+     fi
+     printf '%s\t%d\n' "$key" "$idx"
+   done | sort -s "${sort_opts[@]}" | cut -f2
+ )
+ FILES_TO_PROCESS=("${sorted[@]}")
+ echo "[INFO] Ordre de traitement : $ORDER" | tee -a "$LOGFILE"
+}
+# ETA recalibré : temps prédit restant x (réel / prédit) sur les fichiers déjà terminés
+print_eta() {
+ local done_pred="$1"
+ local remaining_pred="$2"
+ local elapsed="$3"
+ local eta
+ eta=$(awk -v d="$done_pred" -v r="$remaining_pred" -v e="$elapsed" -v j="$JOBS" \
+       'BEGIN{c = (d > 0 && e > 0) ? e/d*j : 1; printf("%.0f", r*c/j)}')
+ echo "[ETA] Restant estimé : $(format_time "$eta") (calibration sur ${elapsed}s réels)" | tee -a "$LOGFILE"
+}
 # Fonction de compression avec retry automatique
 compress_with_retry() {
  local infile="$1"
  local output_file="$2"
+ # Encodage vers .part puis renommage : un fichier interrompu n'est jamais pris pour traité
+ local part_file="${output_file%.mp4}.part.mp4"
  local attempt=1
  local success=0
  while [ "$attempt" -le "$RETRY_COUNT" ] && [ "$success" -eq 0 ]; do
@@ -500,6 +732,12 @@ compress_with_retry() {
    # Paramètres de threading
    if [ -n "$THREADS" ] && [ "$THREADS" != "0" ]; then
      ffmpeg_cmd+=(-threads "$THREADS")
+     # x265 ignore -threads pour son pool de travail : le limiter aussi quand les jobs se partagent les cœurs
+     if [ "$JOBS" -gt 1 ]; then
+       case "$VIDEO_CODEC" in
+         libx265|x265|hevc) ffmpeg_cmd+=(-x265-params "pools=$THREADS") ;;
+       esac
+     fi
    fi
    # Filtres vidéo
    VF_FILTER="scale=${MAX_WIDTH}:${MAX_HEIGHT}"
@@ -529,24 +767,81 @@ compress_with_retry() {
      -ar "$SAMPLE_RATE"
      -ac "$AC"
      -movflags +faststart
-     "$output_file"
+     "$part_file"
    )
    if "${ffmpeg_cmd[@]}" 2>&1 | tee -a "$LOGFILE"; then
-     if [ -f "$output_file" ] && [ -s "$output_file" ]; then
+     if [ -f "$part_file" ] && [ -s "$part_file" ]; then
+       mv -f "$part_file" "$output_file"
        success=1
        echo "[OK] Compression réussie (tentative $attempt)" | tee -a "$LOGFILE"
      else
        echo "[ERREUR] Fichier de sortie vide ou inexistant (tentative $attempt)" | tee -a "$LOGFILE"
-       rm -f "$output_file" 2>/dev/null || true
+       rm -f "$part_file" 2>/dev/null || true
      fi
    else
      echo "[ERREUR] Échec ffmpeg (tentative $attempt)" | tee -a "$LOGFILE"
-     rm -f "$output_file" 2>/dev/null || true
+     rm -f "$part_file" 2>/dev/null || true
    fi
    attempt=$((attempt + 1))
  done
  return $((success == 0))
 }
+# Job de compression exécuté en arrière-plan (mode --jobs) : sortie ffmpeg dans un log
+# dédié, résultat dans $JOBS_DIR/job_N.result, une seule ligne dans le log principal
+run_compress_job() {
+ local index="$1"
+ local infile="$2"
+ local output_file="$3"
+ local job_log="$JOBS_DIR/job_${index}.log"
+ local start_ts end_ts elapsed status out_size
+ start_ts=$(date +%s.%N)
+ if ( LOGFILE="$job_log"; compress_with_retry "$infile" "$output_file" ) >/dev/null 2>&1; then
+   status="OK"
+ else
+   status="ECHEC"
+ fi
+ end_ts=$(date +%s.%N)
+ elapsed=$(awk -v a="$start_ts" -v b="$end_ts" 'BEGIN{printf("%.1f", b-a)}')
+ out_size=$(stat -c%s "$output_file" 2>/dev/null || echo 0)
+ printf '%s\t%s\t%s\n' "$status" "$out_size" "$elapsed" > "$JOBS_DIR/job_${index}.result"
+ echo "[JOB $index] $status $(basename "$infile") -> $(basename "$output_file") ($(human_size "$out_size"), ${elapsed}s)" | tee -a "$LOGFILE"
+}
+# Somme des temps prédits des jobs déjà terminés (mode --jobs)
+jobs_done_pred() {
+ local sum=0 r idx
+ for r in "$JOBS_DIR"/job_*.result; do
+   [ -e "$r" ] || continue
+   idx="${r##*/job_}"
+   idx="${idx%.result}"
+   sum=$((sum + ${TIME_EST["${FILES_TO_PROCESS[$((idx - 1))]}"]}))
+ done
+ echo "$sum"
+}
+# Enregistrement du résultat d'un fichier (commun aux modes séquentiel et --jobs)
+record_result() {
+ local index="$1"
+ local infile="$2"
+ local output_file="$3"
+ local ok="$4"
+ local elapsed="${5:-0}"
+ if [ "$ok" -eq 1 ]; then
+   out_size=$(stat -c%s "$output_file" 2>/dev/null || echo 0)
+   SIZE_AFTER["$infile"]="$out_size"
+   before_size=${SIZE_BEFORE["$infile"]:=$(stat -c%s "$infile" 2>/dev/null || echo 0)}
+   append_history "$infile" "$before_size" "$out_size" "$elapsed"
+   index_record "$infile" "$output_file"
+   total_after_real=$((total_after_real + out_size))
+   total_in_done=$((total_in_done + before_size))
+   success_count=$((success_count + 1))
+   PROCESSED_FILES+=("$output_file")
+   ACTION_LOGS+=("[$index] Compressé: $infile -> $output_file")
+   echo "[OK] Taille avant: $(human_size "$before_size")  après: $(human_size "$out_size")" | tee -a "$LOGFILE"
+ else
+   echo "[ÉCHEC] Impossible de compresser : $infile" | tee -a "$LOGFILE"
+   FAILED_FILES+=("$infile")
+   ACTION_LOGS+=("[$index] ÉCHEC: $infile")
+ fi
+}
 
 # ---------------------------------------------------------------------
 # --------------------------- Traitement principal ----------------------
@@ -566,10 +861,16 @@ process_files() {
    echo "=== Fichiers ignorés (${#SKIPPED_FILES[@]}) ===" | tee -a "$LOGFILE"
    for skipped in "${SKIPPED_FILES[@]}"; do
      echo "  - $skipped" | tee -a "$LOGFILE"
-     sleep 3
+     case "$skipped" in *", index)") ;; *) sleep 3 ;; esac
    done
  fi
- if [ ${#FILES_TO_PROCESS[@]} -eq 0 ]; then
+ if [ ${#INDEX_REUSE[@]} -gt 0 ]; then
+   echo "=== Sorties réutilisables via l'index (${#INDEX_REUSE[@]}) ===" | tee -a "$LOGFILE"
+   for reuse in "${!INDEX_REUSE[@]}"; do
+     echo "  - $reuse <- ${INDEX_REUSE["$reuse"]}" | tee -a "$LOGFILE"
+   done
+ fi
+ if [ ${#FILES_TO_PROCESS[@]} -eq 0 ] && [ ${#INDEX_REUSE[@]} -eq 0 ]; then
    echo "[INFO] Aucun fichier à traiter." | tee -a "$LOGFILE"
    exit 0
  fi
@@ -577,18 +878,28 @@ process_files() {
  total_before=0
  total_after_est=0
  total_time_est=0
- ratio=$(estimate_ratio "$VIDEO_CODEC" "$CRF_VALUE" "$VBITRATE")
+ HEURISTIC_RATIO=$(estimate_ratio "$VIDEO_CODEC" "$CRF_VALUE" "$VBITRATE")
+ load_history_model
+ declare -A PRED_SOURCES=()
  for f in "${FILES_TO_PROCESS[@]}"; do
    size=$(stat -c%s "$f" 2>/dev/null || echo 0)
    SIZE_BEFORE["$f"]="$size"
-   estimated_size=$(awk -v s="$size" -v r="$ratio" 'BEGIN{printf("%.0f", s*r)}')
-   SIZE_AFTER["$f"]="$estimated_size"
+   # Prédiction taille/temps (historique si disponible, sinon heuristique)
+   predict_file "$f" "$size"
+   SIZE_AFTER["$f"]="$PRED_SIZE"
+   TIME_EST["$f"]="$PRED_TIME"
+   PRED_SOURCES["$PRED_SRC"]=$(( ${PRED_SOURCES["$PRED_SRC"]:-0} + 1 ))
    total_before=$((total_before + size))
-   total_after_est=$((total_after_est + estimated_size))
-   # Estimation temps de traitement pour ce fichier
-   file_time=$(estimate_processing_time "$size" "$VIDEO_CODEC" "$PRESET" "$MAX_WIDTH" "$MAX_HEIGHT")
-   total_time_est=$((total_time_est + file_time))
+   total_after_est=$((total_after_est + PRED_SIZE))
+   total_time_est=$((total_time_est + PRED_TIME))
  done
+ # En parallèle, le temps mural est divisé par le nombre de jobs
+ total_time_est=$((total_time_est / JOBS))
+ ratio=$(awk -v b="$total_before" -v a="$total_after_est" 'BEGIN{printf("%.2f", b > 0 ? a/b : 0)}')
+ for src in "${!PRED_SOURCES[@]}"; do
+   echo "[INFO] Estimation ${PRED_SOURCES[$src]} fichier(s) : $src" | tee -a "$LOGFILE"
+ done
+ order_files
  # Affichage liste numérotée avec tailles
  echo ""
  i=1
@@ -606,6 +917,7 @@ process_files() {
  printf "=== RÉCAPITULATIF ===\n" | tee -a "$LOGFILE"
  printf "Taille totale avant : %s\n" "$(human_size "$total_before")" | tee -a "$LOGFILE"
  printf "Taille estimée après : %s (ratio %s)\n" "$(human_size "$total_after_est")" "$ratio" | tee -a "$LOGFILE"
+ total_gain="0.0"
  if [ "$total_before" -gt 0 ]; then
    total_gain=$(awk -v b="$total_before" -v a="$total_after_est" 'BEGIN{printf("%.1f", (b-a)/b*100)}')
    printf "Réduction estimée : %s%% (gain ~%s)\n" "$total_gain" "$(human_size $((total_before - total_after_est)))" | tee -a "$LOGFILE"
@@ -622,37 +934,68 @@ process_files() {
    printf "Temps estimé: %s, Compression estimée: %s → %s (%s%% de réduction)\n" \
           "$(format_time "$total_time_est")" "$(human_size "$total_before")" "$(human_size "$total_after_est")" "$total_gain" | tee -a "$LOGFILE"
  fi
+ if [ ${#INDEX_REUSE[@]} -gt 0 ]; then
+   printf "Sorties réutilisées via l'index (lien ou copie) : %d\n" "${#INDEX_REUSE[@]}" | tee -a "$LOGFILE"
+ fi
  read -r -p "(o/N) : " confirm
  [[ "$confirm" =~ ^[oOyY]$ ]] || { echo "[INFO] Annulé."; exit 0; }
  # Traitement des fichiers
  INDEX=1
  total_after_real=0
+ total_in_done=0
  success_count=0
  FAILED_FILES=()
+ OUTPUT_FILES=()
+ run_start=$(date +%s)
+ done_pred=0
+ remaining_pred=0
+ for f in "${FILES_TO_PROCESS[@]}"; do
+   remaining_pred=$((remaining_pred + ${TIME_EST["$f"]}))
+ done
+ # Sorties existantes de l'index : liées une fois la confirmation donnée
+ reused_count=0
+ for reuse in "${!INDEX_REUSE[@]}"; do
+   if link_existing_output "$reuse" "${INDEX_REUSE["$reuse"]}"; then
+     reused_count=$((reused_count + 1))
+   fi
+ done
+ if [ "$SIMULATE_FLAG" -eq 0 ] && [ "$JOBS" -gt 1 ]; then
+   JOBS_DIR="$(mktemp -d "${TMPDIR:-/tmp}/compress_videos_jobs.XXXXXX")"
+   trap 'rm -rf "$JOBS_DIR"' EXIT
+   echo "[INFO] Mode parallèle : $JOBS jobs, ${THREADS} thread(s) par job, logs ffmpeg des échecs recopiés dans $LOGFILE" | tee -a "$LOGFILE"
+ fi
  for infile in "${FILES_TO_PROCESS[@]}"; do
    relpath="${infile#$SOURCE_ABS/}"
    dirpath="$(dirname "$relpath")"
    target_dir="$OUTDIR_ABS/$dirpath"
    base_name="$(basename "${infile%.*}")"
    OUTPUT_FILE="$target_dir/${base_name}_mini.mp4"
-   if [ "$SIMULATE_FLAG" -eq 0 ]; then
+   OUTPUT_FILES+=("$OUTPUT_FILE")
+   if [ "$SIMULATE_FLAG" -eq 0 ] && [ "$JOBS" -gt 1 ]; then
+     # Mode parallèle : on attend une place libre puis on lance le job en arrière-plan
+     mkdir -p "$target_dir"
+     while [ "$(jobs -rp | wc -l)" -ge "$JOBS" ]; do
+       wait -n || true
+     done
+     # Jobs terminés : leur temps prédit sert à recalibrer l'ETA
+     if [ "$INDEX" -gt "$JOBS" ]; then
+       print_eta "$(jobs_done_pred)" "$((remaining_pred - $(jobs_done_pred)))" "$(( $(date +%s) - run_start ))"
+     fi
+     echo "[$INDEX] Lancement job : $infile -> $OUTPUT_FILE" | tee -a "$LOGFILE"
+     run_compress_job "$INDEX" "$infile" "$OUTPUT_FILE" &
+   elif [ "$SIMULATE_FLAG" -eq 0 ]; then
      # Mode exécution réelle
      _safe_mkdir "$target_dir"
      echo "[$INDEX] Compression : $infile -> $OUTPUT_FILE" | tee -a "$LOGFILE"
+     file_start=$(date +%s)
      if compress_with_retry "$infile" "$OUTPUT_FILE"; then
-       out_size=$(stat -c%s "$OUTPUT_FILE" 2>/dev/null || echo 0)
-       SIZE_AFTER["$infile"]="$out_size"
-       before_size=${SIZE_BEFORE["$infile"]:=$(stat -c%s "$infile" 2>/dev/null || echo 0)}
-       total_after_real=$((total_after_real + out_size))
-       success_count=$((success_count + 1))
-       PROCESSED_FILES+=("$OUTPUT_FILE")
-       ACTION_LOGS+=("[$INDEX] Compressé: $infile -> $OUTPUT_FILE")
-       echo "[OK] Taille avant: $(human_size "$before_size")  après: $(human_size "$out_size")" | tee -a "$LOGFILE"
+       record_result "$INDEX" "$infile" "$OUTPUT_FILE" 1 "$(( $(date +%s) - file_start ))"
      else
-       echo "[ÉCHEC] Impossible de compresser : $infile" | tee -a "$LOGFILE"
-       FAILED_FILES+=("$infile")
-       ACTION_LOGS+=("[$INDEX] ÉCHEC: $infile")
+       record_result "$INDEX" "$infile" "$OUTPUT_FILE" 0
      fi
+     done_pred=$((done_pred + ${TIME_EST["$infile"]}))
+     remaining_pred=$((remaining_pred - ${TIME_EST["$infile"]}))
+     print_eta "$done_pred" "$remaining_pred" "$(( $(date +%s) - run_start ))"
    else
      # Mode simulation
      echo "[$INDEX] Simulation : $infile -> $OUTPUT_FILE" | tee -a "$LOGFILE"
@@ -661,6 +1004,30 @@ process_files() {
    fi
    INDEX=$((INDEX + 1))
  done
+ if [ -n "$JOBS_DIR" ]; then
+   wait || true
+   # Agrégation des résultats dans l'ordre des fichiers
+   for idx in "${!FILES_TO_PROCESS[@]}"; do
+     job_status=""
+     if [ -f "$JOBS_DIR/job_$((idx + 1)).result" ]; then
+       IFS=$'\t' read -r job_status _ job_elapsed < "$JOBS_DIR/job_$((idx + 1)).result"
+     fi
+     if [ "$job_status" = "OK" ]; then
+       record_result "$((idx + 1))" "${FILES_TO_PROCESS[$idx]}" "${OUTPUT_FILES[$idx]}" 1 "$job_elapsed"
+     else
+       if [ -f "$JOBS_DIR/job_$((idx + 1)).log" ]; then
+         echo "[JOB $((idx + 1))] Log ffmpeg :" >> "$LOGFILE"
+         cat "$JOBS_DIR/job_$((idx + 1)).log" >> "$LOGFILE"
+       fi
+       record_result "$((idx + 1))" "${FILES_TO_PROCESS[$idx]}" "${OUTPUT_FILES[$idx]}" 0
+     fi
+   done
+ fi
+ # Doublons de la passe : liés à la sortie du premier fichier identique
+ for dup in "${!INDEX_DUP_OF[@]}"; do
+   link_existing_output "$dup" "$(output_path_for "${INDEX_DUP_OF["$dup"]}" "$SOURCE_ABS" "$OUTDIR_ABS")" || true
+ done
+ run_elapsed=$(( $(date +%s) - run_start ))
  # Affichage tableau final
  echo "" | tee -a "$LOGFILE"
  if [ "$SIMULATE_FLAG" -eq 1 ]; then
@@ -709,6 +1076,15 @@ process_files() {
    fi
    printf "Réduction réelle : %s%%\n" "$total_gain" | tee -a "$LOGFILE"
    printf "Fichiers traités avec succès : %d/%d\n" "$success_count" "${#FILES_TO_PROCESS[@]}" | tee -a "$LOGFILE"
+   if [ ${#INDEX_REUSE[@]} -gt 0 ]; then
+     printf "Sorties réutilisées via l'index : %d/%d\n" "$reused_count" "${#INDEX_REUSE[@]}" | tee -a "$LOGFILE"
+   fi
+   if [ "$run_elapsed" -gt 0 ]; then
+     printf "Débit : %s Mo/s en entrée, %s fichiers/heure (%s, %d job(s))\n" \
+            "$(awk -v b="$total_in_done" -v t="$run_elapsed" 'BEGIN{printf("%.2f", b/1048576/t)}')" \
+            "$(awk -v n="$success_count" -v t="$run_elapsed" 'BEGIN{printf("%.1f", n*3600/t)}')" \
+            "$(format_time "$run_elapsed")" "$JOBS" | tee -a "$LOGFILE"
+   fi
    if [ ${#FAILED_FILES[@]} -gt 0 ]; then
      echo "" | tee -a "$LOGFILE"
      echo "=== Fichiers ayant échoué ===" | tee -a "$LOGFILE"
@@ -744,6 +1120,8 @@ while [ $# -gt 0 ]; do
    --delete) DELETE_ONLY=1; shift ;;
    --resume) RESUME_MODE=1; shift ;;
    --skip_identical) SKIP_IDENTICAL=1; shift ;;
+   --use_index) INDEX_LOOKUP=1; shift ;;
+   --no_index) USE_INDEX=0; shift ;;
    --source_dir) SOURCE_DIR="$2"; shift 2 ;;
    --profile) PROFILE_NAME="$2"; shift 2 ;;
    --quality|--crf) CRF_VALUE="$2"; PROFILE_NAME="custom"; shift 2 ;;
@@ -752,6 +1130,8 @@ while [ $# -gt 0 ]; do
    --smin) SIZE_MIN="$2"; shift 2 ;;
    --smax) SIZE_MAX="$2"; shift 2 ;;
    --retry) RETRY_COUNT="$2"; shift 2 ;;
+   --jobs) JOBS="$2"; shift 2 ;;
+   --order) ORDER="$2"; shift 2 ;;
    --threads) THREADS="$2"; PROFILE_NAME="custom"; shift 2 ;;
    --tune) TUNE="$2"; PROFILE_NAME="custom"; shift 2 ;;
    --ac) AC="$2"; PROFILE_NAME="custom"; shift 2 ;;
@@ -794,6 +1174,21 @@ apply_profile "$PROFILE_NAME"
 : "${THREADS:=$DEFAULT_THREADS}"
 : "${SIZE_MIN:=$DEFAULT_SIZE_MIN}"
 : "${RETRY_COUNT:=$DEFAULT_RETRY_COUNT}"
+: "${JOBS:=$DEFAULT_JOBS}"
+: "${ORDER:=$DEFAULT_ORDER}"
+case "$ORDER" in
+ input|sjf|savings) ;;
+ *) echo "[ERREUR] --order doit valoir input, sjf ou savings : $ORDER" | tee -a "$LOGFILE"; exit 1 ;;
+esac
+if ! [[ "$JOBS" =~ ^[1-9][0-9]*$ ]]; then
+ echo "[ERREUR] --jobs doit être un entier >= 1 : $JOBS" | tee -a "$LOGFILE"
+ exit 1
+fi
+# Répartition des cœurs : en mode parallèle, threads auto = cœurs / jobs
+if [ "$JOBS" -gt 1 ] && [ "$THREADS" = "0" ]; then
+ THREADS=$(( $(nproc) / JOBS ))
+ [ "$THREADS" -lt 1 ] && THREADS=1
+fi
 : "${OUTDIR:=$(cd "$SOURCE_DIR" && cd .. >/dev/null 2>&1 && pwd)/$DEFAULT_OUTDIR_NAME}"
 echo "[INFO] Paramètres utilisés (profil $PROFILE_NAME) :" | tee -a "$LOGFILE"
 echo "       SOURCE_DIR   = $SOURCE_DIR" | tee -a "$LOGFILE"
@@ -815,10 +1210,13 @@ echo "       CANAUX_AUDIO = $AC" | tee -a "$LOGFILE"
 echo "       SIZE_MIN     = $SIZE_MIN" | tee -a "$LOGFILE"
 echo "       SIZE_MAX     = ${SIZE_MAX:-(aucune limite)}" | tee -a "$LOGFILE"
 echo "       RETRY_COUNT  = $RETRY_COUNT" | tee -a "$LOGFILE"
+echo "       JOBS         = $JOBS" | tee -a "$LOGFILE"
+echo "       ORDER        = $ORDER" | tee -a "$LOGFILE"
 echo "       FORMATS      = ${FORMATS[*]:-(auto)}" | tee -a "$LOGFILE"
 echo "       CUSTOM_FFMPEG_FILTER = ${CUSTOM_FFMPEG_FILTER:-(aucun)}" | tee -a "$LOGFILE"
 echo "       SKIP_IDENTICAL = $SKIP_IDENTICAL" | tee -a "$LOGFILE"
 echo "       RESUME_MODE  = $RESUME_MODE" | tee -a "$LOGFILE"
+echo "       USE_INDEX    = $USE_INDEX" | tee -a "$LOGFILE"
 echo "       MODE         = $([ "$SIMULATE_FLAG" -eq 1 ] && echo "SIMULATION" || echo "EXECUTION")" | tee -a "$LOGFILE"
 if [ "${DELETE_ONLY:-0}" = 1 ]; then
  delete_created_files
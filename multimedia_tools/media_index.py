@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Nom du script : media_index.py
+Target usage : Index persistant des médias par empreinte de contenu, partagé par compress_videos.sh
+               et transcribe_mp4.sh pour ne pas recompresser ni retranscrire un contenu déjà traité.
+Version : v1.0 - Date : 2025-08-25
+
+Modèle (SQLite, --db ou $MEDIA_INDEX_DB, défaut ~/.local/share/media_index/media_index.db) :
+- files    : chemin -> taille, mtime, empreinte partielle (phash)
+- contents : phash -> taille, durée (ffprobe), empreinte audio chromaprint (fpcalc, calculée à la demande)
+- outputs  : phash + pipeline + paramètres -> fichiers produits (source d'origine, date)
+Un fichier renommé, déplacé ou copié à l'identique garde le même phash et retrouve donc ses sorties.
+
+Empreinte partielle : SHA-1 de la taille et de 3 blocs de 1 Mio (début, milieu, fin).
+Rescan incrémental : seuls les fichiers dont taille ou mtime ont changé sont relus.
+
+Commandes :
+  scan DIR...                 Indexe/rafraîchit les médias des dossiers, oublie les fichiers disparus
+  find --pipeline P --params K [--fuzzy] FICHIER... | --stdin0
+                              Une ligne TSV par fichier : chemin, statut, références
+                                found    <sorties existantes du même contenu>
+                                similar  <sorties d'un contenu à l'audio quasi identique> (--fuzzy)
+                                batchdup <premier fichier identique de la même liste>
+                                new | missing
+  record --pipeline P --params K [--fingerprint] SOURCE SORTIE...
+                              Enregistre les sorties produites pour le contenu de SOURCE
+  stats                       Résumé de l'index (fichiers, contenus, doublons, sorties par pipeline)
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_DB = os.environ.get("MEDIA_INDEX_DB", os.path.expanduser("~/.local/share/media_index/media_index.db"))
+DEFAULT_JOBS = 4
+HASH_BLOCK = 1024 * 1024
+FINGERPRINT_LENGTH = 120          # Secondes d'audio utilisées par fpcalc
+FINGERPRINT_MIN_SIMILARITY = 0.90
+FINGERPRINT_MAX_OFFSET = 8        # Décalage max (trames chromaprint, ~1s) testé à l'alignement
+DURATION_TOLERANCE = 0.02         # Écart relatif de durée toléré pour un candidat --fuzzy
+MEDIA_EXTENSIONS = {"mp4", "avi", "mkv", "mov", "wmv", "flv", "webm", "m4v", "3gp", "ogv", "ts", "mts",
+                    "m2ts", "mpg", "mpeg", "wav", "mp3", "m4a", "flac", "ogg", "opus", "aac"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime REAL, phash TEXT, indexed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS files_phash ON files(phash);
+CREATE TABLE IF NOT EXISTS contents (
+    phash TEXT PRIMARY KEY, size INTEGER, duration REAL, fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    phash TEXT, pipeline TEXT, params TEXT, source TEXT, output TEXT, created_at TEXT,
+    PRIMARY KEY (phash, pipeline, params, output)
+);
+"""
+
+
+def now():
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def open_db(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60)  # Attente des écritures concurrentes (--jobs)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Empreintes
+# ---------------------------------------------------------------------------
+
+def partial_hash(path, size):
+    h = hashlib.sha1(str(size).encode())
+    with open(path, 'rb') as f:
+        for offset in sorted({0, max(0, size // 2 - HASH_BLOCK // 2), max(0, size - HASH_BLOCK)}):
+            f.seek(offset)
+            h.update(f.read(HASH_BLOCK))
+    return h.hexdigest()
+
+
+def probe_duration(path):
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1", path]
+    try:
+        return float(subprocess.run(cmd, capture_output=True, text=True, check=False).stdout.strip())
+    except (OSError, ValueError):
+        return None
+
+
+def audio_fingerprint(path):
+    """Empreinte chromaprint brute (entiers séparés par des virgules), "" si indisponible."""
+    try:
+        out = subprocess.run(["fpcalc", "-raw", "-length", str(FINGERPRINT_LENGTH), path],
+                             capture_output=True, text=True, check=False).stdout
+    except OSError:
+        return ""
+    for line in out.splitlines():
+        if line.startswith("FINGERPRINT="):
+            return line.split("=", 1)[1].strip()
+    return ""
+
+
+def fingerprint_similarity(a, b):
+    """1 - taux de bits différents au meilleur alignement (±FINGERPRINT_MAX_OFFSET trames)."""
+    fa = [int(x) & 0xFFFFFFFF for x in a.split(",") if x]
+    fb = [int(x) & 0xFFFFFFFF for x in b.split(",") if x]
+    best = 0.0
+    for offset in range(-FINGERPRINT_MAX_OFFSET, FINGERPRINT_MAX_OFFSET + 1):
+        pairs = list(zip(fa[max(0, offset):], fb[max(0, -offset):]))
+        if len(pairs) < 16:
+            continue
+        diff = sum(bin(x ^ y).count("1") for x, y in pairs)
+        best = max(best, 1.0 - diff / (32.0 * len(pairs)))
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Rafraîchissement incrémental
+# ---------------------------------------------------------------------------
+
+def describe(path, st, phash, with_fingerprint):
+    """Calculs coûteux hors transaction (exécutés en parallèle)."""
+    if phash is None:
+        phash = partial_hash(path, st.st_size)
+        duration = probe_duration(path)
+    else:
+        duration = None
+    fingerprint = audio_fingerprint(path) if with_fingerprint else None
+    return path, st, phash, duration, fingerprint
+
+
+def refresh(conn, paths, jobs=DEFAULT_JOBS, with_fingerprint=False):
+    """Met l'index à jour pour ces chemins et retourne ({chemin absolu: phash}, nb relus).
+
+    Un fichier n'est relu que si sa taille ou sa mtime a changé ; avec with_fingerprint, l'empreinte
+    audio manquante d'un contenu est calculée une fois puis conservée."""
+    known = {}
+    todo = []
+    for p in paths:
+        ap = os.path.abspath(p)
+        try:
+            st = os.stat(ap)
+        except OSError:
+            continue
+        row = conn.execute("SELECT size, mtime, phash FROM files WHERE path = ?", (ap,)).fetchone()
+        phash = row["phash"] if row and row["size"] == st.st_size and row["mtime"] == st.st_mtime else None
+        need_fp = False
+        if phash and with_fingerprint:
+            c = conn.execute("SELECT fingerprint FROM contents WHERE phash = ?", (phash,)).fetchone()
+            need_fp = c is None or c["fingerprint"] is None
+        if phash and not need_fp:
+            known[ap] = phash
+        else:
+            todo.append((ap, st, phash, with_fingerprint and (phash is None or need_fp)))
+
+    rehashed = 0
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            results = list(pool.map(lambda t: describe(*t), todo))
+        for (ap, st, old_phash, _), (_, _, phash, duration, fingerprint) in zip(todo, results):
+            if old_phash is None:
+                rehashed += 1
+                conn.execute("INSERT OR REPLACE INTO files (path, size, mtime, phash, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                             (ap, st.st_size, st.st_mtime, phash, now()))
+                conn.execute("INSERT OR IGNORE INTO contents (phash, size, duration) VALUES (?, ?, ?)",
+                             (phash, st.st_size, duration))
+            if fingerprint is not None:
+                conn.execute("UPDATE contents SET fingerprint = ? WHERE phash = ?", (fingerprint, phash))
+            known[ap] = phash
+        conn.commit()
+    return known, rehashed
+
+
+def iter_media(dirs, extensions):
+    for d in dirs:
+        for root, _, names in os.walk(d):
+            for name in names:
+                if name.rsplit(".", 1)[-1].lower() in extensions:
+                    yield os.path.join(root, name)
+
+
+# ---------------------------------------------------------------------------
+# Sorties
+# ---------------------------------------------------------------------------
+
+def existing_outputs(conn, phash, pipeline, params):
+    """Sorties encore présentes sur disque du dernier traitement complet de ce contenu."""
+    groups = {}
+    order = []
+    for r in conn.execute("SELECT source, output FROM outputs WHERE phash = ? AND pipeline = ? AND params = ? "
+                          "ORDER BY created_at DESC", (phash, pipeline, params)):
+        if r["source"] not in groups:
+            groups[r["source"]] = []
+            order.append(r["source"])
+        groups[r["source"]].append(r["output"])
+    for source in order:
+        if all(os.path.exists(o) for o in groups[source]):
+            return groups[source]
+    return []
+
+
+def similar_outputs(conn, phash, pipeline, params):
+    """Sorties d'un autre contenu de même durée dont l'empreinte audio est quasi identique."""
+    me = conn.execute("SELECT duration, fingerprint FROM contents WHERE phash = ?", (phash,)).fetchone()
+    if not me or not me["fingerprint"] or not me["duration"]:
+        return []
+    tolerance = max(1.0, me["duration"] * DURATION_TOLERANCE)
+    candidates = conn.execute(
+        "SELECT c.phash, c.fingerprint FROM contents c WHERE c.phash != ? AND c.fingerprint != '' "
+        "AND ABS(c.duration - ?) <= ? AND EXISTS (SELECT 1 FROM outputs o WHERE o.phash = c.phash "
+        "AND o.pipeline = ? AND o.params = ?)", (phash, me["duration"], tolerance, pipeline, params)).fetchall()
+    scored = sorted(((fingerprint_similarity(me["fingerprint"], c["fingerprint"]), c["phash"]) for c in candidates),
+                    reverse=True)
+    for score, other in scored:
+        if score < FINGERPRINT_MIN_SIMILARITY:
+            break
+        outputs = existing_outputs(conn, other, pipeline, params)
+        if outputs:
+            return outputs
+    return []
+
+
+# ---------------------------------------------------------------------------
+# Commandes
+# ---------------------------------------------------------------------------
+
+def cmd_scan(conn, args):
+    start = time.monotonic()
+    extensions = {e.strip().lower().lstrip(".") for e in args.ext.split(",")} if args.ext else MEDIA_EXTENSIONS
+    dirs = [os.path.abspath(d) for d in args.dirs]
+    paths = list(iter_media(dirs, extensions))
+    known, rehashed = refresh(conn, paths, args.jobs, args.fingerprint)
+    removed = 0
+    for d in dirs:
+        prefix = d.rstrip(os.sep) + os.sep
+        for r in conn.execute("SELECT path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)).fetchall():
+            if not os.path.exists(r["path"]):
+                conn.execute("DELETE FROM files WHERE path = ?", (r["path"],))
+                removed += 1
+    conn.commit()
+    print(f"Index : {len(known)} fichier(s), {rehashed} relu(s), {len(known) - rehashed} inchangé(s), "
+          f"{removed} disparu(s) retiré(s) en {time.monotonic() - start:.2f}s")
+
+
+def cmd_find(conn, args):
+    if args.stdin0:
+        paths = [p for p in sys.stdin.buffer.read().decode("utf-8", errors="surrogateescape").split("\0") if p]
+    else:
+        paths = args.files
+    known, _ = refresh(conn, paths, args.jobs, args.fuzzy)
+    first_seen = {}
+    for p in paths:
+        ap = os.path.abspath(p)
+        phash = known.get(ap)
+        if phash is None:
+            fields = ["missing"]
+        else:
+            outputs = existing_outputs(conn, phash, args.pipeline, args.params)
+            if outputs:
+                fields = ["found"] + outputs
+            elif args.fuzzy and (outputs := similar_outputs(conn, phash, args.pipeline, args.params)):
+                fields = ["similar"] + outputs
+            elif phash in first_seen:
+                fields = ["batchdup", first_seen[phash]]
+            else:
+                first_seen[phash] = p
+                fields = ["new"]
+        print("\t".join([p] + fields))
+
+
+def cmd_record(conn, args):
+    known, _ = refresh(conn, [args.source], args.jobs, args.fingerprint)
+    phash = known.get(os.path.abspath(args.source))
+    if phash is None:
+        print(f"Source introuvable : {args.source}", file=sys.stderr)
+        sys.exit(1)
+    created = now()
+    for output in args.outputs:
+        conn.execute("INSERT OR REPLACE INTO outputs (phash, pipeline, params, source, output, created_at) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", (phash, args.pipeline, args.params, os.path.abspath(args.source),
+                                                   os.path.abspath(output), created))
+    conn.commit()
+
+
+def cmd_stats(conn, args):
+    files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+    contents = conn.execute("SELECT COUNT(DISTINCT phash) FROM files").fetchone()[0]
+    fingerprinted = conn.execute("SELECT COUNT(*) FROM contents WHERE fingerprint != ''").fetchone()[0]
+    dup = conn.execute("SELECT COUNT(*), COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) n FROM files "
+                       "GROUP BY phash HAVING n > 1)").fetchone()
+    print(f"Base : {args.db}")
+    print(f"Fichiers indexés : {files} ({contents} contenu(s) distinct(s), {fingerprinted} empreinte(s) audio)")
+    print(f"Doublons : {dup[1]} fichier(s) en trop dans {dup[0]} groupe(s)")
+    for r in conn.execute("SELECT pipeline, params, COUNT(DISTINCT phash) n FROM outputs GROUP BY pipeline, params "
+                          "ORDER BY pipeline, n DESC"):
+        print(f"Sorties {r['pipeline']} [{r['params']}] : {r['n']} contenu(s)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Index des médias par empreinte de contenu (compression, transcription).")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'Base SQLite (défaut: {DEFAULT_DB}).')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help=f'Fichiers relus en parallèle (défaut: {DEFAULT_JOBS}).')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('scan', help='Indexe les médias des dossiers (incrémental).')
+    p.add_argument('dirs', nargs='+')
+    p.add_argument('--ext', help='Extensions à indexer, séparées par des virgules (défaut: vidéo + audio courants).')
+    p.add_argument('--fingerprint', action='store_true', help='Calcule aussi les empreintes audio manquantes (fpcalc).')
+
+    p = sub.add_parser('find', help='Cherche des sorties déjà produites pour ces fichiers.')
+    p.add_argument('--pipeline', required=True)
+    p.add_argument('--params', required=True)
+    p.add_argument('--fuzzy', action='store_true', help='Accepte un contenu différent à l\'audio quasi identique (fpcalc).')
+    p.add_argument('--stdin0', action='store_true', help='Lit les chemins séparés par NUL sur stdin.')
+    p.add_argument('files', nargs='*')
+
+    p = sub.add_parser('record', help='Enregistre les sorties produites pour une source.')
+    p.add_argument('--pipeline', required=True)
+    p.add_argument('--params', required=True)
+    p.add_argument('--fingerprint', action='store_true', help='Calcule l\'empreinte audio de la source pour les --fuzzy futurs.')
+    p.add_argument('source')
+    p.add_argument('outputs', nargs='+')
+
+    sub.add_parser('stats', help='Résumé de l\'index.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    conn = open_db(args.db)
+    try:
+        {"scan": cmd_scan, "find": cmd_find, "record": cmd_record, "stats": cmd_stats}[args.command](conn, args)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 # Nom du script : mp4_to_images_per_second.sh
 # Auteur : Bruno DELNOZ
 # Email : bruno.delnoz@protonmail.com
-# Version : v3.1.5 - Date : 2025-08-21
+# Version : v3.2.1 - Date : 2025-08-26
 # Changelog :
 # v1.0 - Création script initial
 # v2.0 - Ajout --exec, --remove
@@ -10,12 +10,15 @@
 # v3.0 - Ajout --fps
 # v3.1.4 - Correction chemin avec espaces
 # v3.1.5 - Ajout --start et --stop pour découpe temporelle, conformité v41
+# v3.2.0 - Extraction parallèle : plage découpée en segments alignés sur les images clés (--jobs),
+#          suppression des images quasi identiques (dHash, --dedup <seuil>), manifeste des images gardées
+# v3.2.1 - Threads de décodage par segment = nproc / segments (au moins 1) au lieu de 1
 
 SCRIPT_NAME=$(basename "$0")
-LOG_FILE="./log.${SCRIPT_NAME}.v3.1.5.log"
+LOG_FILE="./log.${SCRIPT_NAME}.v3.2.1.log"
 
 function help_msg() {
-    echo "Usage: $SCRIPT_NAME --exec|--remove [--target <répertoire_destination>] [--fps <n>] [--start <seconds>] [--stop <seconds>] <fichier_mp4>"
+    echo "Usage: $SCRIPT_NAME --exec|--remove [--target <répertoire_destination>] [--fps <n>] [--start <seconds>] [--stop <seconds>] [--jobs <n>] [--dedup <seuil>] <fichier_mp4>"
     echo ""
     echo "Options:"
     echo "  --exec               Exécute l'extraction d'images"
@@ -24,12 +27,107 @@ function help_msg() {
     echo "  --fps <n>            Nombre d'images par seconde (par défaut 1)"
     echo "  --start <seconds>    Début de l'extraction (en secondes ou HH:MM:SS)"
     echo "  --stop <seconds>     Fin de l'extraction (en secondes ou HH:MM:SS)"
+    echo "  --jobs <n>           Segments décodés en parallèle (par défaut : nombre de cœurs)"
+    echo "  --dedup <seuil>      Écart max (bits sur 64, dHash) pour considérer une image identique"
+    echo "                       à la dernière gardée ; elle est alors supprimée (par défaut 4, -1 = garder tout)"
     echo "  --help               Affiche ce message"
     echo ""
     echo "Exemples :"
     echo "  $SCRIPT_NAME --exec /mnt/videos/video.mp4"
     echo "  $SCRIPT_NAME --exec --target /mnt/images --fps 5 --start 0 --stop 120 /mnt/videos/video.mp4"
+    echo "  $SCRIPT_NAME --exec --jobs 8 --dedup 6 /mnt/videos/capture_ecran.mp4"
     echo "  $SCRIPT_NAME --remove --target /mnt/images"
+    echo ""
+    echo "Les images gardées conservent leur numéro d'échantillon (<fichier>.<n>.jpg, n-1 = secondes x fps"
+    echo "depuis --start) ; le manifeste <fichier>.manifest.tsv liste image, horodatage (s) et dHash."
+}
+
+# Conversion HH:MM:SS, MM:SS ou secondes en secondes
+function to_seconds() {
+    echo "$1" | awk -F: '{ s = 0; for (i = 1; i <= NF; i++) s = s * 60 + $i; print s }'
+}
+
+# Durée du flux vidéo (secondes)
+function video_duration() {
+    ffprobe -v error -show_entries format=duration -of default=nw=1:nk=1 "$1" 2>/dev/null
+}
+
+# Bornes des segments en numéros d'échantillon (0..N) : coupes idéales réparties sur la plage,
+# recalées sur l'image clé la plus proche pour que chaque décodeur parte d'une image clé
+function plan_segments() {
+    local start="$1" stop="$2" total="$3" jobs="$4"
+    local keyframes=""
+    if [ "$jobs" -gt 1 ] && command -v ffprobe &> /dev/null; then
+        keyframes=$(ffprobe -v error -select_streams v:0 -read_intervals "${start}%${stop}" \
+            -show_entries packet=pts_time,flags -of csv=p=0 "$INPUT_FILE" 2>/dev/null \
+            | awk -F, '$2 ~ /K/ && $1 != "N/A" { print $1 }')
+    fi
+    echo "$keyframes" | awk -v s="$start" -v e="$stop" -v n="$total" -v j="$jobs" -v fps="$FPS" '
+        NF { k[++nk] = $1 }
+        END {
+            print 0
+            last = 0
+            for (i = 1; i < j; i++) {
+                cut = s + i * (e - s) / j
+                if (nk > 0) {
+                    best = k[1]
+                    for (x = 2; x <= nk; x++)
+                        if ((k[x] - cut) ^ 2 < (best - cut) ^ 2) best = k[x]
+                    cut = best
+                }
+                idx = (cut - s) * fps
+                idx = (idx == int(idx)) ? idx : int(idx) + 1
+                if (idx > last && idx < n) { print idx; last = idx }
+            }
+            print n
+        }'
+}
+
+# Extraction d'un segment : images JPEG numérotées globalement + vignettes 9x8 en niveaux de gris
+# (flux brut, 72 octets par image) pour le calcul du dHash
+function extract_segment() {
+    local first="$1" count="$2" workdir="$3"
+    local ss
+    ss=$(awk -v s="$START_S" -v i="$first" -v fps="$FPS" 'BEGIN { printf "%.6f", s + i / fps }')
+    ffmpeg -nostdin -loglevel error -y -threads "$DECODE_THREADS" -ss "$ss" -i "$INPUT_FILE" \
+        -filter_complex "[0:v]fps=$FPS,split=2[img][hash];[hash]scale=9:8:flags=area,format=gray[thumb]" \
+        -map "[img]" -frames:v "$count" -qscale:v 2 -start_number "$((first + 1))" "$TARGET_DIR/$FILENAME.%03d.jpg" \
+        -map "[thumb]" -frames:v "$count" -f rawvideo "$workdir/hash.raw" 2> "$workdir/ffmpeg.log"
+}
+
+# Parcours des vignettes dans l'ordre des segments : une image est gardée si son dHash diffère
+# de celui de la dernière image gardée de plus de DEDUP bits. Écrit le manifeste (gardées) et
+# la liste des images supprimées.
+function dedup_frames() {
+    local manifest="$1" dropped="$2"
+    local i
+    for i in "${!SEG_FIRST[@]}"; do
+        echo "# ${SEG_FIRST[$i]}"
+        od -An -v -tu1 -w72 "$WORK_DIR/seg$i/hash.raw"
+    done | awk -v s="$START_S" -v fps="$FPS" -v th="$DEDUP" -v name="$FILENAME" \
+               -v manifest="$manifest" -v dropped="$dropped" '
+        BEGIN { printf "image\ttime_s\tdhash\n" > manifest; split("0 1 2 3 4 5 6 7 8 9 a b c d e f", hx, " ") }
+        $1 == "#" { idx = $2; next }
+        NF == 72 {
+            bits = ""
+            for (r = 0; r < 8; r++)
+                for (c = 1; c <= 8; c++)
+                    bits = bits (($(r * 9 + c) > $(r * 9 + c + 1)) ? "1" : "0")
+            image = sprintf("%s.%03d.jpg", name, idx + 1)
+            if (have && th >= 0) {
+                dist = 0
+                for (b = 1; b <= 64; b++) if (substr(bits, b, 1) != substr(kept, b, 1)) dist++
+                if (dist <= th) { print image > dropped; idx++; next }
+            }
+            hex = ""
+            for (b = 1; b <= 64; b += 4) {
+                v = substr(bits, b, 1) * 8 + substr(bits, b + 1, 1) * 4 + substr(bits, b + 2, 1) * 2 + substr(bits, b + 3, 1)
+                hex = hex hx[v + 1]
+            }
+            printf "%s\t%.3f\t%s\n", image, s + idx / fps, hex > manifest
+            kept = bits; have = 1; idx++
+        }'
+    touch "$dropped"
 }
 
 # Si aucun argument, afficher le help
@@ -45,6 +143,8 @@ START=""
 STOP=""
 ACTION=""
 INPUT_FILE=""
+JOBS=$(nproc 2>/dev/null || echo 1)
+DEDUP=4
 
 # Lecture des arguments
 while [[ $# -gt 0 ]]; do
@@ -61,6 +161,10 @@ while [[ $# -gt 0 ]]; do
             START="$2"; shift 2 ;;
         --stop)
             STOP="$2"; shift 2 ;;
+        --jobs)
+            JOBS="$2"; shift 2 ;;
+        --dedup)
+            DEDUP="$2"; shift 2 ;;
         --help)
             help_msg; exit 0 ;;
         *)
@@ -101,25 +205,88 @@ mkdir -p "$TARGET_DIR"
 # Fonction suppression
 if [ "$ACTION" == "remove" ]; then
     echo "Suppression des images dans $TARGET_DIR" | tee -a "$LOG_FILE"
-    rm -f "$TARGET_DIR/$FILENAME"*".jpg"
+    rm -f "$TARGET_DIR/$FILENAME"*".jpg" "$TARGET_DIR/$FILENAME.manifest.tsv"
     echo "Suppression terminée" | tee -a "$LOG_FILE"
     exit 0
 fi
 
-# Construction options ffmpeg
-FFMPEG_OPTIONS="-i \"$INPUT_FILE\" -qscale:v 2 -vf fps=$FPS"
-if [ -n "$START" ]; then
-    FFMPEG_OPTIONS="$FFMPEG_OPTIONS -ss $START"
+if ! [[ "$JOBS" =~ ^[1-9][0-9]*$ ]] || ! [[ "$DEDUP" =~ ^-?[0-9]+$ ]]; then
+    echo "Erreur : --jobs doit être un entier >= 1 et --dedup un entier (-1 pour désactiver)" | tee -a "$LOG_FILE"
+    exit 1
+fi
+if [ -z "$INPUT_FILE" ]; then
+    echo "Erreur : fichier MP4 à traiter non spécifié" | tee -a "$LOG_FILE"
+    exit 1
 fi
+
+# Plage à extraire (secondes) et nombre d'échantillons à FPS images/s
+START_S=$(to_seconds "${START:-0}")
 if [ -n "$STOP" ]; then
-    FFMPEG_OPTIONS="$FFMPEG_OPTIONS -to $STOP"
+    STOP_S=$(to_seconds "$STOP")
+else
+    STOP_S=$(video_duration "$INPUT_FILE")
+fi
+if [ -z "$STOP_S" ] || [ "$STOP_S" == "N/A" ]; then
+    echo "Erreur : durée de la vidéo inconnue (ffprobe requis sans --stop)" | tee -a "$LOG_FILE"
+    exit 1
+fi
+TOTAL=$(awk -v s="$START_S" -v e="$STOP_S" -v fps="$FPS" 'BEGIN { n = (e - s) * fps; print (n <= 0) ? 0 : (n == int(n) ? n : int(n) + 1) }')
+if [ "$TOTAL" -eq 0 ]; then
+    echo "Erreur : plage vide (--start $START_S >= --stop $STOP_S)" | tee -a "$LOG_FILE"
+    exit 1
+fi
+
+# Découpage : au moins ~10 s de vidéo par segment, sinon le coût de démarrage de ffmpeg domine
+MAX_JOBS=$(awk -v s="$START_S" -v e="$STOP_S" 'BEGIN { m = int((e - s) / 10); print (m < 1) ? 1 : m }')
+[ "$JOBS" -gt "$MAX_JOBS" ] && JOBS="$MAX_JOBS"
+[ "$JOBS" -gt "$TOTAL" ] && JOBS="$TOTAL"
+mapfile -t BOUNDS < <(plan_segments "$START_S" "$STOP_S" "$TOTAL" "$JOBS")
+SEG_FIRST=()
+SEG_COUNT=()
+for ((i = 0; i + 1 < ${#BOUNDS[@]}; i++)); do
+    SEG_FIRST+=("${BOUNDS[$i]}")
+    SEG_COUNT+=("$((BOUNDS[i + 1] - BOUNDS[i]))")
+done
+# Cœurs répartis entre les segments en parallèle, ffmpeg choisit seul pour un segment unique
+DECODE_THREADS=0
+if [ "${#SEG_FIRST[@]}" -gt 1 ]; then
+    DECODE_THREADS=$(( $(nproc 2>/dev/null || echo 1) / ${#SEG_FIRST[@]} ))
+    [ "$DECODE_THREADS" -lt 1 ] && DECODE_THREADS=1
+fi
+
+WORK_DIR=$(mktemp -d "${TMPDIR:-/tmp}/mp4_to_images.XXXXXX")
+trap 'rm -rf "$WORK_DIR"' EXIT
+
+# Extraction parallèle des segments
+echo "Extraction des images : $TOTAL échantillon(s) de ${START_S}s à ${STOP_S}s, ${#SEG_FIRST[@]} segment(s) en parallèle..." | tee -a "$LOG_FILE"
+T0=$(date +%s)
+PIDS=()
+for i in "${!SEG_FIRST[@]}"; do
+    mkdir -p "$WORK_DIR/seg$i"
+    extract_segment "${SEG_FIRST[$i]}" "${SEG_COUNT[$i]}" "$WORK_DIR/seg$i" &
+    PIDS+=("$!")
+done
+FAILED=0
+for i in "${!PIDS[@]}"; do
+    if ! wait "${PIDS[$i]}"; then
+        echo "Erreur : échec du segment $i (à partir de l'échantillon ${SEG_FIRST[$i]})" | tee -a "$LOG_FILE"
+        cat "$WORK_DIR/seg$i/ffmpeg.log" | tee -a "$LOG_FILE"
+        FAILED=1
+    fi
+done
+if [ "$FAILED" -eq 1 ]; then
+    exit 1
 fi
+T1=$(date +%s)
 
-# Commande extraction
-echo "Extraction des images..." | tee -a "$LOG_FILE"
-CMD="ffmpeg $FFMPEG_OPTIONS \"$TARGET_DIR/$FILENAME.%03d.jpg\""
-eval $CMD | tee -a "$LOG_FILE"
-echo "Extraction terminée dans $TARGET_DIR" | tee -a "$LOG_FILE"
+# Suppression des images quasi identiques et manifeste
+MANIFEST="$TARGET_DIR/$FILENAME.manifest.tsv"
+dedup_frames "$MANIFEST" "$WORK_DIR/dropped.txt"
+(cd "$TARGET_DIR" && tr '\n' '\0' < "$WORK_DIR/dropped.txt" | xargs -0 -r rm -f)
+KEPT=$(($(wc -l < "$MANIFEST") - 1))
+DROPPED=$(wc -l < "$WORK_DIR/dropped.txt")
+echo "Extraction terminée dans $TARGET_DIR en $((T1 - T0))s : $KEPT image(s) gardée(s), $DROPPED quasi identique(s) supprimée(s)" | tee -a "$LOG_FILE"
+echo "Manifeste : $MANIFEST" | tee -a "$LOG_FILE"
 
 # Liste numérotée des actions
 echo ""
@@ -129,6 +296,8 @@ echo "2. Répertoire cible : $TARGET_DIR"
 echo "3. FPS : $FPS"
 [ -n "$START" ] && echo "4. Début extraction : $START"
 [ -n "$STOP" ] && echo "5. Fin extraction : $STOP"
-echo "6. Commande exécutée : $CMD"
+echo "6. Segments décodés en parallèle : ${#SEG_FIRST[@]} (premiers échantillons : ${SEG_FIRST[*]})"
+echo "7. Déduplication dHash : seuil $DEDUP, $DROPPED image(s) supprimée(s), $KEPT gardée(s)"
+echo "8. Manifeste : $MANIFEST"
 
 echo "Sortie conforme aux règles de contextualisation v41."
@@ -4,9 +4,10 @@
 # Nom du script : record_cam.sh
 # Target usage : Enregistrer l'écran en segments personnalisables avec ffmpeg, capturer le son système (Monitor),
 #                amplification optionnelle post-traitement, gestion propre de CTRL-C et --delete.
-# Version : v1.8 - Date : 2025-08-17
+# Version : v1.9 - Date : 2025-08-26
 #
 # Changelog :
+# v1.9 - 2025-08-26 : File des segments fermés (.<base>.segments), --transcribe : transcription en direct par record_cam_transcribe.sh
 # v1.8 - 2025-08-17 : Remplacement de recordmydesktop par ffmpeg, durée illimitée par défaut, options adaptées pour Whisper
 # v1.7 - 2025-08-12 : Amélioration de la gestion de l'arrêt via Ctrl+C
 # v1.6 - 2025-08-12 : Ajout --target_dir pour spécifier le répertoire de sortie
@@ -46,6 +47,11 @@ TARGET_DIR="./"               # Répertoire de sortie
 CURRENT_FFMPEG_PID=0          # PID du processus ffmpeg en cours
 MICROPHONE_DEVICE=""          # Micro désactivé par défaut
 RECORD_MIC=0                  # 0 = pas de micro
+CURRENT_OUTFILE=""            # Fichier du segment en cours
+SEGMENT_QUEUE=""              # File des segments fermés (lue par record_cam_transcribe.sh)
+DO_TRANSCRIBE=0               # Transcription en direct des segments
+TRANSCRIBE_ARGS=()            # Options passées à record_cam_transcribe.sh
+TRANSCRIBER_PID=0             # PID du transcripteur
 
 # --- Helpers ---
 log() {
@@ -97,6 +103,10 @@ OPTIONS:
   --help                  : affiche cette aide.
   --discover-devices      : liste les périphériques audio disponibles.
   --delete                : supprime les fichiers générés pour la base donnée (backup avant suppression).
+  --transcribe            : transcrit chaque segment dès sa fermeture (record_cam_transcribe.sh, priorité basse)
+                            vers <target_dir>/<base_nom>_transcript.txt/.srt.
+  --transcribe-model NAME : modèle whisper pour --transcribe (par défaut: base).
+  --transcribe-lang CODE  : langue pour --transcribe (par défaut: fr).
 EXEMPLES:
   # Enregistrement illimité (par défaut), segments de 35 min, son système :
   ./record_cam.sh nest_agression
@@ -110,7 +120,9 @@ EXEMPLES:
   ./record_cam.sh --discover-devices
   # Supprimer les fichiers pour une base :
   ./record_cam.sh --delete nest_agression
-PRÉREQUIS: ffmpeg, PulseAudio.
+  # Transcription en direct, segments de 60 s (latence ~1 min) :
+  ./record_cam.sh Reunion --segment-duration 60 --transcribe
+PRÉREQUIS: ffmpeg, PulseAudio ; whisper.cpp (../../whisper) pour --transcribe.
 EOF
     exit "$1"
 }
@@ -124,8 +136,34 @@ stop_ffmpeg() {
     fi
 }
 
+# Segment terminé : ajout à la file lue par le transcripteur
+enqueue_segment() {
+    local file="$1"
+    if [[ -n "$file" && -s "$file" ]]; then
+        echo "$file" >> "$SEGMENT_QUEUE"
+    fi
+}
+
+start_transcriber() {
+    local watcher
+    watcher="$(dirname "$0")/record_cam_transcribe.sh"
+    # Le transcripteur se règle lui-même en priorité basse (nice/ionice) et finit la file après l'arrêt ;
+    # nouvelle session (setsid) pour ne pas recevoir le CTRL-C destiné à l'enregistrement
+    local launcher=()
+    command -v setsid >/dev/null 2>&1 && launcher=(setsid)
+    "${launcher[@]}" bash "$watcher" --queue "$SEGMENT_QUEUE" --recorder-pid $$ "${TRANSCRIBE_ARGS[@]}" >/dev/null 2>&1 &
+    TRANSCRIBER_PID=$!
+    ACTIONS+=("Transcription en direct (PID ${TRANSCRIBER_PID}) -> ${TARGET_DIR}/${BASE_NAME}_transcript.txt")
+    log "Transcripteur démarré (PID: ${TRANSCRIBER_PID}, file: ${SEGMENT_QUEUE})"
+}
+
 cleanup() {
+    local was_recording="$CURRENT_FFMPEG_PID"
     stop_ffmpeg
+    if [[ "$was_recording" -ne 0 ]]; then
+        enqueue_segment "$CURRENT_OUTFILE"
+        CURRENT_OUTFILE=""
+    fi
 }
 
 record_segment() {
@@ -133,6 +171,7 @@ record_segment() {
     local duration=$2
     local ts=$(date '+%Y%m%d_%H%M%S')
     local outfile="${TARGET_DIR}/${BASE_NAME}_${ts}_part${seg_index}.mp4"
+    CURRENT_OUTFILE="$outfile"
     log "Démarrage segment #${seg_index} -> ${outfile} (durée: ${duration}s)"
 
     local ffmpeg_cmd=(
@@ -240,6 +279,20 @@ while [[ $# -gt 0 ]]; do
             DO_EXEC=1
             shift
             ;;
+        --transcribe)
+            DO_TRANSCRIBE=1
+            shift
+            ;;
+        --transcribe-model)
+            shift
+            TRANSCRIBE_ARGS+=(--model "$1")
+            shift
+            ;;
+        --transcribe-lang)
+            shift
+            TRANSCRIBE_ARGS+=(--lang "$1")
+            shift
+            ;;
         -*)
             echo "[ERREUR] Option inconnue: $1"
             exit 1
@@ -302,12 +355,17 @@ if ! command -v ffmpeg >/dev/null 2>&1; then
     exit 1
 fi
 
+SEGMENT_QUEUE="${TARGET_DIR}/.${BASE_NAME}.segments"
+
 # --- Configuration des traps ---
 trap 'log "SIGINT reçu: arrêt en cours..."; STOP_AFTER_CURRENT=1; cleanup; exit 130' SIGINT
 trap 'cleanup' EXIT
 
 # --- Boucle principale ---
 log "Démarrage: base=$BASE_NAME, durée_totale=${TOTAL_DURATION} (0=illimitée), segment_duration=${SEGMENT_SECONDS}s, device=$AUDIO_DEVICE, mic=$RECORD_MIC, mic_device=$MICROPHONE_DEVICE, volume=$VOLUME_FILTER, target_dir=$TARGET_DIR"
+if [[ "$DO_TRANSCRIBE" -eq 1 ]]; then
+    start_transcriber
+fi
 seg_index=0
 while true; do
     if [[ "$STOP_AFTER_CURRENT" -eq 1 ]]; then
@@ -318,6 +376,9 @@ while true; do
     record_segment "$seg_index" "$SEGMENT_SECONDS"
     sleep "$SEGMENT_SECONDS"
     stop_ffmpeg
+    # Segment fermé : transcription possible immédiatement, avant l'amplification
+    enqueue_segment "$CURRENT_OUTFILE"
+    CURRENT_OUTFILE=""
 
     # Vérifier le fichier généré
     latest_file=$(ls -t "${TARGET_DIR}/${BASE_NAME}"_*_part${seg_index}.mp4 2>/dev/null | head -n1)
@@ -0,0 +1,195 @@
+#!/bin/bash
+# Auteur : Bruno DELNOZ
+# Email  : bruno.delnoz@protonmail.com
+# Nom du script : record_cam_transcribe.sh
+# Target usage : Transcrire en direct les segments de record_cam.sh : chaque segment fermé par ffmpeg est
+#                envoyé à transcribe_mp4 (whisper.cpp) et ajouté à une transcription continue horodatée.
+# Version : v1.0 - Date : 2025-08-26
+#
+# Changelog :
+# v1.0 - 2025-08-26 : Version initiale (file des segments écrite par record_cam.sh v1.9, priorité basse)
+
+set -u
+set -o pipefail
+SCRIPT_NAME="$(basename "$0")"
+LOGFILE="$(cd "$(dirname "$0")" && pwd)/${SCRIPT_NAME%.sh}.log"
+
+# --- Paramètres par défaut ---
+QUEUE_FILE=""                 # File des segments fermés (une ligne par segment, écrite par record_cam.sh)
+RECORDER_PID=0                # Fin du suivi quand ce processus est terminé et la file vide (0 = jamais)
+WHISPER_DIR="$(cd "$(dirname "$0")/../../whisper" 2>/dev/null && pwd)"  # Dossier contenant whisper.cpp/
+TRANSCRIBE_SCRIPT="transcribe_mp4.2.3.sh"
+MODEL="base"                  # Modèle whisper
+LANG_CODE="fr"                # Langue
+THREADS=""                    # Threads whisper (défaut: cœurs / 4, le reste pour l'encodage x264)
+NICE_LEVEL=19                 # Priorité CPU (19 = la plus basse)
+POLL_SECONDS=2                # Intervalle de lecture de la file
+TRANSCRIPT_BASE=""            # Base des transcriptions continues (défaut: <file sans .segments>_transcript)
+
+# --- Helpers ---
+log() {
+    local msg="$1"
+    echo "[$(date '+%Y-%m-%d %H:%M:%S')] $msg" | tee -a "$LOGFILE"
+}
+
+usage_and_exit() {
+    cat << 'EOF'
+USAGE:
+  ./record_cam_transcribe.sh --queue FICHIER [OPTIONS]
+  - FICHIER : file des segments fermés écrite par record_cam.sh (<target_dir>/.<base_nom>.segments).
+    Lancé automatiquement par ./record_cam.sh <base_nom> --transcribe.
+OPTIONS:
+  --recorder-pid PID      : s'arrête quand ce processus est terminé et tous les segments transcrits.
+  --model NAME            : modèle whisper (par défaut: base).
+  --lang CODE             : langue (par défaut: fr).
+  --threads N             : threads whisper (par défaut: cœurs / 4).
+  --nice N                : priorité CPU du transcripteur (par défaut: 19).
+  --whisper-dir DIR       : dossier contenant whisper.cpp/ et transcribe_mp4.2.3.sh (par défaut: ../../whisper).
+  --transcript BASE       : base des fichiers BASE.txt / BASE.srt (par défaut: <target_dir>/<base_nom>_transcript).
+  --help                  : affiche cette aide.
+SORTIES:
+  BASE.txt : une ligne par phrase, « [AAAA-MM-JJ HH:MM:SS] texte » (heure murale du segment + position)
+  BASE.srt : sous-titres de toute la session, temps relatifs au début du premier segment
+  Latence : durée d'un segment (--segment-duration de record_cam.sh) + temps de transcription.
+EXEMPLES:
+  # Segments de 60 s transcrits au fil de l'eau :
+  ./record_cam.sh Reunion --segment-duration 60 --transcribe
+  # Reprise manuelle d'une session (segments déjà transcrits ignorés) :
+  ./record_cam_transcribe.sh --queue ~/Vidéos/.Reunion.segments --model small
+PRÉREQUIS: ffmpeg, whisper.cpp compilé (whisper/install_whisper.sh), ionice (optionnel).
+EOF
+    exit "$1"
+}
+
+# Heure de début d'un segment (epoch) depuis son nom <base>_AAAAMMJJ_HHMMSS_partN.mp4
+segment_start_epoch() {
+    local name ts
+    name="$(basename "$1")"
+    ts="$(echo "$name" | grep -oE '_[0-9]{8}_[0-9]{6}_part[0-9]+\.' | head -n1)"
+    if [[ -z "$ts" ]]; then
+        stat -c %Y "$1"
+        return
+    fi
+    date -d "${ts:1:8} ${ts:10:2}:${ts:12:2}:${ts:14:2}" +%s
+}
+
+# Ajout des sous-titres d'un segment aux transcriptions continues (décalage = début du segment)
+append_segment() {
+    local srt="$1" seg_start="$2" session_start="$3"
+    local next_index
+    next_index=$(grep -c -- '-->' "${TRANSCRIPT_BASE}.srt" 2>/dev/null || true)
+    awk -v wall="$seg_start" -v offset="$((seg_start - session_start))" -v idx="${next_index:-0}" \
+        -v txt="${TRANSCRIPT_BASE}.txt" -v srt="${TRANSCRIPT_BASE}.srt" '
+        function ms(t,   p) { gsub(",", ".", t); split(t, p, ":"); return int((p[1] * 3600 + p[2] * 60 + p[3]) * 1000 + 0.5) }
+        function fmt(v) { return sprintf("%02d:%02d:%02d,%03d", int(v / 3600000), int(v / 60000) % 60, int(v / 1000) % 60, v % 1000) }
+        function flush() {
+            if (start == "") return
+            idx++
+            printf "%d\n%s --> %s\n%s\n\n", idx, fmt(start + offset * 1000), fmt(end + offset * 1000), text >> srt
+            line = text; gsub(/\n/, " ", line)
+            printf "[%s] %s\n", strftime_wall(wall + int(start / 1000)), line >> txt
+            start = ""; text = ""
+        }
+        function strftime_wall(e,   cmd, out) {
+            cmd = "date -d @" e " \"+%Y-%m-%d %H:%M:%S\""
+            cmd | getline out
+            close(cmd)
+            return out
+        }
+        /-->/ { flush(); start = ms($1); end = ms($3); next }
+        /^[0-9]+$/ && start == "" { next }
+        /^[[:space:]]*$/ { flush(); next }
+        { sub(/\r$/, ""); text = (text == "") ? $0 : text "\n" $0 }
+        END { flush() }
+    ' "$srt"
+}
+
+transcribe_segment() {
+    local seg="$1" session_start="$2"
+    local seg_abs base seg_start t0
+    seg_abs="$(cd "$(dirname "$seg")" && pwd)/$(basename "$seg")"
+    base="${seg_abs%.*}"
+    seg_start="$(segment_start_epoch "$seg_abs")"
+    t0=$(date +%s)
+    log "Transcription du segment $seg_abs (début $(date -d "@$seg_start" '+%H:%M:%S'))"
+
+    local cmd=(bash "$TRANSCRIBE_SCRIPT" --file "$seg_abs" --exec --model "$MODEL" --lang "$LANG_CODE"
+               --threads "$THREADS" --output-format "txt,srt" --no-index)
+    local prio=(nice -n "$NICE_LEVEL")
+    command -v ionice >/dev/null 2>&1 && prio+=(ionice -c3)
+    if ! (cd "$WHISPER_DIR" && "${prio[@]}" "${cmd[@]}" < /dev/null >> "$LOGFILE" 2>&1); then
+        log "ERREUR: échec de la transcription de $seg_abs"
+        return 1
+    fi
+    # whisper-cli sans -of nomme ses sorties d'après le WAV (<base>.wav.srt)
+    local srt=""
+    for srt in "${base}.srt" "${base}.wav.srt" ""; do
+        [[ -z "$srt" || -f "$srt" ]] && break
+    done
+    if [[ -z "$srt" ]]; then
+        log "ERREUR: sous-titres introuvables pour $seg_abs"
+        return 1
+    fi
+    append_segment "$srt" "$seg_start" "$session_start"
+    log "Segment transcrit en $(( $(date +%s) - t0 ))s, latence depuis la fin du segment : $(( $(date +%s) - $(stat -c %Y "$seg_abs") ))s"
+}
+
+# --- Parse args ---
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --queue) QUEUE_FILE="$2"; shift 2 ;;
+        --recorder-pid) RECORDER_PID="$2"; shift 2 ;;
+        --model) MODEL="$2"; shift 2 ;;
+        --lang) LANG_CODE="$2"; shift 2 ;;
+        --threads) THREADS="$2"; shift 2 ;;
+        --nice) NICE_LEVEL="$2"; shift 2 ;;
+        --whisper-dir) WHISPER_DIR="$2"; shift 2 ;;
+        --transcript) TRANSCRIPT_BASE="$2"; shift 2 ;;
+        --help) usage_and_exit 0 ;;
+        *) echo "[ERREUR] Option inconnue: $1"; exit 1 ;;
+    esac
+done
+
+if [[ -z "$QUEUE_FILE" ]]; then
+    usage_and_exit 1
+fi
+if [[ -z "$WHISPER_DIR" || ! -f "$WHISPER_DIR/$TRANSCRIBE_SCRIPT" ]]; then
+    echo "[ERREUR] $TRANSCRIBE_SCRIPT introuvable dans '${WHISPER_DIR}' (utiliser --whisper-dir)."
+    exit 1
+fi
+if [[ -z "$THREADS" ]]; then
+    THREADS=$(( $(nproc 2>/dev/null || echo 4) / 4 ))
+    [[ "$THREADS" -lt 1 ]] && THREADS=1
+fi
+QUEUE_NAME="$(basename "$QUEUE_FILE" .segments)"
+TRANSCRIPT_BASE="${TRANSCRIPT_BASE:-$(dirname "$QUEUE_FILE")/${QUEUE_NAME#.}_transcript}"
+DONE_FILE="${QUEUE_FILE%.segments}.transcribed"
+touch "$QUEUE_FILE" "$DONE_FILE"
+
+# --- Boucle de suivi ---
+log "Suivi de $QUEUE_FILE : modèle $MODEL, langue $LANG_CODE, $THREADS thread(s), nice $NICE_LEVEL -> ${TRANSCRIPT_BASE}.txt/.srt"
+session_start=""
+while true; do
+    recorder_alive=1
+    if [[ "$RECORDER_PID" -ne 0 ]] && ! kill -0 "$RECORDER_PID" 2>/dev/null; then
+        recorder_alive=0
+    fi
+    pending=0
+    while IFS= read -r seg; do
+        [[ -z "$seg" || ! -f "$seg" ]] && continue
+        if [[ -z "$session_start" ]]; then
+            session_start="$(segment_start_epoch "$seg")"
+        fi
+        grep -qxF "$seg" "$DONE_FILE" && continue
+        pending=1
+        transcribe_segment "$seg" "$session_start"
+        # Marqué traité même en cas d'échec : pas de boucle sur un segment illisible
+        echo "$seg" >> "$DONE_FILE"
+    done < "$QUEUE_FILE"
+    if [[ "$pending" -eq 0 && "$recorder_alive" -eq 0 ]]; then
+        log "Enregistreur terminé et file vide : fin du suivi."
+        break
+    fi
+    [[ "$pending" -eq 0 ]] && sleep "$POLL_SECONDS"
+done
+exit 0
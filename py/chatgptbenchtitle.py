@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nom du script : chatgptbenchtitle.py
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Target usage : Banc de mesure hors ligne des scripts de titrage ChatGPT contre chatgptmockserver.py.
+Version : v1.0 - Date : 2025-07-21
+
+Fonctionnalités :
+- Démarre le serveur mock en local (port libre) avec latence, gigue, virtualisation configurables
+- Lance chatgptcreationtitlefromcontent_loop.py (--exec) et/ou chatgptcreationtitlefromcontent.py
+  (--titles-file) en headless dans un répertoire temporaire isolé
+- Rapporte chats/minute, latences p50/p95 par étape, nombre d'échecs, compteurs serveur
+- Option --json pour sauvegarder le rapport
+
+Prérequis : chromedriver + navigateur Chromium/Brave locaux (--browser), module selenium.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import chatgptmockserver
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LOOP_SCRIPT = os.path.join(SCRIPT_DIR, "chatgptcreationtitlefromcontent_loop.py")
+SINGLE_SCRIPT = os.path.join(SCRIPT_DIR, "chatgptcreationtitlefromcontent.py")
+DEFAULT_BROWSER = "/usr/bin/brave-browser"
+DEFAULT_TIMEOUT = 900
+BENCH_RULES = "Version bench\nprefix: BENCH\n"
+
+WAIT_LINE_RE = re.compile(r"\[WAIT\] (\S+) : ([0-9.]+)s")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def summarize_steps(steps):
+    summary = {}
+    for step, values in sorted(steps.items()):
+        values = sorted(values)
+        summary[step] = {"n": len(values), "p50": round(percentile(values, 50), 3),
+                         "p95": round(percentile(values, 95), 3)}
+    return summary
+
+
+def run_script(cmd, workdir, env, timeout):
+    start = time.monotonic()
+    try:
+        proc = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True, timeout=timeout)
+        returncode = proc.returncode
+        output = proc.stdout + proc.stderr
+    except subprocess.TimeoutExpired as e:
+        returncode = "timeout"
+        output = e.stdout or ""
+        if isinstance(output, bytes):
+            output = output.decode("utf-8", errors="replace")
+    return returncode, time.monotonic() - start, output
+
+
+def bench_loop(server, args, env, workdir):
+    with open(os.path.join(workdir, "rules.txt"), 'w', encoding='utf-8') as f:
+        f.write(BENCH_RULES)
+    cmd = [sys.executable, LOOP_SCRIPT, "--exec", "--rulesfile=rules.txt",
+           f"--numchats={args.numchats}", f"--workers={args.workers}", f"--rate={args.rate}"]
+    returncode, wall, output = run_script(cmd, workdir, env, args.timeout)
+
+    steps = {}
+    errors = 0
+    log_path = os.path.join(workdir, "chatgptcreationtitlefromcontent_loop.log")
+    if os.path.exists(log_path):
+        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                match = WAIT_LINE_RE.search(line)
+                if match:
+                    steps.setdefault(match.group(1), []).append(float(match.group(2)))
+                elif " - ERROR - " in line:
+                    errors += 1
+    stats = server.state.stats()
+    done = stats["counters"]["renames"]
+    return {"script": "loop", "returncode": returncode, "wall_s": round(wall, 2), "completed": done,
+            "failures": errors + stats["counters"]["rename_failures"],
+            "chats_per_min": round(done * 60.0 / wall, 2) if wall > 0 else 0.0,
+            "steps": summarize_steps(steps), "server": stats, "tail": output[-2000:]}
+
+
+def bench_single(server, args, env, workdir):
+    with open(os.path.join(workdir, "rules.txt"), 'w', encoding='utf-8') as f:
+        f.write(BENCH_RULES)
+    with server.state.lock:
+        titles = [c["title"] for c in server.state.chats[:args.numchats]]
+    with open(os.path.join(workdir, "titles.txt"), 'w', encoding='utf-8') as f:
+        f.write("\n".join(titles) + "\n")
+    cmd = [sys.executable, SINGLE_SCRIPT, "--exec", "--titles-file", "titles.txt", "--rulesfile", "rules.txt",
+           "--results", "results.jsonl", "--login-wait", "0", "--pipeline", str(args.pipeline),
+           "--idle-threshold", str(args.idle_threshold)]
+    returncode, wall, output = run_script(cmd, workdir, env, args.timeout)
+
+    steps = {}
+    done = 0
+    results_path = os.path.join(workdir, "results.jsonl")
+    if os.path.exists(results_path):
+        with open(results_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record["status"] == "ok":
+                    done += 1
+                for step, value in record["timings"].items():
+                    steps.setdefault(step, []).append(value)
+    failures = len(titles) - done  # Chats sans résultat (script interrompu) comptés en échec
+    return {"script": "single", "returncode": returncode, "wall_s": round(wall, 2), "completed": done,
+            "failures": failures, "chats_per_min": round(done * 60.0 / wall, 2) if wall > 0 else 0.0,
+            "steps": summarize_steps(steps), "server": server.state.stats(), "tail": output[-2000:]}
+
+
+def print_report(report):
+    for res in report["results"]:
+        print(f"\n=== {res['script']} : {res['completed']} chats en {res['wall_s']}s "
+              f"({res['chats_per_min']} chats/min), {res['failures']} échecs, code retour {res['returncode']}")
+        for step, s in res["steps"].items():
+            print(f"  {step:<24} n={s['n']:<5} p50={s['p50']:.3f}s p95={s['p95']:.3f}s")
+        for endpoint, s in res["server"]["latency"].items():
+            print(f"  serveur/{endpoint:<17} n={s['n']:<5} p50={s['p50']:.3f}s p95={s['p95']:.3f}s")
+        if res["returncode"] != 0:
+            print("  --- fin de sortie du script ---")
+            print("  " + res["tail"].strip().replace("\n", "\n  "))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne des scripts de titrage ChatGPT.")
+    parser.add_argument('--scripts', default="loop,single", help='Scripts à mesurer : loop, single ou loop,single (défaut).')
+    parser.add_argument('--browser', default=DEFAULT_BROWSER, help=f'Binaire Chromium/Brave (défaut: {DEFAULT_BROWSER}).')
+    parser.add_argument('--chats', type=int, default=100, help='Chats synthétiques servis (défaut: 100).')
+    parser.add_argument('--numchats', type=int, default=20, help='Chats à traiter par script (défaut: 20).')
+    parser.add_argument('--latency', type=float, default=chatgptmockserver.DEFAULT_LATENCY_MS, help='Latence API du mock en ms.')
+    parser.add_argument('--jitter', type=float, default=0, help='Gigue de latence en ms (défaut: 0).')
+    parser.add_argument('--window', type=int, default=0, help='Virtualisation de la sidebar, 0 = désactivée (défaut: 0).')
+    parser.add_argument('--gen-words', type=int, default=chatgptmockserver.DEFAULT_GEN_WORDS, help='Mots par réponse générée.')
+    parser.add_argument('--gen-delay', type=float, default=chatgptmockserver.DEFAULT_GEN_DELAY_MS, help='Délai par mot généré en ms.')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Probabilité d\'échec d\'un renommage (défaut: 0).')
+    parser.add_argument('--workers', type=int, default=1, help='--workers passé au script loop (défaut: 1).')
+    parser.add_argument('--rate', type=int, default=6000, help='--rate passé au script loop (défaut: 6000, sans limite réelle).')
+    parser.add_argument('--pipeline', type=int, default=2, help='--pipeline passé au script single (défaut: 2).')
+    parser.add_argument('--idle-threshold', type=float, default=1.0, help='--idle-threshold passé au script single (défaut: 1.0).')
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT, help=f'Timeout par script en secondes (défaut: {DEFAULT_TIMEOUT}).')
+    parser.add_argument('--headed', action='store_true', help='Affiche le navigateur au lieu du mode headless.')
+    parser.add_argument('--json', help='Écrit le rapport complet dans ce fichier JSON.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = chatgptmockserver.make_server(0, args.chats, args.latency, args.jitter, args.window,
+                                           args.gen_words, args.gen_delay, args.fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    print(f"Serveur mock démarré sur {url}")
+
+    benches = {"loop": bench_loop, "single": bench_single}
+    report = {"config": {k: v for k, v in vars(args).items() if k != "json"}, "results": []}
+    try:
+        for name in [s.strip() for s in args.scripts.split(",") if s.strip()]:
+            if name not in benches:
+                print(f"Script inconnu : {name}")
+                sys.exit(1)
+            server.state.reset()
+            with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as workdir:
+                empty_profile = os.path.join(workdir, "empty_profile")
+                os.makedirs(empty_profile)
+                env = dict(os.environ, CHATGPT_URL=url, BRAVE_BINARY_PATH=args.browser,
+                           BRAVE_PROFILE_ORIG=empty_profile, SELENIUM_HEADLESS="0" if args.headed else "1")
+                print(f"Benchmark {name} ({args.numchats} chats)...")
+                report["results"].append(benches[name](server, args, env, workdir))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nRapport écrit dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,22 +5,78 @@ Auteur : Bruno DELNOZ
 Email : bruno.delnoz@protonmail.com
 Nom du script : chatgptcreationtitlefromcontent.py
 Target usage : Automatiser la création et modification de titre d'un chat ChatGPT via Selenium selon règles strictes.
-Version : v1.0 - Date : 2025-07-17
+Version : v1.4 - Date : 2025-08-27
+
+Modes :
+- --chat-title TITRE : traite un seul chat (comportement historique)
+- --titles-file FICHIER|- : traite une liste de chats (une ligne par titre ou JSONL
+  {"chat_title": ...}) avec une seule session navigateur ; l'envoi du chat suivant
+  se fait dans un nouvel onglet pendant que la réponse du précédent est générée
+  (--pipeline onglets en vol). Résultats et durées par chat écrits en JSONL (--results).
+
+Détection de fin de réponse : un MutationObserver injecté dans la page suit le texte de
+la nouvelle réponse ; elle est terminée quand le bouton stop disparaît ou que le texte
+ne change plus pendant --idle-threshold secondes (limite --response-timeout).
 """
 
+import os
 import sys
+import json
 import time
 import argparse
 import logging
+from collections import deque
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 # Définition du chemin par défaut du fichier de règles
 DEFAULT_RULES_FILE = "RuleCreationTitre.txt"
+DEFAULT_RESULTS_FILE = "chatgptcreationtitlefromcontent.results.jsonl"
+DEFAULT_PIPELINE = 2
+DEFAULT_LOGIN_WAIT = 10
+# Surchargeables par variables d'environnement (banc de test hors ligne, voir chatgptbenchtitle.py)
+CHATGPT_URL = os.environ.get("CHATGPT_URL", "https://chat.openai.com/")
+HEADLESS = os.environ.get("SELENIUM_HEADLESS") == "1"
+
+# Détection de fin de génération (modifiables via --idle-threshold / --response-timeout)
+RESPONSE_SELECTOR = ".chat-response"
+STOP_BUTTON_SELECTOR = "button[data-testid='stop-button']"
+RESPONSE_IDLE_THRESHOLD = 2.0
+RESPONSE_STOP_SETTLE = 0.3
+RESPONSE_TIMEOUT = 120.0
+RESPONSE_POLL = 0.2
+
+# Installé juste avant l'envoi : mémorise le nombre de réponses existantes et suit
+# le texte de la première réponse suivante, avec l'état du bouton stop
+RESPONSE_WATCHER_JS = """
+var sel = arguments[0], stopSel = arguments[1];
+var st = {baseline: arguments[2] === null ? document.querySelectorAll(sel).length : arguments[2],
+          text: '', changedAt: Date.now(), stopSeen: false, stopGone: false};
+st.scan = function () {
+    var all = document.querySelectorAll(sel);
+    if (all.length > st.baseline) {
+        var t = all[all.length - 1].innerText || '';
+        if (t !== st.text) { st.text = t; st.changedAt = Date.now(); }
+    }
+    if (document.querySelector(stopSel)) { st.stopSeen = true; st.stopGone = false; }
+    else if (st.stopSeen) { st.stopGone = true; }
+};
+if (window.__responseWatcher) { window.__responseWatcher.observer.disconnect(); }
+st.observer = new MutationObserver(st.scan);
+st.observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+window.__responseWatcher = st;
+"""
+RESPONSE_POLL_JS = """
+var st = window.__responseWatcher;
+if (!st) { return null; }
+st.scan();
+return {text: st.text, idle: (Date.now() - st.changedAt) / 1000.0,
+        stopSeen: st.stopSeen, stopGone: st.stopGone};
+"""
 
 # Configuration du logger
 logger = logging.getLogger("chatgptcreationtitlefromcontent")
@@ -30,15 +86,31 @@ formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 fh.setFormatter(formatter)
 logger.addHandler(fh)
 
+class ChatStepError(Exception):
+    """Échec d'une étape sur un chat (message déjà loggé)."""
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Script Selenium pour envoyer message à ChatGPT et changer titre du chat automatiquement selon règles.",
         add_help=False)
     parser.add_argument('--help', action='help', help='Affiche ce message et quitte.')
     parser.add_argument('--exec', action='store_true', help='Lance l\'exécution principale du script.')
-    parser.add_argument('--chat-title', type=str, required=True, help='Titre actuel du chat ChatGPT à cibler.')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--chat-title', type=str, help='Titre actuel du chat ChatGPT à cibler.')
+    target.add_argument('--titles-file', type=str,
+                        help='Fichier de titres à traiter en batch (une ligne par titre ou JSONL {"chat_title": ...}, "-" pour stdin).')
     parser.add_argument('--rulesfile', type=str, default=DEFAULT_RULES_FILE,
                         help='Chemin vers fichier texte contenant les règles de création de titre (défaut: RuleCreationTitre.txt).')
+    parser.add_argument('--results', type=str, default=DEFAULT_RESULTS_FILE,
+                        help=f'Fichier JSONL des résultats par chat en mode batch (défaut: {DEFAULT_RESULTS_FILE}).')
+    parser.add_argument('--idle-threshold', type=float, default=RESPONSE_IDLE_THRESHOLD,
+                        help=f'Secondes sans changement du texte pour considérer la réponse terminée (défaut: {RESPONSE_IDLE_THRESHOLD}).')
+    parser.add_argument('--response-timeout', type=float, default=RESPONSE_TIMEOUT,
+                        help=f'Attente max d\'une réponse en secondes (défaut: {RESPONSE_TIMEOUT:g}).')
+    parser.add_argument('--login-wait', type=float, default=DEFAULT_LOGIN_WAIT,
+                        help=f'Secondes laissées pour le login manuel après ouverture (défaut: {DEFAULT_LOGIN_WAIT}).')
+    parser.add_argument('--pipeline', type=int, default=DEFAULT_PIPELINE,
+                        help=f'Nombre de chats en vol (onglets) en mode batch (défaut: {DEFAULT_PIPELINE}).')
     return parser.parse_args()
 
 def load_rules(rulesfile):
@@ -54,7 +126,11 @@ def load_rules(rulesfile):
 def init_driver():
     # Init Selenium WebDriver sans sudo, Chrome par défaut, adapter si besoin
     options = webdriver.ChromeOptions()
+    if os.environ.get("BRAVE_BINARY_PATH"):
+        options.binary_location = os.environ["BRAVE_BINARY_PATH"]
     options.add_argument("--start-maximized")
+    if HEADLESS:
+        options.add_argument("--headless=new")
     driver = webdriver.Chrome(options=options)
     logger.info("WebDriver initialisé")
     return driver
@@ -68,7 +144,10 @@ def find_chat_by_title(driver, title):
         return chat_elem
     except TimeoutException:
         logger.error(f"Chat avec titre '{title}' non trouvé.")
-        sys.exit(1)
+        raise ChatStepError(f"chat '{title}' non trouvé")
+
+def install_response_watcher(driver, baseline=None):
+    driver.execute_script(RESPONSE_WATCHER_JS, RESPONSE_SELECTOR, STOP_BUTTON_SELECTOR, baseline)
 
 def send_message_to_chat(driver, chat_elem, message):
     # Cliquer sur le chat pour l'ouvrir
@@ -76,30 +155,56 @@ def send_message_to_chat(driver, chat_elem, message):
     logger.info(f"Ouverture chat '{chat_elem.text}'")
     # Trouver la zone de saisie message
     try:
+        # Zone de saisie créée à l'ouverture du chat : attendre qu'elle soit utilisable, pas seulement présente
         input_box = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "textarea")))
+            EC.element_to_be_clickable((By.TAG_NAME, "textarea")))
     except TimeoutException:
         logger.error("Zone de saisie message introuvable.")
-        sys.exit(1)
+        raise ChatStepError("zone de saisie introuvable")
     # Envoyer message
     input_box.clear()
-    input_box.send_keys(message)
+    # Shift+Entrée entre les lignes : un "\n" brut validerait le message à chaque ligne
+    for i, line in enumerate(message.split('\n')):
+        if i:
+            input_box.send_keys(Keys.SHIFT, Keys.ENTER, Keys.SHIFT)
+        input_box.send_keys(line)
+    install_response_watcher(driver)
     input_box.send_keys(Keys.ENTER)
     logger.info("Message envoyé à ChatGPT")
 
-def wait_for_response(driver):
-    # Attendre que la réponse apparaisse (basique, adapter selon DOM réel)
-    try:
-        # Supposons que la réponse soit dans un élément ayant class 'chat-response'
-        response_elem = WebDriverWait(driver, 60).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".chat-response:last-child")))
-        time.sleep(1)  # Petit délai pour fin de chargement
-        response_text = response_elem.text
-        logger.info("Réponse reçue de ChatGPT")
-        return response_text
-    except TimeoutException:
-        logger.error("Temps d'attente réponse dépassé.")
-        sys.exit(1)
+def wait_for_response(driver, idle_threshold=None, timeout=None, on_partial=None):
+    """Attend la fin de la réponse suivant le dernier envoi et retourne son texte.
+
+    Fin déclarée quand le bouton stop a disparu (après l'avoir vu) ou quand le texte
+    n'a pas changé depuis idle_threshold secondes. on_partial(texte) reçoit le texte
+    partiel à chaque changement.
+    """
+    idle_threshold = RESPONSE_IDLE_THRESHOLD if idle_threshold is None else idle_threshold
+    timeout = RESPONSE_TIMEOUT if timeout is None else timeout
+    start = time.monotonic()
+    last_text = ""
+    while time.monotonic() - start < timeout:
+        state = driver.execute_script(RESPONSE_POLL_JS)
+        if state is None:
+            # Page rechargée depuis l'envoi : on suit la dernière réponse présente
+            existing = len(driver.find_elements(By.CSS_SELECTOR, RESPONSE_SELECTOR))
+            install_response_watcher(driver, max(0, existing - 1))
+            continue
+        text = state["text"]
+        if text != last_text:
+            last_text = text
+            logger.debug(f"Réponse partielle ({len(text)} caractères)")
+            if on_partial is not None:
+                on_partial(text)
+        if text.strip():
+            stopped = state["stopGone"] and state["idle"] >= RESPONSE_STOP_SETTLE
+            if stopped or state["idle"] >= idle_threshold:
+                logger.info(f"Réponse reçue de ChatGPT en {time.monotonic() - start:.1f}s "
+                            f"({'bouton stop disparu' if stopped else 'texte stable'})")
+                return text
+        time.sleep(RESPONSE_POLL)
+    logger.error("Temps d'attente réponse dépassé.")
+    raise ChatStepError("temps d'attente réponse dépassé")
 
 def change_chat_title(driver, old_title, new_title):
     try:
@@ -119,32 +224,174 @@ def change_chat_title(driver, old_title, new_title):
         logger.info(f"Titre du chat modifié de '{old_title}' à '{new_title}'")
     except Exception as e:
         logger.error(f"Erreur modification titre : {e}")
+        raise ChatStepError(f"modification titre : {e}")
+
+def extract_title(response):
+    # Extraire le titre généré dans la réponse (ici on prend la première ligne ou tout, à adapter)
+    return response.strip().split('\n')[0]
+
+def open_titles(path):
+    """Ouvert avant le navigateur : un mauvais --titles-file échoue tout de suite."""
+    if path == "-":
+        return sys.stdin
+    try:
+        return open(path, 'r', encoding='utf-8')
+    except OSError as e:
+        logger.error(f"Erreur lecture fichier titres : {e}")
+        print(f"Erreur : fichier de titres illisible : {path} ({e.strerror})")
         sys.exit(1)
 
+def read_titles(stream):
+    try:
+        for line in stream:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                try:
+                    title = json.loads(line).get("chat_title")
+                except (ValueError, AttributeError) as e:
+                    logger.warning(f"Ligne de titres ignorée (JSON invalide : {e}) : {line[:80]}")
+                    continue
+                if title:
+                    yield title
+            else:
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def start_chat_job(driver, title, message):
+    """Ouvre le chat dans un nouvel onglet et y envoie le message, sans attendre la réponse."""
+    job = {"chat_title": title, "timings": {}, "start": time.monotonic()}
+    driver.switch_to.new_window('tab')
+    job["handle"] = driver.current_window_handle
+    driver.get(CHATGPT_URL)
+    t0 = time.monotonic()
+    chat_elem = find_chat_by_title(driver, title)
+    t1 = time.monotonic()
+    send_message_to_chat(driver, chat_elem, message)
+    t2 = time.monotonic()
+    job["timings"]["find"] = round(t1 - t0, 3)
+    job["timings"]["send"] = round(t2 - t1, 3)
+    return job
+
+def finish_chat_job(driver, job):
+    """Revient sur l'onglet du chat, récupère la réponse et applique le titre."""
+    driver.switch_to.window(job["handle"])
+    t0 = time.monotonic()
+    response = wait_for_response(driver)
+    t1 = time.monotonic()
+    new_title = extract_title(response)
+    change_chat_title(driver, job["chat_title"], new_title)
+    t2 = time.monotonic()
+    job["new_title"] = new_title
+    job["timings"]["response"] = round(t1 - t0, 3)
+    job["timings"]["rename"] = round(t2 - t1, 3)
+
+def close_job_tab(driver, job, base_handle):
+    try:
+        if job.get("handle") != base_handle and job.get("handle") in driver.window_handles:
+            driver.switch_to.window(job["handle"])
+            driver.close()
+    except WebDriverException as e:
+        logger.warning(f"Fermeture onglet '{job['chat_title']}' : {e}")
+    finally:
+        driver.switch_to.window(base_handle)
+
+def write_result(out, job, status, error=None):
+    record = {"chat_title": job["chat_title"], "status": status,
+              "new_title": job.get("new_title"), "error": error,
+              "timings": dict(job["timings"], total=round(time.monotonic() - job["start"], 3))}
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+    logger.info(f"Résultat batch : {json.dumps(record, ensure_ascii=False)}")
+
+def run_batch(driver, titles, message, pipeline, results_path):
+    base_handle = driver.current_window_handle
+    inflight = deque()
+    counts = {"ok": 0, "error": 0}
+    start = time.monotonic()
+
+    def drain_one(out):
+        job = inflight.popleft()
+        try:
+            finish_chat_job(driver, job)
+            write_result(out, job, "ok")
+            counts["ok"] += 1
+        except (ChatStepError, WebDriverException) as e:
+            # Un chat en échec (étape, onglet, navigateur) est enregistré, le lot continue
+            write_result(out, job, "error", str(e).strip() or type(e).__name__)
+            counts["error"] += 1
+        finally:
+            close_job_tab(driver, job, base_handle)
+
+    with open(results_path, 'a', encoding='utf-8') as out:
+        for title in titles:
+            try:
+                job = start_chat_job(driver, title, message)
+                inflight.append(job)
+            except (ChatStepError, WebDriverException) as e:
+                try:
+                    handle = driver.current_window_handle
+                except WebDriverException:
+                    handle = None
+                failed = {"chat_title": title, "timings": {}, "start": time.monotonic(), "handle": handle}
+                write_result(out, failed, "error", str(e).strip() or type(e).__name__)
+                counts["error"] += 1
+                close_job_tab(driver, failed, base_handle)
+            while len(inflight) >= max(1, pipeline):
+                drain_one(out)
+        while inflight:
+            drain_one(out)
+
+    elapsed = time.monotonic() - start
+    total = counts["ok"] + counts["error"]
+    per_min = total * 60.0 / elapsed if elapsed > 0 else 0.0
+    logger.info(f"Batch terminé : {counts['ok']} ok, {counts['error']} erreurs en {elapsed:.1f}s ({per_min:.1f} chats/min)")
+    print(f"Batch terminé : {counts['ok']} ok, {counts['error']} erreurs en {elapsed:.1f}s "
+          f"({per_min:.1f} chats/min). Résultats : {results_path}")
+    return counts
+
 def main():
+    global RESPONSE_IDLE_THRESHOLD, RESPONSE_TIMEOUT
     args = parse_args()
+    RESPONSE_IDLE_THRESHOLD = args.idle_threshold
+    RESPONSE_TIMEOUT = args.response_timeout
     if not args.exec:
         print("Utiliser --exec pour lancer l'exécution du script.")
         sys.exit(0)
     # Chargement règles
     rules_text = load_rules(args.rulesfile)
+    titles_stream = open_titles(args.titles_file) if args.titles_file else None
     # Initialisation driver
     driver = init_driver()
     # URL ChatGPT Web (adapter selon besoin)
-    driver.get("https://chat.openai.com/")
-    time.sleep(10)  # Attendre login manuel ou adapter si session active
-    # Trouver chat cible
-    chat_elem = find_chat_by_title(driver, args.chat_title)
+    driver.get(CHATGPT_URL)
+    time.sleep(args.login_wait)  # Attendre login manuel, 0 si session active
     # Construire message complet avec règles
     message = f"Voici les règles de création de titre:\n{rules_text}"
-    # Envoyer message
-    send_message_to_chat(driver, chat_elem, message)
-    # Attendre réponse
-    response = wait_for_response(driver)
-    # Extraire le titre généré dans la réponse (ici on prend la première ligne ou tout, à adapter)
-    new_title = response.strip().split('\n')[0]
-    # Modifier titre chat
-    change_chat_title(driver, args.chat_title, new_title)
+    if args.titles_file:
+        # Mode batch : une seule session pour tous les chats
+        try:
+            run_batch(driver, read_titles(titles_stream), message, args.pipeline, args.results)
+        finally:
+            driver.quit()
+        logger.info("Exécution batch terminée")
+        return
+    try:
+        # Trouver chat cible
+        chat_elem = find_chat_by_title(driver, args.chat_title)
+        # Envoyer message
+        send_message_to_chat(driver, chat_elem, message)
+        # Attendre réponse
+        response = wait_for_response(driver)
+        new_title = extract_title(response)
+        # Modifier titre chat
+        change_chat_title(driver, args.chat_title, new_title)
+    except ChatStepError:
+        driver.quit()
+        sys.exit(1)
     # Fin propre
     driver.quit()
     print("Actions réalisées :\n1) Chargé règles\n2) Trouvé chat\n3) Envoyé message\n4) Reçu réponse\n5) Modifié titre\n")
@@ -5,7 +5,7 @@ Nom du script : chatgptcreationtitlefromcontent_loop.py
 Auteur : Bruno DELNOZ
 Email : bruno.delnoz@protonmail.com
 Target usage : Extraction et mise à jour des titres de chats ChatGPT via Brave avec profil copié, gestion complète du traitement en boucle.
-Version : v9.8 - Date : 2025-07-18
+Version : v10.4 - Date : 2025-08-27
 
 Fonctionnalités :
 - Chargement règles depuis fichier configurable
@@ -15,6 +15,17 @@ Fonctionnalités :
 - Logs détaillés dans ./chatgptcreationtitlefromcontent_loop.log
 - Suppression propre du profil temporaire via --delete
 - Prérequis vérifiés sans sudo
+- Attentes sur conditions DOM (timeout et backoff configurables) au lieu de sleeps fixes
+- Histogrammes de latence par étape écrits dans le log en fin de traitement
+- Checkpoint SQLite (./chatgptcreationtitlefromcontent_loop.checkpoint.db) : saute les chats
+  déjà traités avec la même version de règles, reprise après crash, --reset-checkpoint
+- Mode --workers=N : N sessions Brave (une copie de profil chacune), file de travail partagée,
+  limitation de débit globale (--rate) et statistiques de débit par worker
+- Synchronisation incrémentale du profil (manifeste taille/mtime/hash, caches exclus,
+  hardlinks pour les fichiers immuables) au lieu d'une copie complète figée
+- Énumération paresseuse des chats : défilement progressif de la sidebar, identifiants seuls
+  (pas de handles gardés), déduplication contre le lot affiché précédent (--numchats=ALL
+  démarre immédiatement)
 """
 
 import os
@@ -23,36 +34,83 @@ import shutil
 import logging
 import time
 import re
+import json
+import fnmatch
+import hashlib
+import sqlite3
+import queue
+import threading
 import psutil
 from selenium import webdriver
+from urllib.parse import urlparse
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import WebDriverException, NoSuchElementException
+from selenium.common.exceptions import (WebDriverException, NoSuchElementException,
+                                        StaleElementReferenceException, TimeoutException)
 
 SCRIPT_NAME = os.path.basename(__file__).replace('.py', '')
 LOG_FILE = f"{SCRIPT_NAME}.log"
+CHECKPOINT_DB = f"{SCRIPT_NAME}.checkpoint.db"
 DEFAULT_RULES_FILE = "RuleCreationTitre.txt"
-BRAVE_PROFILE_ORIG = os.path.expanduser("~/.config/BraveSoftware/Brave-Browser/Default")
+# Surchargeables par variables d'environnement (banc de test hors ligne, voir chatgptbenchtitle.py)
+BRAVE_PROFILE_ORIG = os.environ.get("BRAVE_PROFILE_ORIG",
+                                    os.path.expanduser("~/.config/BraveSoftware/Brave-Browser/Default"))
 BRAVE_PROFILE_TEMP = os.path.join(os.getcwd(), "brave_profile_selenium")
-BRAVE_BINARY_PATH = "/usr/bin/brave-browser"  # Adapter si besoin
+BRAVE_BINARY_PATH = os.environ.get("BRAVE_BINARY_PATH", "/usr/bin/brave-browser")  # Adapter si besoin
+CHATGPT_URL = os.environ.get("CHATGPT_URL", "https://chat.openai.com/")
+HEADLESS = os.environ.get("SELENIUM_HEADLESS") == "1"
+
+# Couche d'attente : timeout max par étape, puis intervalle de scrutation
+# qui démarre à WAIT_POLL_INITIAL et croît par WAIT_BACKOFF jusqu'à WAIT_POLL_MAX
+WAIT_TIMEOUT = 20.0
+WAIT_POLL_INITIAL = 0.05
+WAIT_POLL_MAX = 0.5
+WAIT_BACKOFF = 1.5
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0]
+STEP_LATENCIES = {}
+
+# Synchronisation du profil : répertoires/fichiers exclus (caches régénérés par Brave),
+# fichiers immuables pouvant être partagés par hardlink, nom du manifeste dans la copie
+PROFILE_EXCLUDES = ["Cache", "Code Cache", "GPUCache", "Service Worker", "DawnCache",
+                    "GrShaderCache", "ShaderCache", "Crashpad", "Singleton*", "*.tmp"]
+PROFILE_HARDLINK = ["Extensions/*"]
+PROFILE_MANIFEST = ".sync_manifest.json"
+
+# Énumération de la sidebar : attente max de nouvelles entrées après un défilement
+# avant de conclure à la fin de la liste
+CHAT_SCROLL_TIMEOUT = 4.0
+
+DEFAULT_WORKERS = 1
+DEFAULT_RATE = 20  # Ouvertures de chat max par minute, toutes sessions confondues
+
+SEL_CHAT_ITEM = "div[class*='chatListItem']"  # Selector à adapter
+SEL_CHAT_TITLE = "h1[class*='chatTitle']"
+SEL_EDIT_TITLE = "button[class*='editTitle']"
+SEL_TITLE_INPUT = "input[class*='titleInput']"
+SEL_SAVE_TITLE = "button[class*='saveTitle']"
 
 logging.basicConfig(filename=LOG_FILE, level=logging.DEBUG,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
 def show_help():
     help_text = f"""
-Usage: ./{SCRIPT_NAME}.py [--exec|--test] [--rulesfile=FILE] [--numchats=NUMBER|ALL] [--delete] [--help]
+Usage: ./{SCRIPT_NAME}.py [--exec|--test] [--rulesfile=FILE] [--numchats=NUMBER|ALL] [--timeout=SEC] [--workers=N] [--rate=N] [--reset-checkpoint] [--delete] [--help]
 
 Arguments:
   --exec                  Lance l'exécution réelle (modifie les titres).
   --test                  Mode test : simule sans modifier les titres.
   --rulesfile=FILE        Chemin vers le fichier de règles (défaut : {DEFAULT_RULES_FILE}).
   --numchats=NUMBER|ALL   Nombre de chats à traiter (défaut : 3).
+  --timeout=SEC           Attente max par étape DOM en secondes (défaut : {WAIT_TIMEOUT:g}).
+  --workers=N             Nombre de sessions Brave en parallèle (défaut : {DEFAULT_WORKERS}).
+  --rate=N                Ouvertures de chat max par minute, tous workers confondus (défaut : {DEFAULT_RATE}).
+  --reset-checkpoint      Vide le checkpoint ({CHECKPOINT_DB}) et retraite tous les chats.
   --delete                Supprime proprement le profil Brave temporaire créé.
   --help                  Affiche cette aide.
 
 Exemples :
   ./{SCRIPT_NAME}.py --exec --numchats=5
   ./{SCRIPT_NAME}.py --test --rulesfile=RuleCreationTitre.txt --numchats=ALL
+  ./{SCRIPT_NAME}.py --exec --numchats=ALL --workers=3 --rate=30
 """
     print(help_text)
 
@@ -70,34 +128,241 @@ def check_prerequisites():
         sys.exit(1)
     logging.info("Tous les prérequis sont présents.")
 
-def copy_profile():
-    if os.path.exists(BRAVE_PROFILE_TEMP):
-        logging.info(f"Profil Brave temporaire déjà existant : {BRAVE_PROFILE_TEMP}")
-        return
-    logging.info(f"Copie profil Brave de {BRAVE_PROFILE_ORIG} vers {BRAVE_PROFILE_TEMP}")
-    shutil.copytree(BRAVE_PROFILE_ORIG, BRAVE_PROFILE_TEMP, dirs_exist_ok=True)
+def worker_profile_dir(worker_id):
+    # Worker 0 garde le profil historique, les suivants ont leur propre copie
+    return BRAVE_PROFILE_TEMP if worker_id == 0 else f"{BRAVE_PROFILE_TEMP}_w{worker_id}"
+
+def profile_excluded(name):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in PROFILE_EXCLUDES)
+
+def load_profile_manifest(profile_dir):
+    path = os.path.join(profile_dir, PROFILE_MANIFEST)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_profile_manifest(profile_dir, manifest):
+    path = os.path.join(profile_dir, PROFILE_MANIFEST)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(path + ".tmp", path)
+
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def copy_file_hashed(src, dst):
+    # Copie + hash en une seule lecture, remplacement atomique de la destination
+    h = hashlib.sha1()
+    tmp = dst + ".sync_tmp"
+    with open(src, 'rb') as fin, open(tmp, 'wb') as fout:
+        for chunk in iter(lambda: fin.read(1 << 20), b""):
+            h.update(chunk)
+            fout.write(chunk)
+    shutil.copystat(src, tmp)
+    os.replace(tmp, dst)
+    return h.hexdigest()
+
+def copy_profile(profile_dir=BRAVE_PROFILE_TEMP):
+    """Synchronise BRAVE_PROFILE_ORIG vers profile_dir en ne copiant que les changements."""
+    start = time.monotonic()
+    logging.info(f"Synchronisation profil Brave de {BRAVE_PROFILE_ORIG} vers {profile_dir}")
+    os.makedirs(profile_dir, exist_ok=True)
+    old_manifest = load_profile_manifest(profile_dir)
+    manifest = {}
+    stats = {"copied": 0, "linked": 0, "skipped": 0, "removed": 0,
+             "bytes_copied": 0, "bytes_linked": 0, "bytes_skipped": 0}
+
+    for root, dirs, files in os.walk(BRAVE_PROFILE_ORIG):
+        dirs[:] = [d for d in dirs if not profile_excluded(d)]
+        rel_root = os.path.relpath(root, BRAVE_PROFILE_ORIG)
+        dest_root = os.path.normpath(os.path.join(profile_dir, rel_root))
+        os.makedirs(dest_root, exist_ok=True)
+        for name in files:
+            if profile_excluded(name):
+                continue
+            src = os.path.join(root, name)
+            dst = os.path.join(dest_root, name)
+            rel = os.path.normpath(os.path.join(rel_root, name))
+            try:
+                st = os.stat(src)
+            except OSError:
+                continue  # Fichier disparu pendant le parcours (verrous, journaux)
+            prev = old_manifest.get(rel)
+            dst_ok = os.path.exists(dst) and os.path.getsize(dst) == st.st_size
+            if prev and dst_ok and prev[0] == st.st_size and prev[1] == st.st_mtime_ns:
+                manifest[rel] = prev
+                stats["skipped"] += 1
+                stats["bytes_skipped"] += st.st_size
+                continue
+            try:
+                if prev and dst_ok and prev[0] == st.st_size and file_sha1(src) == prev[2]:
+                    # Seul le mtime a changé : contenu identique, pas de copie
+                    manifest[rel] = [st.st_size, st.st_mtime_ns, prev[2]]
+                    stats["skipped"] += 1
+                    stats["bytes_skipped"] += st.st_size
+                    continue
+                if any(fnmatch.fnmatch(rel, pattern) for pattern in PROFILE_HARDLINK):
+                    try:
+                        if os.path.lexists(dst):
+                            os.remove(dst)
+                        os.link(src, dst)
+                        manifest[rel] = [st.st_size, st.st_mtime_ns, file_sha1(src)]
+                        stats["linked"] += 1
+                        stats["bytes_linked"] += st.st_size
+                        continue
+                    except OSError:
+                        pass  # Autre système de fichiers : copie classique
+                manifest[rel] = [st.st_size, st.st_mtime_ns, copy_file_hashed(src, dst)]
+                stats["copied"] += 1
+                stats["bytes_copied"] += st.st_size
+            except OSError as e:
+                logging.warning(f"Copie impossible {rel} : {str(e)}")
+
+    for rel in set(old_manifest) - set(manifest):
+        stale = os.path.join(profile_dir, rel)
+        if os.path.exists(stale) and not os.path.exists(os.path.join(BRAVE_PROFILE_ORIG, rel)):
+            os.remove(stale)
+            stats["removed"] += 1
+    save_profile_manifest(profile_dir, manifest)
+
+    elapsed = time.monotonic() - start
+    mb = 1024 * 1024
+    logging.info(f"Profil synchronisé en {elapsed:.1f}s : {stats['copied']} copiés "
+                 f"({stats['bytes_copied'] / mb:.1f} Mo), {stats['linked']} hardlinks "
+                 f"({stats['bytes_linked'] / mb:.1f} Mo), {stats['skipped']} inchangés "
+                 f"({stats['bytes_skipped'] / mb:.1f} Mo), {stats['removed']} supprimés")
+    print(f"Profil synchronisé : {stats['bytes_copied'] / mb:.1f} Mo copiés, "
+          f"{stats['bytes_skipped'] / mb:.1f} Mo inchangés ({elapsed:.1f}s)")
+    return stats
 
 def delete_profile():
-    if os.path.exists(BRAVE_PROFILE_TEMP):
-        logging.info(f"Suppression du profil temporaire : {BRAVE_PROFILE_TEMP}")
-        shutil.rmtree(BRAVE_PROFILE_TEMP)
-        print(f"Profil temporaire supprimé : {BRAVE_PROFILE_TEMP}")
-    else:
+    parent = os.path.dirname(BRAVE_PROFILE_TEMP)
+    base = os.path.basename(BRAVE_PROFILE_TEMP)
+    profiles = [os.path.join(parent, d) for d in sorted(os.listdir(parent))
+                if d == base or re.fullmatch(re.escape(base) + r"_w\d+", d)]
+    if not profiles:
         print("Aucun profil temporaire à supprimer.")
+        return
+    for profile_dir in profiles:
+        logging.info(f"Suppression du profil temporaire : {profile_dir}")
+        shutil.rmtree(profile_dir)
+        print(f"Profil temporaire supprimé : {profile_dir}")
+
+def record_latency(step, elapsed):
+    STEP_LATENCIES.setdefault(step, []).append(elapsed)
+    logging.debug(f"[WAIT] {step} : {elapsed:.3f}s")
+
+def wait_for(driver, condition, step, timeout=None):
+    """Attend que condition(driver) soit vraie, avec scrutation en backoff.
+
+    Retourne la valeur de la condition ; lève TimeoutException après timeout.
+    La durée d'attente est enregistrée sous le nom d'étape `step`.
+    """
+    timeout = WAIT_TIMEOUT if timeout is None else timeout
+    start = time.monotonic()
+    deadline = start + timeout
+    interval = WAIT_POLL_INITIAL
+    while True:
+        try:
+            value = condition(driver)
+            if value:
+                record_latency(step, time.monotonic() - start)
+                return value
+        except (NoSuchElementException, StaleElementReferenceException):
+            pass
+        now = time.monotonic()
+        if now >= deadline:
+            record_latency(f"{step}:timeout", now - start)
+            raise TimeoutException(f"Condition '{step}' non remplie après {timeout:g}s")
+        time.sleep(min(interval, deadline - now))
+        interval = min(interval * WAIT_BACKOFF, WAIT_POLL_MAX)
+
+def page_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+def element_present(selector):
+    def condition(driver):
+        return driver.find_element("css selector", selector)
+    return condition
+
+def element_visible(selector):
+    def condition(driver):
+        elem = driver.find_element("css selector", selector)
+        return elem if elem.is_displayed() else False
+    return condition
+
+def element_gone(selector):
+    def condition(driver):
+        return not any(e.is_displayed() for e in driver.find_elements("css selector", selector))
+    return condition
+
+def chat_loaded(target_url=None, previous_url=None):
+    # Conversation affichée (/c/<id>) puis titre non vide : le titre seul ne distingue pas deux chats
+    # consécutifs de même titre ("New chat", chat inchangé)
+    def condition(driver):
+        path = urlparse(driver.current_url).path.rstrip("/")
+        if target_url is not None and not target_url.startswith("title:"):
+            if path != urlparse(target_url).path.rstrip("/"):
+                return False
+        elif previous_url is not None and path == urlparse(previous_url).path.rstrip("/"):
+            return False
+        text = driver.find_element("css selector", SEL_CHAT_TITLE).text.strip()
+        return text or False
+    return condition
+
+def wait_chat_opened(driver, step, target_url=None, previous_url=None):
+    try:
+        wait_for(driver, chat_loaded(target_url, previous_url), step)
+        return True
+    except TimeoutException as e:
+        logging.warning(str(e))
+        return False
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
 
-def init_webdriver():
+def log_latency_histograms():
+    if not STEP_LATENCIES:
+        return
+    logging.info("Histogrammes de latence par étape :")
+    for step, values in sorted(STEP_LATENCIES.items()):
+        values = sorted(values)
+        counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for v in values:
+            idx = next((i for i, b in enumerate(LATENCY_BUCKETS) if v <= b), len(LATENCY_BUCKETS))
+            counts[idx] += 1
+        buckets = " ".join(f"<={b:g}s:{c}" for b, c in zip(LATENCY_BUCKETS, counts)) + f" >{LATENCY_BUCKETS[-1]:g}s:{counts[-1]}"
+        logging.info(f"  {step} n={len(values)} p50={percentile(values, 50):.3f}s "
+                     f"p95={percentile(values, 95):.3f}s max={values[-1]:.3f}s | {buckets}")
+
+def init_webdriver(profile_dir=BRAVE_PROFILE_TEMP):
     logging.info("Initialisation WebDriver Brave...")
     options = Options()
     options.binary_location = BRAVE_BINARY_PATH
-    options.add_argument(f"--user-data-dir={BRAVE_PROFILE_TEMP}")
+    options.add_argument(f"--user-data-dir={profile_dir}")
     options.add_argument("--disable-extensions")
     options.add_argument("--start-maximized")
+    if HEADLESS:
+        options.add_argument("--headless=new")
     try:
         driver = webdriver.Chrome(options=options)
-        logging.info(f"WebDriver Brave initialisé avec profil {BRAVE_PROFILE_TEMP}")
-        driver.get("https://chat.openai.com/")
-        time.sleep(5)
-        if not driver.current_url.startswith("https://chat.openai.com/"):
+        logging.info(f"WebDriver Brave initialisé avec profil {profile_dir}")
+        driver.get(CHATGPT_URL)
+        try:
+            wait_for(driver, page_ready, "page_load")
+            wait_for(driver, element_present(SEL_CHAT_ITEM), "sidebar_load")
+        except TimeoutException as e:
+            logging.warning(str(e))
+        if not driver.current_url.startswith(CHATGPT_URL):
             logging.error("ChatGPT non accessible, redirection échouée.")
             sys.exit(1)
         logging.info("ChatGPT chargé avec succès.")
@@ -117,18 +382,113 @@ def load_rules(rulesfile):
     logging.info(f"Règles chargées depuis {rulesfile}")
     return rules
 
-def get_chat_list(driver):
-    try:
-        chats_list = driver.find_elements("css selector", "div[class*='chatListItem']")  # Selector à adapter
-        logging.info(f"{len(chats_list)} chats détectés.")
-        return chats_list
-    except Exception as e:
-        logging.error(f"Erreur récupération liste chats : {str(e)}")
-        return []
+def get_rules_version(rules):
+    # En-tête "Version N" en début de fichier de règles, sinon hash du contenu
+    match = re.search(r"^\s*Version\s+(\S+)", rules, re.MULTILINE)
+    if match:
+        return match.group(1)
+    return hashlib.sha1(rules.encode("utf-8")).hexdigest()[:12]
+
+def title_hash(title):
+    return hashlib.sha1((title or "").strip().encode("utf-8")).hexdigest()
+
+def open_checkpoint(reset=False, check_same_thread=True):
+    conn = sqlite3.connect(CHECKPOINT_DB, check_same_thread=check_same_thread)
+    conn.execute("""CREATE TABLE IF NOT EXISTS chats (
+                        chat_id TEXT PRIMARY KEY,
+                        title_hash TEXT NOT NULL,
+                        title TEXT,
+                        rules_version TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        updated_at REAL NOT NULL)""")
+    if reset:
+        conn.execute("DELETE FROM chats")
+        logging.info(f"Checkpoint réinitialisé : {CHECKPOINT_DB}")
+    conn.commit()
+    logging.info(f"Checkpoint ouvert : {CHECKPOINT_DB}")
+    return conn
+
+def checkpoint_is_done(conn, chat_id, title, rules_version):
+    # Chat déjà traité si même version de règles et titre inchangé depuis
+    row = conn.execute("SELECT title_hash, rules_version FROM chats WHERE chat_id = ?",
+                       (chat_id,)).fetchone()
+    return row is not None and row[0] == title_hash(title) and row[1] == rules_version
+
+def checkpoint_mark(conn, chat_id, title, rules_version, status):
+    conn.execute("INSERT OR REPLACE INTO chats VALUES (?, ?, ?, ?, ?, ?)",
+                 (chat_id, title_hash(title), title, rules_version, status, time.time()))
+    conn.commit()
+
+# Un seul aller-retour WebDriver par lot : (lien, texte) de chaque entrée affichée, sans handle
+SNAPSHOT_CHATS_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map(function (e) {
+    var a = e.matches('a[href]') ? e : e.querySelector('a[href]');
+    return [a ? a.href : null, (e.innerText || '').trim()];
+});
+"""
+
+SCROLL_LAST_CHAT_JS = """
+var items = document.querySelectorAll(arguments[0]);
+if (items.length) { items[items.length - 1].scrollIntoView({block: 'end'}); }
+return items.length;
+"""
+
+def snapshot_chats(driver):
+    """[(chat_id, titre)] des entrées actuellement dans le DOM de la sidebar."""
+    # Identifiant stable : lien /c/<uuid> de l'entrée, sinon texte de l'entrée
+    return [(href or f"title:{text}", text)
+            for href, text in driver.execute_script(SNAPSHOT_CHATS_JS, SEL_CHAT_ITEM)]
+
+def iter_chats(driver):
+    """Générateur (chat_id, titre) sur la sidebar, dans l'ordre d'affichage.
+
+    Défile la sidebar au fur et à mesure pour charger la suite (liste virtualisée). Seuls les
+    identifiants sont gardés, jamais de handles ; la déduplication se fait contre le lot
+    précédent (entrées encore présentes après le défilement), la mémoire reste bornée par le
+    DOM de la sidebar et non par le nombre total de chats.
+    """
+    previous = set()
+    total = 0
+    current = snapshot_chats(driver)
+    if not current:
+        logging.info("Aucune entrée de chat dans la sidebar.")
+        return
+    while True:
+        for chat_id, title in current:
+            if chat_id not in previous:
+                total += 1
+                yield chat_id, title
+        previous = {chat_id for chat_id, _ in current}
+        driver.execute_script(SCROLL_LAST_CHAT_JS, SEL_CHAT_ITEM)
+
+        def new_entries(d):
+            snapshot = snapshot_chats(d)
+            return snapshot if any(chat_id not in previous for chat_id, _ in snapshot) else False
+
+        try:
+            current = wait_for(driver, new_entries, "sidebar_scroll", timeout=CHAT_SCROLL_TIMEOUT)
+        except TimeoutException:
+            logging.info(f"Fin de la sidebar : {total} chats énumérés.")
+            return
+        logging.debug(f"Sidebar défilée : {len(current)} entrées affichées ({total} énumérées)")
+
+def open_chat_item(driver, chat_id):
+    # Entrée retrouvée au moment de l'ouvrir (par son lien, sinon par son texte) : aucun
+    # handle n'est conservé pendant l'énumération, la sidebar peut avoir été re-rendue
+    if chat_id.startswith("title:"):
+        text = chat_id[len("title:"):]
+        for item in driver.find_elements("css selector", SEL_CHAT_ITEM):
+            if item.text.strip() == text:
+                item.click()
+                return
+        raise NoSuchElementException(f"Entrée de sidebar '{text}' introuvable")
+    path = urlparse(chat_id).path
+    link = wait_for(driver, element_present(f"a[href$='{path}']"), "chat_item_refind")
+    link.click()
 
 def extract_title_from_chat(driver):
     try:
-        title_element = driver.find_element("css selector", "h1[class*='chatTitle']")
+        title_element = driver.find_element("css selector", SEL_CHAT_TITLE)
         title = title_element.text.strip()
         logging.debug(f"Titre extrait : {title}")
         return title
@@ -142,89 +502,219 @@ def apply_new_title(driver, new_title, test_mode):
         print(f"[TEST] Nouveau titre à appliquer : {new_title}")
         return True
     try:
-        edit_button = driver.find_element("css selector", "button[class*='editTitle']")
+        edit_button = wait_for(driver, element_visible(SEL_EDIT_TITLE), "edit_button")
         edit_button.click()
-        time.sleep(1)
-        input_title = driver.find_element("css selector", "input[class*='titleInput']")
+        input_title = wait_for(driver, element_visible(SEL_TITLE_INPUT), "title_input")
         input_title.clear()
         input_title.send_keys(new_title)
-        save_button = driver.find_element("css selector", "button[class*='saveTitle']")
+        save_button = wait_for(driver, element_visible(SEL_SAVE_TITLE), "save_button")
         save_button.click()
+        wait_for(driver, element_gone(SEL_TITLE_INPUT), "title_saved")
         logging.info(f"Titre modifié en : {new_title}")
         print(f"Titre modifié en : {new_title}")
-        time.sleep(2)
         return True
     except Exception as e:
         logging.error(f"Erreur modification titre : {str(e)}")
         print("Erreur lors de la modification du titre.")
         return False
 
-def go_to_next_chat(driver, current_index, chats_count):
-    if current_index + 1 >= chats_count:
-        logging.info("Dernier chat atteint, fin de traitement.")
-        return False
-    try:
-        next_chat_selector = f"div[class*='chatListItem']:nth-child({current_index + 2})"
-        next_chat = driver.find_element("css selector", next_chat_selector)
-        next_chat.click()
-        time.sleep(3)
-        logging.info(f"Passage au chat index {current_index + 1}")
-        return True
-    except Exception as e:
-        logging.error(f"Erreur passage chat suivant : {str(e)}")
-        return False
-
-def process_chats(driver, rules, numchats, test_mode):
-    logging.info("Début du traitement des chats...")
-    chats_list = get_chat_list(driver)
-    if not chats_list:
-        print("Aucun chat trouvé.")
+def compute_new_title(rules, old_title):
+    new_title = old_title
+    for rule_line in rules.splitlines():
+        if "prefix:" in rule_line:
+            prefix = rule_line.split("prefix:")[1].strip()
+            new_title = f"{prefix} {new_title}"
+            break  # Extrait uniquement premier prefix
+    return new_title
+
+def retitle_current_chat(driver, rules, test_mode, label):
+    """Traite le chat ouvert. Retourne (statut, titre affiché après traitement).
+
+    Statut : "renamed", "unchanged" ou "failed".
+    """
+    old_title = extract_title_from_chat(driver)
+    if old_title is None:
+        logging.warning(f"Chat {label} titre introuvable, saut.")
+        return "failed", None
+
+    new_title = compute_new_title(rules, old_title)
+    if new_title == old_title:
+        logging.info(f"Aucune modification pour chat {label}")
+        return "unchanged", old_title
+    if not apply_new_title(driver, new_title, test_mode):
+        logging.error(f"Échec modification titre chat {label}")
+        return "failed", old_title
+    return "renamed", (old_title if test_mode else new_title)
+
+def list_pending_chats(driver, rules_version, checkpoint, limit):
+    """Liste (chat_id, titre) des chats non traités, dans l'ordre de la sidebar."""
+    pending = []
+    skipped = 0
+    for chat_id, sidebar_title in iter_chats(driver):
+        if len(pending) >= limit:
+            break
+        if checkpoint is not None and checkpoint_is_done(checkpoint, chat_id, sidebar_title, rules_version):
+            skipped += 1
+            continue
+        pending.append((chat_id, sidebar_title))
+    return pending, skipped
+
+class RateLimiter:
+    """Espacement minimal entre deux actions, partagé par tous les workers."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def worker_loop(worker_id, driver, work_queue, results, rules, rules_version,
+                test_mode, checkpoint, checkpoint_lock, limiter):
+    stats = {"worker": worker_id, "renamed": 0, "unchanged": 0, "failed": 0}
+    start = time.monotonic()
+    while True:
+        try:
+            chat_id, sidebar_title = work_queue.get_nowait()
+        except queue.Empty:
+            break
+        label = f"[w{worker_id}] {chat_id}"
+        limiter.acquire()
+        status = "failed"
+        try:
+            if chat_id.startswith("title:"):
+                logging.error(f"Chat {label} sans lien, impossible à ouvrir depuis un worker.")
+            else:
+                driver.get(chat_id)
+                if wait_chat_opened(driver, "chat_open", chat_id):
+                    status, shown_title = retitle_current_chat(driver, rules, test_mode, label)
+                    if status != "failed" and checkpoint is not None and not test_mode:
+                        with checkpoint_lock:
+                            checkpoint_mark(checkpoint, chat_id, shown_title, rules_version, status)
+                else:
+                    logging.warning(f"Chat {label} non chargé dans le délai, saut.")
+        except Exception as e:
+            logging.error(f"Erreur traitement chat {label} : {str(e)}")
+        stats[status] += 1
+        work_queue.task_done()
+    stats["elapsed"] = time.monotonic() - start
+    results.put(stats)
+
+def report_worker_stats(all_stats):
+    total = 0
+    print("Statistiques par worker :")
+    for stats in sorted(all_stats, key=lambda x: x["worker"]):
+        done = stats["renamed"] + stats["unchanged"] + stats["failed"]
+        total += done
+        per_min = done * 60.0 / stats["elapsed"] if stats["elapsed"] > 0 else 0.0
+        line = (f"  worker {stats['worker']} : {done} chats ({stats['renamed']} renommés, "
+                f"{stats['unchanged']} inchangés, {stats['failed']} échecs) en "
+                f"{stats['elapsed']:.1f}s, {per_min:.1f} chats/min")
+        logging.info(line.strip())
+        print(line)
+    return total
+
+def process_chats_parallel(driver, rules, numchats, test_mode, checkpoint, workers, rate):
+    logging.info(f"Début du traitement parallèle des chats ({workers} workers, {rate}/min)...")
+    rules_version = get_rules_version(rules)
+    pending, skipped = list_pending_chats(driver, rules_version, checkpoint, numchats)
+    if not pending:
+        print("Aucun chat en attente.")
         return
+    work_queue = queue.Queue()
+    for item in pending:
+        work_queue.put(item)
+    logging.info(f"{len(pending)} chats en file, {skipped} sautés (checkpoint).")
+
+    drivers = [driver]
+    for worker_id in range(1, min(workers, len(pending))):
+        profile_dir = worker_profile_dir(worker_id)
+        copy_profile(profile_dir)
+        drivers.append(init_webdriver(profile_dir))
+
+    if checkpoint is not None:
+        # Connexion partagée entre threads, écritures sérialisées par le verrou
+        checkpoint = open_checkpoint(check_same_thread=False)
+    checkpoint_lock = threading.Lock()
+    limiter = RateLimiter(rate)
+    results = queue.Queue()
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker_loop, name=f"worker-{n}",
+                                args=(n, d, work_queue, results, rules, rules_version,
+                                      test_mode, checkpoint, checkpoint_lock, limiter))
+               for n, d in enumerate(drivers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+    for extra in drivers[1:]:
+        extra.quit()
+    if checkpoint is not None:
+        checkpoint.close()
+
+    total = report_worker_stats([results.get() for _ in threads])
+    per_min = total * 60.0 / elapsed if elapsed > 0 else 0.0
+    logging.info(f"Traitement parallèle terminé : {total} chats en {elapsed:.1f}s ({per_min:.1f} chats/min).")
+    print(f"Total : {total} chats en {elapsed:.1f}s ({per_min:.1f} chats/min)")
+    log_latency_histograms()
+
+def process_chats(driver, rules, numchats, test_mode, checkpoint=None):
+    logging.info("Début du traitement des chats...")
+    total_to_process = numchats
+    rules_version = get_rules_version(rules)
+    logging.info(f"Version des règles : {rules_version}")
+
+    processed = 0
+    skipped = 0
+    for i, (chat_id, sidebar_title) in enumerate(iter_chats(driver)):
+        if processed >= total_to_process:
+            break
+        if checkpoint is not None and checkpoint_is_done(checkpoint, chat_id, sidebar_title, rules_version):
+            skipped += 1
+            continue
+        if skipped and processed == 0:
+            logging.info(f"Reprise au premier chat en attente : index {i} ({skipped} déjà traités)")
 
-    total_to_process = numchats if isinstance(numchats, int) else len(chats_list)
-    total_to_process = min(total_to_process, len(chats_list))
-
-    for i in range(total_to_process):
-        logging.info(f"Traitement du chat {i+1}/{total_to_process}")
+        processed += 1
+        logging.info(f"Traitement du chat {processed} (index {i}, {chat_id})")
+        previous_url = driver.current_url
         try:
-            chats_list[i].click()
-            time.sleep(3)
+            open_chat_item(driver, chat_id)
         except Exception as e:
             logging.error(f"Erreur ouverture chat index {i} : {str(e)}")
             continue
-
-        old_title = extract_title_from_chat(driver)
-        if old_title is None:
-            logging.warning(f"Chat {i+1} titre introuvable, saut.")
+        if not wait_chat_opened(driver, "chat_open", chat_id, previous_url):
+            logging.warning(f"Chat index {i} non chargé dans le délai, saut.")
             continue
 
-        new_title = old_title
-        for rule_line in rules.splitlines():
-            if "prefix:" in rule_line:
-                prefix = rule_line.split("prefix:")[1].strip()
-                new_title = f"{prefix} {new_title}"
-                break  # Extrait uniquement premier prefix
-
-        if new_title != old_title:
-            success = apply_new_title(driver, new_title, test_mode)
-            if not success:
-                logging.error(f"Échec modification titre chat {i+1}")
-        else:
-            logging.info(f"Aucune modification pour chat {i+1}")
-
-        if i + 1 < total_to_process:
-            if not go_to_next_chat(driver, i, total_to_process):
-                logging.info("Impossible de passer au chat suivant.")
-                break
+        status, shown_title = retitle_current_chat(driver, rules, test_mode, f"index {i}")
+        if status == "failed":
+            continue
+        if checkpoint is not None and not test_mode:
+            checkpoint_mark(checkpoint, chat_id, shown_title, rules_version, status)
 
-    logging.info("Traitement complet des chats terminé.")
+    if processed == 0 and skipped == 0:
+        print("Aucun chat trouvé.")
+    logging.info(f"Traitement complet des chats terminé : {processed} traités, {skipped} sautés (checkpoint).")
+    log_latency_histograms()
 
 def parse_args():
+    global WAIT_TIMEOUT
+    workers = DEFAULT_WORKERS
+    rate = DEFAULT_RATE
     exec_mode = False
     test_mode = False
     rulesfile = DEFAULT_RULES_FILE
     numchats = 3
     delete_flag = False
+    reset_checkpoint = False
 
     for arg in sys.argv[1:]:
         if arg == "--help":
@@ -246,6 +736,27 @@ def parse_args():
                 except ValueError:
                     print("Erreur : --numchats doit être un entier ou ALL.")
                     sys.exit(1)
+        elif arg.startswith("--timeout="):
+            try:
+                WAIT_TIMEOUT = float(arg.split("=",1)[1])
+            except ValueError:
+                print("Erreur : --timeout doit être un nombre de secondes.")
+                sys.exit(1)
+        elif arg.startswith("--workers=") or arg.startswith("--rate="):
+            name, val = arg[2:].split("=", 1)
+            try:
+                val = int(val)
+                if val < 1:
+                    raise ValueError
+            except ValueError:
+                print(f"Erreur : --{name} doit être un entier positif.")
+                sys.exit(1)
+            if name == "workers":
+                workers = val
+            else:
+                rate = val
+        elif arg == "--reset-checkpoint":
+            reset_checkpoint = True
         elif arg == "--delete":
             delete_flag = True
         else:
@@ -260,10 +771,10 @@ def parse_args():
     if numchats == "ALL":
         numchats = sys.maxsize
 
-    return exec_mode, test_mode, rulesfile, numchats, delete_flag
+    return exec_mode, test_mode, rulesfile, numchats, delete_flag, reset_checkpoint, workers, rate
 
 def main():
-    exec_mode, test_mode, rulesfile, numchats, delete_flag = parse_args()
+    exec_mode, test_mode, rulesfile, numchats, delete_flag, reset_checkpoint, workers, rate = parse_args()
 
     if delete_flag:
         delete_profile()
@@ -275,7 +786,14 @@ def main():
     rules = load_rules(rulesfile)
 
     if exec_mode or test_mode:
-        process_chats(driver, rules, numchats, test_mode)
+        checkpoint = open_checkpoint(reset_checkpoint)
+        try:
+            if workers > 1:
+                process_chats_parallel(driver, rules, numchats, test_mode, checkpoint, workers, rate)
+            else:
+                process_chats(driver, rules, numchats, test_mode, checkpoint)
+        finally:
+            checkpoint.close()
         driver.quit()
         sys.exit(0)
     else:
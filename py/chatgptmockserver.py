@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nom du script : chatgptmockserver.py
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Target usage : Serveur HTTP local imitant l'interface ChatGPT pour mesurer et tester hors ligne
+               chatgptcreationtitlefromcontent.py et chatgptcreationtitlefromcontent_loop.py.
+Version : v1.1 - Date : 2025-08-27
+
+Fonctionnalités :
+- Sidebar de N chats synthétiques, virtualisée optionnellement (--window entrées rendues)
+- Sélecteurs des deux scripts : chatListItem/chat-item, chatTitle, editTitle/edit-chat-title-button,
+  titleInput/chat-title-input, saveTitle, textarea, .chat-response, bouton stop
+- Latence configurable des appels API (--latency, --jitter), taux d'échec des renommages (--fail-rate)
+- Génération de réponse progressive mot à mot (--gen-words, --gen-delay) ; comme l'interface réelle, le
+  bouton stop n'existe dans le DOM que pendant la génération et la zone de saisie n'est créée qu'à
+  l'ouverture d'un chat (après la réponse de l'API)
+- Compteurs et latences serveur sur /api/stats, remise à zéro via POST /api/reset
+- Aucune dépendance hors bibliothèque standard, aucun accès réseau
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_PORT = 8765
+DEFAULT_CHATS = 200
+DEFAULT_LATENCY_MS = 50
+DEFAULT_GEN_WORDS = 12
+DEFAULT_GEN_DELAY_MS = 40
+ITEM_HEIGHT_PX = 36
+
+TOPICS = ["scan wifi", "création git repo", "script bash", "compression vidéo", "transcription whisper",
+          "firewall iptables", "profil brave", "cuisine", "nettoyage disque", "selenium"]
+
+PAGE_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>ChatGPT (mock)</title>
+<style>
+body { margin: 0; display: flex; font-family: sans-serif; height: 100vh; }
+#sidebar { width: 280px; height: 100vh; overflow-y: auto; border-right: 1px solid #ccc; }
+.chatListItem { height: __ITEM_HEIGHT__px; box-sizing: border-box; border-bottom: 1px solid #eee; }
+.chatListItem a { display: block; height: 100%; padding: 8px; color: #000; text-decoration: none;
+                  overflow: hidden; white-space: nowrap; }
+.chatListItem.active { background: #e8e8e8; }
+#main { flex: 1; padding: 16px; overflow-y: auto; }
+.hidden { display: none; }
+.chat-response { border-top: 1px solid #ddd; padding: 8px 0; white-space: pre-wrap; }
+</style></head>
+<body>
+<div id="sidebar"><div id="spacer-top"></div><div id="items"></div><div id="spacer-bottom"></div></div>
+<div id="main">
+  <div id="empty">Sélectionner un chat</div>
+  <div id="chat" class="hidden">
+    <h1 class="chatTitle" id="title"></h1>
+    <button class="editTitle edit-chat-title-button" id="edit">Modifier</button>
+    <input class="titleInput chat-title-input hidden" id="title-input">
+    <button class="saveTitle hidden" id="save">Enregistrer</button>
+    <div id="messages"></div>
+    <div id="composer"></div>
+  </div>
+</div>
+<script>
+var CFG = __CONFIG__;
+var chats = [];
+var current = null;
+var generating = false;
+var sidebar = document.getElementById('sidebar');
+
+function api(method, path, body) {
+  return fetch(path, {method: method, headers: {'Content-Type': 'application/json'},
+                      body: body ? JSON.stringify(body) : undefined})
+    .then(function (r) { if (!r.ok) { throw new Error('HTTP ' + r.status); } return r.json(); });
+}
+
+function itemHtml(c) {
+  return '<div class="chatListItem chat-item' + (current && current.id === c.id ? ' active' : '') +
+         '" data-id="' + c.id + '"><a href="/c/' + c.id + '"><span></span></a></div>';
+}
+
+function renderSidebar() {
+  var first = 0, last = chats.length;
+  if (CFG.window > 0) {
+    first = Math.max(0, Math.floor(sidebar.scrollTop / CFG.itemHeight) - 2);
+    last = Math.min(chats.length, first + CFG.window);
+  }
+  document.getElementById('spacer-top').style.height = (first * CFG.itemHeight) + 'px';
+  document.getElementById('spacer-bottom').style.height = ((chats.length - last) * CFG.itemHeight) + 'px';
+  var slice = chats.slice(first, last);
+  var box = document.getElementById('items');
+  box.innerHTML = slice.map(itemHtml).join('');
+  Array.prototype.forEach.call(box.querySelectorAll('.chatListItem'), function (el, i) {
+    el.querySelector('span').textContent = slice[i].title;
+  });
+}
+
+function openChat(id, push) {
+  api('GET', '/api/chats/' + id).then(function (c) {
+    current = c;
+    if (push) { history.pushState({}, '', '/c/' + id); }
+    document.getElementById('empty').classList.add('hidden');
+    document.getElementById('chat').classList.remove('hidden');
+    document.getElementById('title').textContent = c.title;
+    var msgs = document.getElementById('messages');
+    msgs.innerHTML = '';
+    c.responses.forEach(function (t) {
+      var d = document.createElement('div'); d.className = 'chat-response'; d.textContent = t; msgs.appendChild(d);
+    });
+    renderComposer();
+    renderSidebar();
+  });
+}
+
+function renderComposer() {
+  var composer = document.getElementById('composer');
+  if (composer.querySelector('textarea')) { return; }
+  var box = document.createElement('textarea');
+  box.id = 'prompt'; box.rows = 4; box.cols = 80;
+  box.addEventListener('keydown', onPromptKey);
+  composer.appendChild(box);
+}
+
+function streamResponse(text) {
+  var words = text.split(' ');
+  var d = document.createElement('div');
+  d.className = 'chat-response';
+  document.getElementById('messages').appendChild(d);
+  var stop = document.createElement('button');
+  stop.setAttribute('data-testid', 'stop-button');
+  stop.textContent = 'Stop';
+  document.getElementById('composer').appendChild(stop);
+  var i = 0;
+  (function next() {
+    if (i >= words.length) { stop.remove(); generating = false; return; }
+    d.textContent += (i ? ' ' : '') + words[i++];
+    setTimeout(next, CFG.genDelay);
+  })();
+}
+
+sidebar.addEventListener('scroll', function () { if (CFG.window > 0) { renderSidebar(); } });
+sidebar.addEventListener('click', function (e) {
+  var item = e.target.closest('.chatListItem');
+  if (!item) { return; }
+  e.preventDefault();
+  openChat(item.getAttribute('data-id'), true);
+});
+document.getElementById('edit').addEventListener('click', function () {
+  var input = document.getElementById('title-input');
+  input.value = current.title;
+  input.classList.remove('hidden');
+  document.getElementById('save').classList.remove('hidden');
+  input.focus();
+});
+function saveTitle() {
+  var title = document.getElementById('title-input').value;
+  api('POST', '/api/chats/' + current.id + '/title', {title: title}).then(function (c) {
+    current.title = c.title;
+    chats.forEach(function (x) { if (x.id === c.id) { x.title = c.title; } });
+    document.getElementById('title').textContent = c.title;
+    renderSidebar();
+  }).catch(function () {}).then(function () {
+    document.getElementById('title-input').classList.add('hidden');
+    document.getElementById('save').classList.add('hidden');
+  });
+}
+document.getElementById('save').addEventListener('click', saveTitle);
+document.getElementById('title-input').addEventListener('keydown', function (e) {
+  if (e.key === 'Enter') { e.preventDefault(); saveTitle(); }
+});
+function onPromptKey(e) {
+  if (e.key !== 'Enter' || e.shiftKey) { return; }
+  e.preventDefault();
+  if (generating) { return; }
+  var box = e.target;
+  var text = box.value;
+  box.value = '';
+  generating = true;
+  api('POST', '/api/chats/' + current.id + '/messages', {text: text})
+    .then(function (r) { streamResponse(r.text); })
+    .catch(function () { generating = false; });
+}
+
+api('GET', '/api/chats').then(function (r) {
+  chats = r.chats;
+  renderSidebar();
+  var m = location.pathname.match(/^\\/c\\/([^\\/]+)/);
+  if (m) { openChat(m[1], false); }
+});
+</script>
+</body></html>
+"""
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class MockChatState:
+    """Chats synthétiques et compteurs, partagés entre les threads du serveur."""
+
+    def __init__(self, nb_chats, seed=0):
+        self.nb_chats = nb_chats
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        rnd = random.Random(self.seed)
+        with self.lock:
+            self.chats = []
+            for i in range(self.nb_chats):
+                topic = rnd.choice(TOPICS)
+                self.chats.append({"id": f"mock-{i:05d}", "title": f"{topic} {i}", "responses": []})
+            self.by_id = {c["id"]: c for c in self.chats}
+            self.counters = {"renames": 0, "rename_failures": 0, "messages": 0, "requests": 0}
+            self.latencies = {}
+
+    def record(self, endpoint, elapsed):
+        with self.lock:
+            self.counters["requests"] += 1
+            self.latencies.setdefault(endpoint, []).append(elapsed)
+
+    def stats(self):
+        with self.lock:
+            lat = {}
+            for endpoint, values in self.latencies.items():
+                values = sorted(values)
+                lat[endpoint] = {"n": len(values), "p50": round(percentile(values, 50), 4),
+                                 "p95": round(percentile(values, 95), 4)}
+            return {"counters": dict(self.counters), "latency": lat}
+
+
+def make_handler(state, config):
+    page = (PAGE_HTML.replace("__CONFIG__", json.dumps({"window": config["window"],
+                                                        "genDelay": config["gen_delay_ms"],
+                                                        "itemHeight": ITEM_HEIGHT_PX}))
+            .replace("__ITEM_HEIGHT__", str(ITEM_HEIGHT_PX)))
+    rnd = random.Random(config["seed"])
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            if config["verbose"]:
+                sys.stderr.write("%s - %s\n" % (self.address_string(), fmt % args))
+
+        def simulate_latency(self):
+            delay = config["latency_ms"] + rnd.uniform(0, config["jitter_ms"])
+            time.sleep(delay / 1000.0)
+
+        def send_json(self, obj, status=200):
+            body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            start = time.monotonic()
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if not parts or parts[0] == "c":
+                body = page.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if parts == ["api", "stats"]:
+                self.send_json(state.stats())
+                return
+            if parts == ["api", "chats"]:
+                self.simulate_latency()
+                query = parse_qs(url.query)
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", [str(state.nb_chats)])[0])
+                with state.lock:
+                    chats = [{"id": c["id"], "title": c["title"]} for c in state.chats[offset:offset + limit]]
+                self.send_json({"chats": chats, "total": state.nb_chats})
+                state.record("list", time.monotonic() - start)
+                return
+            if len(parts) == 3 and parts[:2] == ["api", "chats"]:
+                self.simulate_latency()
+                with state.lock:
+                    chat = state.by_id.get(parts[2])
+                    chat = dict(chat, responses=list(chat["responses"])) if chat else None
+                if chat is None:
+                    self.send_json({"error": "not found"}, 404)
+                else:
+                    self.send_json(chat)
+                state.record("open", time.monotonic() - start)
+                return
+            self.send_json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            start = time.monotonic()
+            parts = [p for p in urlparse(self.path).path.split("/") if p]
+            if parts == ["api", "reset"]:
+                state.reset()
+                self.send_json({"ok": True})
+                return
+            if len(parts) != 4 or parts[:2] != ["api", "chats"]:
+                self.send_json({"error": "not found"}, 404)
+                return
+            payload = self.read_json()
+            self.simulate_latency()
+            with state.lock:
+                chat = state.by_id.get(parts[2])
+            if chat is None:
+                self.send_json({"error": "not found"}, 404)
+                return
+            if parts[3] == "title":
+                if rnd.random() < config["fail_rate"]:
+                    with state.lock:
+                        state.counters["rename_failures"] += 1
+                    self.send_json({"error": "rename failed"}, 500)
+                else:
+                    with state.lock:
+                        chat["title"] = payload.get("title", chat["title"]).strip()
+                        state.counters["renames"] += 1
+                        result = {"id": chat["id"], "title": chat["title"]}
+                    self.send_json(result)
+                state.record("rename", time.monotonic() - start)
+            elif parts[3] == "messages":
+                words = ["mot%d" % i for i in range(config["gen_words"])]
+                with state.lock:
+                    text = f"MOCK {chat['title']}\n" + " ".join(words)
+                    chat["responses"].append(text)
+                    state.counters["messages"] += 1
+                self.send_json({"text": text})
+                state.record("message", time.monotonic() - start)
+            else:
+                self.send_json({"error": "not found"}, 404)
+
+    return Handler
+
+
+def make_server(port=DEFAULT_PORT, chats=DEFAULT_CHATS, latency_ms=DEFAULT_LATENCY_MS, jitter_ms=0,
+                window=0, gen_words=DEFAULT_GEN_WORDS, gen_delay_ms=DEFAULT_GEN_DELAY_MS,
+                fail_rate=0.0, seed=0, verbose=False, host="127.0.0.1"):
+    """Crée le serveur (port 0 = port libre) ; l'état est accessible via server.state."""
+    config = {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "window": window,
+              "gen_words": gen_words, "gen_delay_ms": gen_delay_ms, "fail_rate": fail_rate,
+              "seed": seed, "verbose": verbose}
+    state = MockChatState(chats, seed)
+    server = ThreadingHTTPServer((host, port), make_handler(state, config))
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serveur local imitant ChatGPT pour tests et benchmarks hors ligne.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port d\'écoute (défaut: {DEFAULT_PORT}).')
+    parser.add_argument('--chats', type=int, default=DEFAULT_CHATS, help=f'Nombre de chats synthétiques (défaut: {DEFAULT_CHATS}).')
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY_MS, help=f'Latence API en ms (défaut: {DEFAULT_LATENCY_MS}).')
+    parser.add_argument('--jitter', type=float, default=0, help='Gigue aléatoire ajoutée à la latence, en ms (défaut: 0).')
+    parser.add_argument('--window', type=int, default=0, help='Entrées rendues dans la sidebar virtualisée, 0 = toutes (défaut: 0).')
+    parser.add_argument('--gen-words', type=int, default=DEFAULT_GEN_WORDS, help=f'Mots par réponse générée (défaut: {DEFAULT_GEN_WORDS}).')
+    parser.add_argument('--gen-delay', type=float, default=DEFAULT_GEN_DELAY_MS, help=f'Délai entre deux mots générés en ms (défaut: {DEFAULT_GEN_DELAY_MS}).')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Probabilité d\'échec d\'un renommage (défaut: 0).')
+    parser.add_argument('--seed', type=int, default=0, help='Graine des titres et aléas (défaut: 0).')
+    parser.add_argument('--verbose', action='store_true', help='Affiche chaque requête HTTP.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = make_server(args.port, args.chats, args.latency, args.jitter, args.window, args.gen_words,
+                         args.gen_delay, args.fail_rate, args.seed, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serveur mock ChatGPT : http://{host}:{port}/ ({args.chats} chats)")
+    print(f"  export CHATGPT_URL=http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.state.stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
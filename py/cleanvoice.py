@@ -1,66 +1,345 @@
 #!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Nom du script : cleanvoice.py
+Target usage : Désinstallation de la chaîne voix -> Joplin (venv, modèles VOSK, archives, scripts, notes).
+Version : v2.1 - Date : 2025-08-27
+
+- Arborescences supprimées en parallèle (--jobs workers), fichiers et octets comptés pendant la suppression
+- Notes Joplin « Commande vocale » : API de données (service Web Clipper, --joplin-url / JOPLIN_TOKEN),
+  recherche paginée puis suppressions concurrentes sur connexions persistantes ; sans jeton, jeton refusé
+  (401/403) ou API injoignable, une seule session CLI (joplin batch) au lieu d'un « joplin rm » par note
+- --dry-run : rien n'est supprimé, octets / fichiers / notes qui seraient libérés affichés
+- Résumé chronométré par étape (tester hors ligne avec joplinmockserver.py), code retour 1 en cas d'erreur
+"""
+
 import os
-import shutil
-import subprocess
 import sys
 import json
+import stat
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlencode
 
-dry_run = "--dry-run" in sys.argv
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_JOPLIN_URL = "http://127.0.0.1:41184"
+DEFAULT_QUERY = "Commande vocale"
+SEARCH_PAGE_SIZE = 100
+API_WORKERS = 4
 
-def delete_path(path):
-    if os.path.exists(path):
-        if dry_run:
-            print(f"[DRY-RUN] 🗑️ {path}")
-        else:
-            if os.path.isfile(path):
-                os.remove(path)
-            else:
-                shutil.rmtree(path)
-            print(f"🗑️ Supprimé : {path}")
-
-print("🔻 Arrêt des processus voice2cmd.py...")
-if dry_run:
-    print("[DRY-RUN] pkill -f voice2cmd.py")
-else:
-    subprocess.run(["pkill", "-f", "voice2cmd.py"], stderr=subprocess.DEVNULL)
-
-# 🧹 Supprimer l'environnement virtuel
-delete_path(os.path.expanduser("~/venv-voix-joplin"))
-
-# 🗑️ Supprimer les modèles VOSK
-for model in ["~/vosk-model-fr-0.22", "~/vosk-model-small-fr-0.22"]:
-    delete_path(os.path.expanduser(model))
-
-# 🗑️ Supprimer les archives téléchargées
-for archive in ["~/vosk-fr.zip", "~/vosk-model-fr-0.22.zip"]:
-    delete_path(os.path.expanduser(archive))
-
-# 🗑️ Supprimer les scripts installés
-for script in [
+TARGETS = [
+    # 🧹 Environnement virtuel
+    "~/venv-voix-joplin",
+    # 🗑️ Modèles VOSK
+    "~/vosk-model-fr-0.22",
+    "~/vosk-model-small-fr-0.22",
+    # 🗑️ Archives téléchargées
+    "~/vosk-fr.zip",
+    "~/vosk-model-fr-0.22.zip",
+    # 🗑️ Scripts installés
     "~/Security/scripts/divers/py/voice2cmd.py",
     "~/Security/scripts/divers/py/setupenv_voix_joplin.sh",
-    "~/Security/scripts/divers/py/setupenv_voix_joplin_top.sh"
-]:
-    delete_path(os.path.expanduser(script))
+    "~/Security/scripts/divers/py/setupenv_voix_joplin_top.sh",
+]
+
+
+def human_size(size):
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if size < 1024 or unit == "Go":
+            return f"{size:.0f} {unit}" if unit == "o" else f"{size:.1f} {unit}"
+        size /= 1024.0
+
+
+class Tally:
+    """Fichiers, dossiers et octets (blocs alloués, comme du) comptés par les workers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = 0
+        self.dirs = 0
+        self.bytes = 0
+        self.errors = []
+
+    def add(self, files=0, dirs=0, size=0):
+        with self.lock:
+            self.files += files
+            self.dirs += dirs
+            self.bytes += size
+
+    def error(self, path, exc):
+        with self.lock:
+            self.errors.append(f"{path} : {exc.strerror or exc}")
+
+
+def remove_tree(path, tally, dry_run):
+    """Supprime (ou mesure) une arborescence sans suivre les liens, en la parcourant une seule fois."""
+    files = dirs = size = 0
+    stack = [(path, False)]
+    while stack:
+        current, scanned = stack.pop()
+        if scanned:
+            if not dry_run:
+                try:
+                    os.rmdir(current)
+                except OSError as exc:
+                    tally.error(current, exc)
+                    continue
+            dirs += 1
+            continue
+        stack.append((current, True))
+        try:
+            entries = list(os.scandir(current))
+        except OSError as exc:
+            tally.error(current, exc)
+            stack.pop()
+            continue
+        for entry in entries:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError as exc:
+                tally.error(entry.path, exc)
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                stack.append((entry.path, False))
+                continue
+            if not dry_run:
+                try:
+                    os.unlink(entry.path)
+                except OSError as exc:
+                    tally.error(entry.path, exc)
+                    continue
+            files += 1
+            size += st.st_blocks * 512
+    tally.add(files, dirs, size)
+
+
+def remove_entry(path, tally, dry_run):
+    try:
+        st = os.lstat(path)
+    except OSError as exc:
+        tally.error(path, exc)
+        return
+    if stat.S_ISDIR(st.st_mode):
+        remove_tree(path, tally, dry_run)
+        return
+    if not dry_run:
+        try:
+            os.unlink(path)
+        except OSError as exc:
+            tally.error(path, exc)
+            return
+    tally.add(files=1, size=st.st_blocks * 512)
+
+
+def delete_paths(paths, jobs, dry_run):
+    """Cibles découpées en sous-arborescences de premier niveau réparties sur le pool, racines supprimées en dernier."""
+    tally = Tally()
+    present = [p for p in paths if os.path.lexists(p)]
+    roots, units = [], []
+    for path in present:
+        if os.path.isdir(path) and not os.path.islink(path):
+            roots.append(path)
+            try:
+                units.extend(entry.path for entry in os.scandir(path))
+            except OSError as exc:
+                tally.error(path, exc)
+        else:
+            units.append(path)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for _ in pool.map(lambda unit: remove_entry(unit, tally, dry_run), units):
+            pass
+    for root in roots:
+        if not dry_run:
+            try:
+                os.rmdir(root)
+            except OSError as exc:
+                tally.error(root, exc)
+                continue
+        tally.add(dirs=1)
+    for path in present:
+        print(f"[DRY-RUN] 🗑️ {path}" if dry_run else f"🗑️ Supprimé : {path}")
+    return tally, len(present)
+
+
+class JoplinHTTPError(OSError):
+    """Réponse HTTP en erreur de l'API Joplin (status conservé pour le repli sur le CLI)."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
 
-# 🗑️ Supprimer les notes Joplin contenant "Commande vocale"
-print("🔍 Recherche des notes Joplin liées...")
-try:
+
+class JoplinAPI:
+    """Client minimal de l'API de données Joplin (une connexion persistante par thread)."""
+
+    def __init__(self, url, token, timeout=10):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 41184
+        self.token = token
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def request(self, method, path, params=None):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        query = dict(params or {}, token=self.token) if self.token else dict(params or {})
+        try:
+            conn.request(method, f"{path}?{urlencode(query)}" if query else path)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            self.local.conn = None
+            raise OSError(f"{method} {path} : {exc}") from exc
+        if response.status >= 400:
+            raise JoplinHTTPError(f"{method} {path} : HTTP {response.status}", response.status)
+        return body
+
+    def ping(self):
+        try:
+            return self.request("GET", "/ping").startswith(b"JoplinClipperServer")
+        except OSError:
+            return False
+
+    def search_notes(self, query):
+        """Tous les identifiants d'abord : supprimer pendant la pagination décalerait les pages."""
+        ids, page = [], 1
+        while True:
+            data = json.loads(self.request("GET", "/search", {"query": query, "fields": "id,title",
+                                                              "limit": SEARCH_PAGE_SIZE, "page": page}))
+            ids.extend(item["id"] for item in data.get("items", []))
+            if not data.get("has_more"):
+                return ids
+            page += 1
+
+    def delete_notes(self, ids):
+        def delete(note_id):
+            try:
+                self.request("DELETE", f"/notes/{note_id}")
+                return True
+            except OSError as exc:
+                print(f"⚠️ Note {note_id} non supprimée : {exc}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=API_WORKERS) as pool:
+            return sum(pool.map(delete, ids))
+
+
+def clean_joplin_cli(query, dry_run):
+    """Repli CLI : une recherche puis un seul « joplin batch » contenant toutes les suppressions."""
     if dry_run:
-        print("[DRY-RUN] joplin search 'Commande vocale' --json")
+        print(f"[DRY-RUN] joplin search '{query}' --json")
+        return 0, "CLI"
+    result = subprocess.run(["joplin", "search", query, "--json"], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(f"joplin search : code {result.returncode} {result.stderr.strip()}".rstrip())
+    if not result.stdout.strip():
+        return 0, "CLI"
+    ids = [note["id"] for note in json.loads(result.stdout)]
+    if not ids:
+        return 0, "CLI"
+    with tempfile.NamedTemporaryFile("w", suffix=".joplin", delete=False) as batch:
+        batch.writelines(f"rm -f {note_id}\n" for note_id in ids)
+    try:
+        result = subprocess.run(["joplin", "batch", batch.name])
+    finally:
+        os.unlink(batch.name)
+    if result.returncode != 0:
+        raise OSError(f"joplin batch : code {result.returncode}, {len(ids)} note(s) peut-être non supprimée(s)")
+    return len(ids), "CLI (batch)"
+
+
+def clean_joplin(args):
+    # /ping répond sans jeton : sans JOPLIN_TOKEN, /search serait refusé (403)
+    if not args.joplin_token:
+        print("ℹ️ Pas de jeton API Joplin (--joplin-token / JOPLIN_TOKEN), CLI utilisé.")
+        return clean_joplin_cli(args.query, args.dry_run)
+    api = JoplinAPI(args.joplin_url, args.joplin_token)
+    if not api.ping():
+        print(f"ℹ️ API Joplin injoignable ({args.joplin_url}), repli sur le CLI.")
+        return clean_joplin_cli(args.query, args.dry_run)
+    try:
+        ids = api.search_notes(args.query)
+    except JoplinHTTPError as exc:
+        if exc.status not in (401, 403):
+            raise
+        print(f"ℹ️ Jeton API Joplin refusé (HTTP {exc.status}), repli sur le CLI.")
+        return clean_joplin_cli(args.query, args.dry_run)
+    if args.dry_run:
+        print(f"[DRY-RUN] {len(ids)} note(s) Joplin à supprimer via {args.joplin_url}")
+        return len(ids), "API"
+    return api.delete_notes(ids), "API"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Désinstallation voix -> Joplin (venv, modèles VOSK, scripts, notes).")
+    parser.add_argument('--dry-run', action='store_true', help='Simulation : affiche ce qui serait supprimé et libéré.')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help=f'Suppressions parallèles (défaut: {DEFAULT_JOBS}).')
+    parser.add_argument('--joplin-url', default=os.environ.get("JOPLIN_URL", DEFAULT_JOPLIN_URL),
+                        help=f'API de données Joplin (défaut: $JOPLIN_URL ou {DEFAULT_JOPLIN_URL}).')
+    parser.add_argument('--joplin-token', default=os.environ.get("JOPLIN_TOKEN", ""),
+                        help='Jeton de l\'API Joplin (défaut: $JOPLIN_TOKEN).')
+    parser.add_argument('--query', default=DEFAULT_QUERY, help=f'Recherche des notes à supprimer (défaut: "{DEFAULT_QUERY}").')
+    parser.add_argument('--skip-joplin', action='store_true', help='Ne touche pas aux notes Joplin.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    timings = []
+    start = time.monotonic()
+
+    print("🔻 Arrêt des processus voice2cmd.py...")
+    if args.dry_run:
+        print("[DRY-RUN] pkill -f voice2cmd.py")
     else:
-        result = subprocess.run(
-            ["joplin", "search", "Commande vocale", "--json"],
-            capture_output=True, text=True
-        )
-        if result.stdout.strip():
-            notes = json.loads(result.stdout)
-            for note in notes:
-                subprocess.run(["joplin", "rm", note["id"]])
-            print(f"✅ {len(notes)} note(s) supprimée(s).")
-        else:
-            print("✅ Aucune note Joplin trouvée.")
-except FileNotFoundError:
-    print("⚠️ Joplin CLI introuvable, étape ignorée.")
+        subprocess.run(["pkill", "-f", "voice2cmd.py"], stderr=subprocess.DEVNULL)
+    timings.append(("Processus", time.monotonic() - start, ""))
+
+    step = time.monotonic()
+    tally, present = delete_paths([os.path.expanduser(p) for p in TARGETS], max(1, args.jobs), args.dry_run)
+    verb = "à libérer" if args.dry_run else "libérés"
+    timings.append(("Fichiers", time.monotonic() - step,
+                    f"{present}/{len(TARGETS)} cible(s), {tally.files} fichier(s), {tally.dirs} dossier(s), "
+                    f"{human_size(tally.bytes)} {verb}"))
+    for error in tally.errors:
+        print(f"⚠️ {error}")
+
+    joplin_failed = False
+    if not args.skip_joplin:
+        print("🔍 Recherche des notes Joplin liées...")
+        step = time.monotonic()
+        try:
+            notes, method = clean_joplin(args)
+            timings.append(("Joplin", time.monotonic() - step,
+                            f"{notes} note(s) {'à supprimer' if args.dry_run else 'supprimée(s)'} via {method}"))
+        except FileNotFoundError:
+            print("⚠️ Joplin CLI introuvable, étape ignorée.")
+        except (OSError, ValueError) as exc:
+            print(f"⚠️ Erreur Joplin : {exc}")
+            joplin_failed = True
+
+    print("\n⏱️ Résumé" + (" (simulation)" if args.dry_run else "") + " :")
+    for name, elapsed, detail in timings:
+        print(f"  {name:<10} {elapsed:7.2f}s  {detail}")
+    print(f"  {'Total':<10} {time.monotonic() - start:7.2f}s"
+          + (f"  ({len(tally.errors)} erreur(s))" if tally.errors else ""))
+    failed = bool(tally.errors) or joplin_failed
+    if args.dry_run:
+        print("✅ Simulation terminée.")
+    else:
+        print("⚠️ Désinstallation terminée avec des erreurs." if failed else "✅ Désinstallation complète terminée.")
+    return 1 if failed else 0
+
 
-print("✅ Désinstallation complète terminée." if not dry_run else "✅ Simulation terminée.")
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nom du script : joplinmockserver.py
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Target usage : Serveur HTTP local imitant l'API de données Joplin (service Web Clipper) pour tester
+               hors ligne la suppression des notes de cleanvoice.py.
+Version : v1.0 - Date : 2025-08-26
+
+Fonctionnalités :
+- GET /ping, GET /search?query=&fields=&limit=&page= (pagination has_more), GET /notes, DELETE /notes/:id
+- N notes « Commande vocale » (--notes) et autres notes (--other), jeton optionnel (--token)
+- Latence configurable par requête (--latency), connexions HTTP/1.1 persistantes
+- Compteurs sur /api/stats, remise à zéro via POST /api/reset
+- Aucune dépendance hors bibliothèque standard, aucun accès réseau
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_PORT = 41185
+DEFAULT_NOTES = 300
+DEFAULT_OTHER = 50
+DEFAULT_LATENCY_MS = 5
+MAX_PAGE_SIZE = 100
+
+
+class MockJoplinState:
+    """Notes synthétiques et compteurs, partagés entre les threads du serveur."""
+
+    def __init__(self, nb_notes, nb_other):
+        self.nb_notes = nb_notes
+        self.nb_other = nb_other
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.notes = {}
+            for i in range(self.nb_notes):
+                self.notes[f"{i:032x}"] = {"title": f"Commande vocale {i}", "body": "ouvrir le terminal"}
+            for i in range(self.nb_other):
+                self.notes[f"{self.nb_notes + i:032x}"] = {"title": f"Note {i}", "body": "liste de courses"}
+            self.counters = {"requests": 0, "searches": 0, "deletes": 0, "connections": 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def search(self, query):
+        words = query.lower().split()
+        with self.lock:
+            return [{"id": note_id, "title": note["title"]} for note_id, note in sorted(self.notes.items())
+                    if all(w in (note["title"] + " " + note["body"]).lower() for w in words)]
+
+    def stats(self):
+        with self.lock:
+            return {"counters": dict(self.counters), "notes": len(self.notes)}
+
+
+def make_handler(state, config):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            state.count("connections")
+
+        def log_message(self, fmt, *args):
+            if config["verbose"]:
+                sys.stderr.write("%s - %s\n" % (self.address_string(), fmt % args))
+
+        def send_body(self, body, status=200, content_type="application/json; charset=utf-8"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json(self, obj, status=200):
+            self.send_body(json.dumps(obj, ensure_ascii=False).encode("utf-8"), status)
+
+        def authorized(self, query):
+            if config["token"] and query.get("token", [""])[0] != config["token"]:
+                self.send_json({"error": "Invalid \"token\" parameter"}, 403)
+                return False
+            return True
+
+        def begin(self):
+            state.count("requests")
+            time.sleep(config["latency_ms"] / 1000.0)
+            url = urlparse(self.path)
+            return [p for p in url.path.split("/") if p], parse_qs(url.query)
+
+        def do_GET(self):
+            parts, query = self.begin()
+            if parts == ["ping"]:
+                self.send_body(b"JoplinClipperServer", content_type="text/plain")
+                return
+            if parts == ["api", "stats"]:
+                self.send_json(state.stats())
+                return
+            if not self.authorized(query):
+                return
+            if parts in (["search"], ["notes"]):
+                state.count("searches")
+                items = state.search(query.get("query", [""])[0])
+                limit = min(MAX_PAGE_SIZE, int(query.get("limit", [MAX_PAGE_SIZE])[0]))
+                page = max(1, int(query.get("page", ["1"])[0]))
+                chunk = items[(page - 1) * limit:page * limit]
+                self.send_json({"items": chunk, "has_more": page * limit < len(items)})
+                return
+            self.send_json({"error": "Not Found"}, 404)
+
+        def do_DELETE(self):
+            parts, query = self.begin()
+            if not self.authorized(query):
+                return
+            if len(parts) == 2 and parts[0] == "notes":
+                with state.lock:
+                    found = state.notes.pop(parts[1], None) is not None
+                if not found:
+                    self.send_json({"error": "Not Found"}, 404)
+                    return
+                state.count("deletes")
+                self.send_body(b"")
+                return
+            self.send_json({"error": "Not Found"}, 404)
+
+        def do_POST(self):
+            parts, _ = self.begin()
+            if parts == ["api", "reset"]:
+                state.reset()
+                self.send_json({"ok": True})
+                return
+            self.send_json({"error": "Not Found"}, 404)
+
+    return Handler
+
+
+def make_server(port=DEFAULT_PORT, notes=DEFAULT_NOTES, other=DEFAULT_OTHER, latency_ms=DEFAULT_LATENCY_MS,
+                token="", verbose=False, host="127.0.0.1"):
+    """Crée le serveur (port 0 = port libre) ; l'état est accessible via server.state."""
+    config = {"latency_ms": latency_ms, "token": token, "verbose": verbose}
+    state = MockJoplinState(notes, other)
+    server = ThreadingHTTPServer((host, port), make_handler(state, config))
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serveur local imitant l'API de données Joplin pour tests hors ligne.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port d\'écoute (défaut: {DEFAULT_PORT}).')
+    parser.add_argument('--notes', type=int, default=DEFAULT_NOTES, help=f'Notes « Commande vocale » (défaut: {DEFAULT_NOTES}).')
+    parser.add_argument('--other', type=int, default=DEFAULT_OTHER, help=f'Autres notes, à conserver (défaut: {DEFAULT_OTHER}).')
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY_MS, help=f'Latence par requête en ms (défaut: {DEFAULT_LATENCY_MS}).')
+    parser.add_argument('--token', default="", help='Jeton exigé (défaut: aucun).')
+    parser.add_argument('--verbose', action='store_true', help='Affiche chaque requête HTTP.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = make_server(args.port, args.notes, args.other, args.latency, args.token, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serveur mock Joplin : http://{host}:{port}/ ({args.notes} + {args.other} notes)")
+    print(f"  python3 cleanvoice.py --joplin-url http://{host}:{port}" + (f" --joplin-token {args.token}" if args.token else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.state.stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,9 @@ function usage() {
   echo "  --test                  Mode test : simule sans modifier les titres"
   echo "  --rulesfile=<fichier>   Chemin vers le fichier de règles (défaut: RuleCreationTitre.txt)"
   echo "  --numchats=<nombre|ALL> Nombre de chats à traiter ou ALL (défaut: 3)"
+  echo "  --timeout=<secondes>    Attente max par étape DOM (défaut: 20)"
+  echo "  --workers=<N>           Sessions Brave en parallèle (défaut: 1)"
+  echo "  --rate=<N>              Ouvertures de chat max par minute, tous workers (défaut: 20)"
   echo ""
   echo "Exemples :"
   echo "  $0 chatgptcreationtitlefromcontent_loop.py --exec --numchats=ALL"
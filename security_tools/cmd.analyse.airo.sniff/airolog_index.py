@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Nom du script : airolog_index.py
+Target usage : Index SQLite compact des logs écran d'airodump-ng (logs/airodump-*.log écrits par all.sh
+               CAPTURE) pour interroger une nuit de capture sans relire les fichiers bruts.
+Version : v1.1 - Date : 2025-08-27
+
+Lecture en flux : séquences ANSI retirées, chaque rafraîchissement d'écran (ligne « CH .. ][ Elapsed »)
+est une trame ; seules les valeurs qui changent d'une trame à l'autre sont enregistrées.
+
+Modèle (SQLite, --db ou $AIROLOG_DB, défaut results/airodump.db) :
+- captures    : log -> position lue (octets), trames lues ; la relecture reprend à la dernière trame
+- aps         : BSSID -> ESSID, canal, chiffrement, première/dernière vue
+- stations    : station -> première/dernière vue, ESSID sondés (Probes) cumulés
+- ap_samples  : (trame, heure, BSSID) -> PWR, Beacons, #Data, CH, ESSID si l'un d'eux a changé
+- sta_samples : (trame, heure, station) -> BSSID, PWR, Rate, Lost, Frames, Notes, Probes si changé
+
+Commandes :
+  ingest [--follow] [LOG...]  Indexe les logs (défaut: logs/airodump-*.log), incrémental ;
+                              --follow suit le dernier log pendant qu'airodump écrit
+  aps                         Points d'accès vus : canal, ESSID, PWR min/max/dernier, compteurs
+  stations [--bssid MAC]      Stations vues, point d'accès associé, ESSID sondés
+  history MAC [--since T] [--until T]
+                              Évolution d'un BSSID ou d'une station (T : « AAAA-MM-JJ HH:MM »)
+  probes                      ESSID sondés et stations qui les cherchent
+  stats                       Résumé de l'index
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import signal
+import sqlite3
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(BASE_DIR, "logs")
+DEFAULT_DB = os.environ.get("AIROLOG_DB", os.path.join(BASE_DIR, "results", "airodump.db"))
+FOLLOW_INTERVAL = 1.0      # Secondes entre deux lectures en mode --follow
+FOLLOW_IDLE_EXIT = 0       # Arrêt après N secondes sans nouvelle donnée (0 = jamais)
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+ANSI_RE = re.compile(rb"\x1b\[[0-9;?]*[A-Za-z]")
+HEADER_RE = re.compile(r"CH\s+\d+\s*\]\[ Elapsed: .*?\]\[ (\d{4}-\d{2}-\d{2} \d{2}:\d{2})")
+MAC = r"[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}"
+AP_RE = re.compile(r"^ (" + MAC + r")\s+(-?\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(-?\d+)\s+(-?\S+)")
+STA_RE = re.compile(r"^ (" + MAC + r"|\(not associated\))\s+(" + MAC + r")\s+(-?\d+)\s+(\d+e?\s*-\s*\d+e?)\s+(\d+)\s+(\d+)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE, offset INTEGER DEFAULT 0, frames INTEGER DEFAULT 0, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS aps (
+    bssid TEXT PRIMARY KEY, essid TEXT, channel INTEGER, enc TEXT, cipher TEXT, auth TEXT,
+    first_ts INTEGER, last_ts INTEGER
+);
+CREATE TABLE IF NOT EXISTS stations (
+    station TEXT PRIMARY KEY, first_ts INTEGER, last_ts INTEGER, probes TEXT
+);
+CREATE TABLE IF NOT EXISTS ap_samples (
+    capture INTEGER, frame INTEGER, ts INTEGER, bssid TEXT,
+    pwr INTEGER, beacons INTEGER, data INTEGER, channel INTEGER, essid TEXT
+);
+CREATE INDEX IF NOT EXISTS ap_samples_bssid ON ap_samples(bssid, ts);
+CREATE TABLE IF NOT EXISTS sta_samples (
+    capture INTEGER, frame INTEGER, ts INTEGER, station TEXT, bssid TEXT,
+    pwr INTEGER, rate TEXT, lost INTEGER, frames INTEGER, notes TEXT, probes TEXT
+);
+CREATE INDEX IF NOT EXISTS sta_samples_station ON sta_samples(station, ts);
+"""
+
+
+def now():
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def fmt_ts(ts):
+    return time.strftime(TIME_FORMAT, time.localtime(ts)) if ts else "-"
+
+
+def parse_ts(text):
+    return int(time.mktime(time.strptime(text, TIME_FORMAT)))
+
+
+def open_db(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60)  # Lecture possible pendant un ingest --follow
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Lecture des trames
+# ---------------------------------------------------------------------------
+
+class Columns:
+    """Positions des colonnes texte (ESSID, Notes, Probes) relevées sur les lignes d'en-tête."""
+
+    def __init__(self):
+        self.essid = 75
+        self.notes = 69
+        self.probes = 76
+
+    def update(self, line):
+        if "ESSID" in line:
+            self.essid = line.index("ESSID")
+        elif "Probes" in line:
+            self.notes = line.index("Notes")
+            self.probes = line.index("Probes")
+
+
+def parse_ap(match, line, cols):
+    # Les valeurs texte sont alignées sur l'en-tête (à une colonne près pour « <length: n> »)
+    tail = line[match.end():cols.essid - 1].split()
+    return {"bssid": match.group(1).upper(), "pwr": int(match.group(2)), "beacons": int(match.group(3)),
+            "data": int(match.group(4)), "channel": int(match.group(6)),
+            "enc": tail[0] if tail else "", "cipher": tail[1] if len(tail) > 1 else "",
+            "auth": tail[2] if len(tail) > 2 else "", "essid": line[cols.essid - 1:].strip()}
+
+
+def parse_station(match, line, cols):
+    bssid = match.group(1)
+    return {"station": match.group(2).upper(), "bssid": "" if bssid.startswith("(") else bssid.upper(),
+            "pwr": int(match.group(3)), "rate": " ".join(match.group(4).split()),
+            "lost": int(match.group(5)), "frames": int(match.group(6)),
+            "notes": line[cols.notes - 1:cols.probes - 1].strip(), "probes": line[cols.probes - 1:].strip()}
+
+
+def parse_frame(lines, cols):
+    """Trame -> (heure à la minute près affichée par airodump, points d'accès, stations)."""
+    ts = parse_ts(HEADER_RE.search(lines[0]).group(1))
+    aps, stations = [], []
+    for line in lines[1:]:
+        if " BSSID " in line:
+            cols.update(line)
+            continue
+        match = STA_RE.match(line)
+        if match:
+            stations.append(parse_station(match, line, cols))
+            continue
+        match = AP_RE.match(line)
+        if match:
+            aps.append(parse_ap(match, line, cols))
+    return ts, aps, stations
+
+
+class Capture:
+    """État d'indexation d'un log : dernière valeur connue par BSSID/station pour n'écrire que les changements."""
+
+    AP_KEYS = ("pwr", "beacons", "data", "channel", "essid")
+    STA_KEYS = ("bssid", "pwr", "rate", "lost", "frames", "notes", "probes")
+
+    def __init__(self, conn, path):
+        self.conn = conn
+        self.path = path
+        conn.execute("INSERT OR IGNORE INTO captures(path) VALUES (?)", (path,))
+        row = conn.execute("SELECT id, offset, frames FROM captures WHERE path = ?", (path,)).fetchone()
+        self.id, self.offset, self.frames = row["id"], row["offset"], row["frames"]
+        self.cols = Columns()
+        self.last_ap = {r["bssid"]: tuple(r[k] for k in self.AP_KEYS) for r in conn.execute(
+            "SELECT * FROM ap_samples WHERE rowid IN (SELECT max(rowid) FROM ap_samples WHERE capture = ? GROUP BY bssid)",
+            (self.id,))}
+        self.last_sta = {r["station"]: tuple(r[k] for k in self.STA_KEYS) for r in conn.execute(
+            "SELECT * FROM sta_samples WHERE rowid IN (SELECT max(rowid) FROM sta_samples WHERE capture = ? GROUP BY station)",
+            (self.id,))}
+        self.ap_rows, self.sta_rows, self.ap_seen, self.sta_seen = [], [], {}, {}
+
+    def add_frame(self, lines):
+        ts, aps, stations = parse_frame(lines, self.cols)
+        frame = self.frames
+        self.frames += 1
+        for ap in aps:
+            values = tuple(ap[k] for k in self.AP_KEYS)
+            if self.last_ap.get(ap["bssid"]) != values:
+                self.last_ap[ap["bssid"]] = values
+                self.ap_rows.append((self.id, frame, ts, ap["bssid"]) + values)
+            self.ap_seen[ap["bssid"]] = (ap, ts)
+        for sta in stations:
+            values = tuple(sta[k] for k in self.STA_KEYS)
+            if self.last_sta.get(sta["station"]) != values:
+                self.last_sta[sta["station"]] = values
+                self.sta_rows.append((self.id, frame, ts, sta["station"]) + values)
+            self.sta_seen[sta["station"]] = (sta, ts)
+
+    def flush(self, offset, frames):
+        """Écrit les changements accumulés ; offset/frames = début de la dernière trame (relue au prochain passage)."""
+        self.conn.executemany("INSERT INTO ap_samples VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self.ap_rows)
+        self.conn.executemany("INSERT INTO sta_samples VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.sta_rows)
+        for bssid, (ap, ts) in self.ap_seen.items():
+            self.conn.execute(
+                "INSERT INTO aps VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(bssid) DO UPDATE SET "
+                "essid = CASE WHEN excluded.essid LIKE '<length:%' THEN aps.essid ELSE excluded.essid END, "
+                "channel = excluded.channel, enc = excluded.enc, cipher = excluded.cipher, auth = excluded.auth, "
+                "first_ts = min(aps.first_ts, excluded.first_ts), last_ts = max(aps.last_ts, excluded.last_ts)",
+                (bssid, ap["essid"], ap["channel"], ap["enc"], ap["cipher"], ap["auth"], ts, ts))
+        for station, (sta, ts) in self.sta_seen.items():
+            row = self.conn.execute("SELECT probes FROM stations WHERE station = ?", (station,)).fetchone()
+            probes = set(filter(None, (row["probes"] if row else "").split(",")))
+            probes.update(p for p in sta["probes"].split(",") if p)
+            self.conn.execute(
+                "INSERT INTO stations VALUES (?, ?, ?, ?) ON CONFLICT(station) DO UPDATE SET "
+                "first_ts = min(stations.first_ts, excluded.first_ts), last_ts = max(stations.last_ts, excluded.last_ts), "
+                "probes = excluded.probes", (station, ts, ts, ",".join(sorted(probes))))
+        written = len(self.ap_rows) + len(self.sta_rows)
+        self.offset, self.frames = offset, frames
+        self.conn.execute("UPDATE captures SET offset = ?, frames = ?, updated_at = ? WHERE id = ?",
+                          (offset, frames, now(), self.id))
+        self.conn.commit()
+        self.ap_rows, self.sta_rows, self.ap_seen, self.sta_seen = [], [], {}, {}
+        return written
+
+
+def ingest(conn, path, follow=False):
+    """Indexe un log à partir de la dernière trame lue. Retourne (trames lues, lignes écrites).
+
+    La dernière trame du fichier peut être en cours d'écriture : elle est indexée mais la position
+    enregistrée reste à son début, elle est relue (sans doublon) au passage suivant.
+    """
+    capture = Capture(conn, path)
+    start_frames = capture.frames
+    written = 0
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < capture.offset:
+            print(f"[!] {path} plus court que la position indexée : ignoré", file=sys.stderr)
+            return 0, 0
+        while True:
+            f.seek(capture.offset)
+            frame_start = pos = capture.offset
+            frame_lines = []
+            buffer = b""
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                lines = (buffer + chunk).split(b"\n")
+                buffer = lines.pop()
+                for raw in lines:
+                    line = ANSI_RE.sub(b"", raw).decode("utf-8", errors="replace").rstrip()
+                    if HEADER_RE.search(line):
+                        if frame_lines:
+                            capture.add_frame(frame_lines)
+                        frame_start = pos
+                        frame_lines = [line]
+                    elif frame_lines and line:
+                        frame_lines.append(line)
+                    pos += len(raw) + 1
+                if len(capture.ap_rows) + len(capture.sta_rows) > 50000:
+                    written += capture.flush(frame_start, capture.frames)
+            if frame_lines:
+                capture.add_frame(frame_lines)
+                written += capture.flush(frame_start, capture.frames - 1)
+            else:
+                written += capture.flush(capture.offset, capture.frames)
+            if not follow:
+                break
+            # Attente de nouvelles données : airodump réécrit l'écran en continu
+            end = pos + len(buffer)
+            idle = 0.0
+            while os.stat(path).st_size == end:
+                if FOLLOW_IDLE_EXIT and idle >= FOLLOW_IDLE_EXIT:
+                    return capture.frames - start_frames, written
+                time.sleep(FOLLOW_INTERVAL)
+                idle += FOLLOW_INTERVAL
+            if os.stat(path).st_size < end:
+                print(f"[!] {path} tronqué pendant le suivi : arrêt", file=sys.stderr)
+                break
+    return capture.frames - start_frames, written
+
+
+# ---------------------------------------------------------------------------
+# Commandes
+# ---------------------------------------------------------------------------
+
+def print_table(headers, rows):
+    rows = [["-" if v is None or v == "" else str(v) for v in row] for row in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in rows]) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)).rstrip())
+    for row in rows:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)).rstrip())
+
+
+def cmd_ingest(conn, args):
+    paths = args.logs or sorted(glob.glob(os.path.join(LOG_DIR, "airodump-*.log")))
+    if not paths:
+        print(f"[!] Aucun log airodump dans {LOG_DIR}")
+        return 1
+    for i, path in enumerate(paths):
+        start = time.monotonic()
+        follow = args.follow and i == len(paths) - 1
+        if follow:
+            print(f"[*] Suivi de {path} (CTRL-C ou SIGTERM pour arrêter)")
+        frames, written = ingest(conn, os.path.abspath(path), follow)
+        print(f"[*] {path} : {frames} trame(s), {written} changement(s) enregistré(s) "
+              f"en {time.monotonic() - start:.2f}s")
+    return 0
+
+
+def cmd_aps(conn, args):
+    rows = conn.execute(
+        "SELECT a.bssid, a.essid, a.channel, a.enc, a.cipher, a.auth, a.first_ts, a.last_ts, "
+        "min(s.pwr) AS pwr_min, max(s.pwr) AS pwr_max, "
+        "(SELECT pwr || '|' || beacons || '|' || data FROM ap_samples l WHERE l.bssid = a.bssid "
+        " ORDER BY ts DESC, rowid DESC LIMIT 1) AS last "
+        "FROM aps a LEFT JOIN ap_samples s ON s.bssid = a.bssid AND s.pwr != -1 "
+        "GROUP BY a.bssid ORDER BY a.last_ts DESC, a.bssid").fetchall()
+    table = []
+    for r in rows:
+        pwr, beacons, data = (r["last"] or "||").split("|")
+        table.append([r["bssid"], r["essid"], r["channel"], " ".join(filter(None, (r["enc"], r["cipher"], r["auth"]))),
+                      f"{r['pwr_min']}..{r['pwr_max']}" if r["pwr_min"] is not None else "", pwr, beacons, data,
+                      fmt_ts(r["first_ts"]), fmt_ts(r["last_ts"])])
+    print_table(["BSSID", "ESSID", "CH", "ENC", "PWR", "DERN.", "BEACONS", "DATA", "PREMIÈRE VUE", "DERNIÈRE VUE"], table)
+    return 0
+
+
+def cmd_stations(conn, args):
+    query = ("SELECT st.station, st.probes, st.first_ts, st.last_ts, l.bssid, l.pwr, l.frames, "
+             "(SELECT min(pwr) FROM sta_samples WHERE station = st.station AND pwr != -1) AS pwr_min, "
+             "(SELECT max(pwr) FROM sta_samples WHERE station = st.station AND pwr != -1) AS pwr_max "
+             "FROM stations st JOIN sta_samples l ON l.rowid = "
+             "(SELECT rowid FROM sta_samples WHERE station = st.station ORDER BY ts DESC, rowid DESC LIMIT 1)")
+    params = ()
+    if args.bssid:
+        query += " WHERE l.bssid = ?"
+        params = (args.bssid.upper(),)
+    rows = conn.execute(query + " ORDER BY st.last_ts DESC, st.station", params).fetchall()
+    print_table(["STATION", "BSSID", "PWR", "DERN.", "FRAMES", "PROBES", "PREMIÈRE VUE", "DERNIÈRE VUE"],
+                [[r["station"], r["bssid"] or "(not associated)",
+                  f"{r['pwr_min']}..{r['pwr_max']}" if r["pwr_min"] is not None else "", r["pwr"], r["frames"],
+                  r["probes"], fmt_ts(r["first_ts"]), fmt_ts(r["last_ts"])] for r in rows])
+    return 0
+
+
+def cmd_history(conn, args):
+    mac = args.mac.upper()
+    since = parse_ts(args.since) if args.since else 0
+    until = parse_ts(args.until) if args.until else 1 << 62
+    rows = conn.execute("SELECT ts, frame, pwr, beacons, data, channel, essid FROM ap_samples "
+                        "WHERE bssid = ? AND ts BETWEEN ? AND ? ORDER BY ts, rowid", (mac, since, until)).fetchall()
+    if rows:
+        print_table(["HEURE", "TRAME", "PWR", "BEACONS", "DATA", "CH", "ESSID"],
+                    [[fmt_ts(r["ts"]), r["frame"], r["pwr"], r["beacons"], r["data"], r["channel"], r["essid"]]
+                     for r in rows])
+    rows = conn.execute("SELECT ts, frame, bssid, pwr, rate, lost, frames, notes, probes FROM sta_samples "
+                        "WHERE station = ? AND ts BETWEEN ? AND ? ORDER BY ts, rowid", (mac, since, until)).fetchall()
+    if rows:
+        print_table(["HEURE", "TRAME", "BSSID", "PWR", "RATE", "LOST", "FRAMES", "NOTES", "PROBES"],
+                    [[fmt_ts(r["ts"]), r["frame"], r["bssid"] or "(not associated)", r["pwr"], r["rate"], r["lost"],
+                      r["frames"], r["notes"], r["probes"]] for r in rows])
+    return 0
+
+
+def cmd_probes(conn, args):
+    probed = {}
+    for r in conn.execute("SELECT station, probes FROM stations WHERE probes != ''"):
+        for essid in r["probes"].split(","):
+            probed.setdefault(essid, []).append(r["station"])
+    print_table(["ESSID SONDÉ", "STATIONS"],
+                [[essid, " ".join(sorted(stations))] for essid, stations in sorted(probed.items())])
+    return 0
+
+
+def cmd_stats(conn, args):
+    for label, query in (("Logs indexés", "SELECT count(*) FROM captures"),
+                         ("Trames lues", "SELECT coalesce(sum(frames), 0) FROM captures"),
+                         ("Points d'accès", "SELECT count(*) FROM aps"),
+                         ("Stations", "SELECT count(*) FROM stations"),
+                         ("Changements AP", "SELECT count(*) FROM ap_samples"),
+                         ("Changements stations", "SELECT count(*) FROM sta_samples")):
+        print(f"{label:<22}: {conn.execute(query).fetchone()[0]}")
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Index SQLite des logs écran d'airodump-ng.")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'Base SQLite (défaut: {DEFAULT_DB}).')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('ingest', help='Indexe les logs airodump (incrémental).')
+    p.add_argument('--follow', action='store_true', help='Suit le dernier log pendant qu\'il grossit.')
+    p.add_argument('logs', nargs='*')
+
+    sub.add_parser('aps', help='Points d\'accès vus.')
+
+    p = sub.add_parser('stations', help='Stations vues.')
+    p.add_argument('--bssid', help='Seulement les stations associées à ce BSSID.')
+
+    p = sub.add_parser('history', help='Évolution d\'un BSSID ou d\'une station.')
+    p.add_argument('mac')
+    p.add_argument('--since', help='Début (AAAA-MM-JJ HH:MM).')
+    p.add_argument('--until', help='Fin (AAAA-MM-JJ HH:MM).')
+
+    sub.add_parser('probes', help='ESSID sondés par les stations.')
+    sub.add_parser('stats', help='Résumé de l\'index.')
+    return parser.parse_args()
+
+
+def stop_on_signal(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    args = parse_args()
+    # Lancé en arrière-plan par all.sh : SIGINT y est ignoré, SIGTERM arrête aussi le suivi proprement
+    signal.signal(signal.SIGTERM, stop_on_signal)
+    signal.signal(signal.SIGINT, stop_on_signal)
+    conn = open_db(args.db)
+    commands = {"ingest": cmd_ingest, "aps": cmd_aps, "stations": cmd_stations, "history": cmd_history,
+                "probes": cmd_probes, "stats": cmd_stats}
+    try:
+        sys.exit(commands[args.command](conn, args))
+    except KeyboardInterrupt:
+        print("\n[*] Arrêt du suivi (données déjà enregistrées)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ CAP_DIR="$BASE_DIR/cap"
 OUI_FILE="$BASE_DIR/myinfo/oui.txt"
 EXCLUSION_FILE="$BASE_DIR/myinfo/exclusions.txt"
 OUTPUT_DIR="$BASE_DIR/results"
+AIROLOG_INDEX="$BASE_DIR/airolog_index.py"
 LOG_DIR="$BASE_DIR/logs"
 NOW=$(date +'%Y%m%d-%H%M%S')
 
@@ -37,6 +38,10 @@ Modes :
     - -o OFFSET : utiliser le CSV avant-dernier (2), ou plus ancien (3, 4...)
     - -o ALL : attaquer tous les CSV du dossier
 
+  INDEX [ingest|aps|stations|history MAC|probes|stats] [OPTIONS]
+    - Index SQLite des logs écran airodump ($OUTPUT_DIR/airodump.db)
+    - Alimenté en continu pendant CAPTURE ; INDEX ingest pour les anciens logs
+
 EOF
 }
 
@@ -117,6 +122,14 @@ capture_airodump() {
 
   echo "[*] Lancement airodump-ng (log: $LOG_DIR/airodump-$NOW.log)"
 
+  # Indexation au fil de l'eau du log écran (seuls les changements sont stockés)
+  local index_pid=""
+  : > "$LOG_DIR/airodump-$NOW.log"
+  if command -v python3 >/dev/null 2>&1; then
+    python3 "$AIROLOG_INDEX" ingest --follow "$LOG_DIR/airodump-$NOW.log" >/dev/null 2>&1 &
+    index_pid=$!
+  fi
+
   airodump-ng "$WLAN_IFACE" \
     --write "$CAP_DIR/sniff-$NOW" \
     --output-format csv \
@@ -124,6 +137,13 @@ capture_airodump() {
     -c 1-13,36,40,44,48,52,56,60,64,100-144,149-165 \
     | tee "$LOG_DIR/airodump-$NOW.log"
 
+  if [[ -n "$index_pid" ]]; then
+    # SIGTERM : SIGINT est ignoré par un processus lancé avec & depuis un script
+    kill -TERM "$index_pid" 2>/dev/null
+    wait "$index_pid" 2>/dev/null
+    python3 "$AIROLOG_INDEX" ingest "$LOG_DIR/airodump-$NOW.log"
+  fi
+
   sleep 3
 
   set_managed_mode
@@ -271,6 +291,9 @@ case "$MODE" in
   ATTACK)
     attack_all "$@"
     ;;
+  INDEX)
+    python3 "$AIROLOG_INDEX" "${@:-stats}"
+    ;;
   *)
     show_help
     ;;
@@ -1,16 +1,18 @@
 #!/bin/bash
 # oui_lookup.sh
 # Usage: oui_lookup.sh MAC_address
-# Extrait le préfixe OUI et cherche dans oui.txt
+#        oui_lookup.sh MAC1 MAC2 ...      -> MAC<TAB>fabricant
+#        ... | oui_lookup.sh              -> une MAC par ligne sur stdin, MAC<TAB>fabricant
+# Résolution via oui_lookup.py : index de oui.txt construit une fois (oui.txt.idx), MA-L/MA-M/MA-S,
+# au lieu d'un grep complet de oui.txt par adresse. Fichier : $OUI_FILE, sinon ./oui.txt.
 
-MAC="$1"
-OUI=$(echo "$MAC" | awk -F: '{print toupper($1":"$2":"$3)}')
+LOOKUP="$(dirname "$0")/oui_lookup.py"
 
-# Cherche dans oui.txt, affiche fabricant ou "Unknown"
-FIRM=$(grep "^$OUI" oui.txt | cut -d' ' -f2-)
-if [ -z "$FIRM" ]; then
-  echo "Unknown"
+if [ $# -eq 1 ]; then
+  # Affiche fabricant ou "Unknown" (sortie historique)
+  python3 "$LOOKUP" lookup "$1" | cut -f2-
+elif [ $# -gt 1 ]; then
+  python3 "$LOOKUP" lookup "$@"
 else
-  echo "$FIRM"
+  python3 "$LOOKUP" batch
 fi
-
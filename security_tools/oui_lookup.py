@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Nom du script : oui_lookup.py
+Target usage : Résolution fabricant (OUI) de MAC en masse à partir d'un index construit une seule fois,
+               pour enrichir les CSV et logs airodump sans relire oui.txt pour chaque adresse.
+Version : v1.0 - Date : 2025-08-26
+
+Sources (--oui ou $OUI_FILE, sinon ./oui.txt puis cmd.analyse.airo.sniff/myinfo/oui.txt), formats acceptés :
+- « XX:XX:XX Fabricant » (format historique de looklup.oui.sh)
+- IEEE oui.txt / mam.txt / oui36.txt (lignes « XX-XX-XX   (hex)  Fabricant » et « (base 16) » des blocs MA-M/MA-S)
+- IEEE CSV (oui.csv, mam.csv, oui36.csv : Registry,Assignment,Organization Name,...)
+- Wireshark manuf (« XX:XX:XX:X0:00:00/28  Court  Fabricant »)
+Les fichiers mam.* et oui36.* présents à côté de la source sont chargés avec elle (MA-M 28 bits, MA-S 36 bits).
+
+Index : <source>.idx (TSV bits, préfixe hexa, fabricant), reconstruit si une source est plus récente.
+Recherche : un dictionnaire par longueur de préfixe, du plus long (MA-S) au plus court (MA-L) ;
+chaque MAC coûte au plus trois accès, quelle que soit la taille de la base.
+
+Commandes :
+  lookup MAC...                   MAC<TAB>fabricant
+  batch                           Une MAC par ligne sur stdin -> MAC<TAB>fabricant
+  csv [--columns C1,C2] [FICHIER] Ajoute une colonne « <C> Vendor » après les colonnes nommées
+                                  (défaut : BSSID,Station MAC, sections AP et stations d'airodump)
+  annotate [FICHIER]              Recopie le texte en ajoutant « [fabricant] » après chaque MAC
+  build                           Reconstruit l'index
+"""
+
+import os
+import re
+import sys
+import csv
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCES = ["oui.txt", os.path.join(BASE_DIR, "cmd.analyse.airo.sniff", "myinfo", "oui.txt")]
+EXTRA_REGISTRIES = ("mam", "oui36")
+UNKNOWN = "Unknown"
+LOCAL = "Locally administered (random)"
+
+MAC_RE = re.compile(r"\b[0-9A-Fa-f]{2}(?:[:-][0-9A-Fa-f]{2}){5}\b")
+HEX_LINE_RE = re.compile(r"^\s*([0-9A-Fa-f]{2}(?:[-:][0-9A-Fa-f]{2}){2})\s+\(hex\)\s+(.+?)\s*$")
+BASE16_RE = re.compile(r"^\s*(([0-9A-Fa-f]{6})(?:-([0-9A-Fa-f]{6}))?)\s+\(base 16\)\s+(.+?)\s*$")
+SIMPLE_RE = re.compile(r"^([0-9A-Fa-f]{2}(?:[:-]?[0-9A-Fa-f]{2}){2,5})(?:/(\d+))?\s+(.+?)\s*$")
+CSV_SIZES = {"MA-L": 24, "MA-M": 28, "MA-S": 36, "CID": 24}
+
+
+# ---------------------------------------------------------------------------
+# Construction de l'index
+# ---------------------------------------------------------------------------
+
+def parse_source(path):
+    """Entrées (bits, préfixe hexa majuscule, fabricant) d'un fichier de registre."""
+    entries = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        first = f.readline()
+        f.seek(0)
+        if first.startswith("Registry,"):
+            for row in csv.DictReader(f):
+                bits = CSV_SIZES.get(row.get("Registry", ""))
+                if bits:
+                    entries.append((bits, row["Assignment"].upper(), row["Organization Name"].strip()))
+            return entries
+        pending = None  # Ligne « (hex) » IEEE en attente de sa ligne « (base 16) »
+        for line in f:
+            match = HEX_LINE_RE.match(line)
+            if match:
+                if pending:
+                    entries.append((24,) + pending)
+                pending = (re.sub(r"[:-]", "", match.group(1)).upper(), match.group(2))
+                continue
+            match = BASE16_RE.match(line)
+            if match:
+                if pending:
+                    low, high = match.group(2), match.group(3)
+                    if not high or (low == "000000" and high.upper() == "FFFFFF"):
+                        entries.append((24,) + pending)
+                    else:
+                        # mam.txt / oui36.txt : plage xx00000-xxFFFFF (MA-M) ou xxxx000-xxxxFFF (MA-S) du bloc
+                        span = int(high, 16) - int(low, 16) + 1
+                        bits = 48 - (span.bit_length() - 1)
+                        entries.append((bits, (pending[0] + low.upper())[:bits // 4], match.group(4)))
+                    pending = None
+                continue
+            if line.startswith("#") or not line.strip():
+                continue
+            match = SIMPLE_RE.match(line)
+            if match:
+                hexa = re.sub(r"[:-]", "", match.group(1)).upper()
+                bits = int(match.group(2)) if match.group(2) else len(hexa) * 4
+                # manuf Wireshark : « préfixe  court  long » séparés par des tabulations
+                vendor = match.group(3).split("\t")[-1].strip()
+                entries.append((bits, hexa[:(bits + 3) // 4], vendor))
+        if pending:
+            entries.append((24,) + pending)
+    return entries
+
+
+def sources_for(path):
+    """Source principale et registres MA-M/MA-S voisins (mam.txt, oui36.csv, ...)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    paths = [path]
+    for name in EXTRA_REGISTRIES:
+        for ext in (".txt", ".csv"):
+            extra = os.path.join(directory, name + ext)
+            if os.path.exists(extra):
+                paths.append(extra)
+    return paths
+
+
+def build_index(source, index_path):
+    table = {}
+    for path in sources_for(source):
+        for bits, prefix, vendor in parse_source(path):
+            table.setdefault(bits, {})[prefix] = vendor
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for bits in sorted(table):
+            for prefix in sorted(table[bits]):
+                f.write(f"{bits}\t{prefix}\t{table[bits][prefix]}\n")
+    os.replace(tmp, index_path)
+    return table
+
+
+def load_index(source, rebuild=False):
+    """Table {bits: {préfixe hexa: fabricant}}, depuis <source>.idx si à jour."""
+    index_path = source + ".idx"
+    try:
+        stale = rebuild or any(os.path.getmtime(p) > os.path.getmtime(index_path) for p in sources_for(source))
+    except OSError:
+        stale = True
+    if stale:
+        return build_index(source, index_path)
+    table = {}
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            bits, prefix, vendor = line.rstrip("\n").split("\t", 2)
+            table.setdefault(int(bits), {})[prefix] = vendor
+    return table
+
+
+class Resolver:
+    def __init__(self, table):
+        # Du plus spécifique au plus général : MA-S (36), MA-M (28), MA-L (24)
+        self.levels = [(bits, (bits + 3) // 4, table[bits]) for bits in sorted(table, reverse=True)]
+        self.cache = {}
+
+    def vendor(self, mac):
+        hexa = re.sub(r"[^0-9A-Fa-f]", "", mac).upper()
+        if len(hexa) != 12:
+            return UNKNOWN
+        if hexa in self.cache:
+            return self.cache[hexa]
+        result = None
+        for bits, length, prefixes in self.levels:
+            prefix = hexa[:length]
+            if bits % 4:
+                # Préfixe non aligné sur un chiffre hexa : bits de poids faible du dernier chiffre à zéro
+                last = int(prefix[-1], 16) & (0xF << (4 - bits % 4))
+                prefix = prefix[:-1] + format(last, "X")
+            if prefix in prefixes:
+                result = prefixes[prefix]
+                break
+        if result is None:
+            result = LOCAL if int(hexa[1], 16) & 0x2 else UNKNOWN
+        self.cache[hexa] = result
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Commandes
+# ---------------------------------------------------------------------------
+
+def open_input(path):
+    return sys.stdin if path in (None, "-") else open(path, "r", encoding="utf-8", errors="replace", newline="")
+
+
+def cmd_lookup(resolver, args):
+    for mac in args.macs:
+        print(f"{mac}\t{resolver.vendor(mac)}")
+    return 0
+
+
+def cmd_batch(resolver, args):
+    out = sys.stdout
+    for line in sys.stdin:
+        mac = line.strip()
+        if mac:
+            out.write(f"{mac}\t{resolver.vendor(mac)}\n")
+    return 0
+
+
+def cmd_csv(resolver, args):
+    wanted = [c.strip().lower() for c in args.columns.split(",") if c.strip()]
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    columns = []
+    with open_input(args.file) as f:
+        for row in csv.reader(f, skipinitialspace=True):
+            names = [c.strip().lower() for c in row]
+            if any(name in wanted for name in names):
+                # Ligne d'en-tête (airodump : une par section)
+                columns = [i for i, name in enumerate(names) if name in wanted]
+                writer.writerow(row + [f"{row[i].strip()} Vendor" for i in columns])
+            elif row and columns:
+                writer.writerow(row + [resolver.vendor(row[i]) if i < len(row) and MAC_RE.search(row[i]) else ""
+                                       for i in columns])
+            else:
+                writer.writerow(row)
+    return 0
+
+
+def cmd_annotate(resolver, args):
+    out = sys.stdout
+    with open_input(args.file) as f:
+        for line in f:
+            out.write(MAC_RE.sub(lambda m: f"{m.group(0)} [{resolver.vendor(m.group(0))}]", line))
+    return 0
+
+
+def find_source(path):
+    candidates = [path] if path else ([os.environ["OUI_FILE"]] if os.environ.get("OUI_FILE") else DEFAULT_SOURCES)
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    print(f"Fichier OUI introuvable ({', '.join(candidates)})", file=sys.stderr)
+    sys.exit(1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Résolution fabricant (OUI) de MAC en masse.")
+    parser.add_argument('--oui', help='Registre OUI (défaut: $OUI_FILE, ./oui.txt, cmd.analyse.airo.sniff/myinfo/oui.txt).')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('lookup', help='Fabricant des MAC données.')
+    p.add_argument('macs', nargs='+')
+
+    sub.add_parser('batch', help='Une MAC par ligne sur stdin.')
+
+    p = sub.add_parser('csv', help='Ajoute les colonnes fabricant à un CSV (airodump).')
+    p.add_argument('--columns', default="BSSID,Station MAC", help='Colonnes MAC (défaut: BSSID,Station MAC).')
+    p.add_argument('file', nargs='?')
+
+    p = sub.add_parser('annotate', help='Ajoute [fabricant] après chaque MAC d\'un texte.')
+    p.add_argument('file', nargs='?')
+
+    sub.add_parser('build', help='Reconstruit l\'index.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    source = find_source(args.oui)
+    table = load_index(source, rebuild=args.command == "build")
+    if args.command == "build":
+        counts = ", ".join(f"{len(table[bits])} préfixes /{bits}" for bits in sorted(table))
+        print(f"Index {source}.idx : {counts}")
+        return
+    commands = {"lookup": cmd_lookup, "batch": cmd_batch, "csv": cmd_csv, "annotate": cmd_annotate}
+    try:
+        sys.exit(commands[args.command](Resolver(table), args))
+    except BrokenPipeError:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,123 @@
 #!/bin/bash
 
-BACKUP_DIR="${1:-$HOME/Documents/IphoneBackup/00008101-0006612C1A6A001E}"
+BACKUP_DIR=""
 OUTPUT="export_ALL_SMS.csv"
+# Dernier message exporté (ROWID et date iOS) : les exécutions suivantes n'ajoutent que les nouveaux
+WATERMARK="$OUTPUT.watermark"
+# SHA-1 de "HomeDomain-Library/SMS/sms.db" : nom du fichier dans tout backup iTunes/Finder
+SMS_DB_ID="3d0d7e5fb2ce288813306e4d4636395e047a3d28"
+
+help() {
+  echo "Usage: $0 [backup_directory] [--full]"
+  echo "Exporte les SMS/iMessages du backup iPhone (par défaut ~/Documents/IphoneBackup/00008101-0006612C1A6A001E) vers $OUTPUT"
+  echo
+  echo "sms.db est localisé via Manifest.db du backup. Seuls les messages postérieurs au dernier export"
+  echo "($WATERMARK) sont ajoutés ; --full réécrit $OUTPUT depuis le début."
+}
+
+FULL=0
+for arg in "$@"; do
+  case "$arg" in
+    -h|--help) help; exit 0 ;;
+    --full) FULL=1 ;;
+    *) BACKUP_DIR="$arg" ;;
+  esac
+done
+BACKUP_DIR="${BACKUP_DIR:-$HOME/Documents/IphoneBackup/00008101-0006612C1A6A001E}"
 
 if [ ! -d "$BACKUP_DIR" ]; then
   echo "Erreur : dossier introuvable : $BACKUP_DIR"
   exit 2
 fi
 
-echo "Extraction de tous les SMS dans $BACKUP_DIR"
+# Localisation de sms.db : Manifest.db, puis nom connu, puis (ancien comportement) recherche de la table message
+find_sms_db() {
+  local file_id=""
+  if [ -f "$BACKUP_DIR/Manifest.db" ]; then
+    file_id=$(sqlite3 "$BACKUP_DIR/Manifest.db" \
+      "SELECT fileID FROM Files WHERE domain='HomeDomain' AND relativePath='Library/SMS/sms.db' LIMIT 1;" 2>/dev/null)
+  fi
+  for id in $file_id $SMS_DB_ID; do
+    if [ -f "$BACKUP_DIR/${id:0:2}/$id" ]; then
+      echo "$BACKUP_DIR/${id:0:2}/$id"
+      return 0
+    fi
+    if [ -f "$BACKUP_DIR/$id" ]; then
+      echo "$BACKUP_DIR/$id"
+      return 0
+    fi
+  done
+  echo "Manifest.db illisible ou sans sms.db, recherche de la table message..." >&2
+  local file
+  while IFS= read -r -d '' file; do
+    if sqlite3 "$file" "SELECT name FROM sqlite_master WHERE type='table' AND name='message';" 2>/dev/null | grep -q message; then
+      echo "$file"
+      return 0
+    fi
+  done < <(find "$BACKUP_DIR" -type f -size +16k -print0)
+  return 1
+}
+
+SMS_DB=$(find_sms_db)
+if [ -z "$SMS_DB" ]; then
+  echo "Erreur : sms.db introuvable dans $BACKUP_DIR (backup chiffré ?)"
+  exit 1
+fi
+echo "Base SMS : $SMS_DB"
+
+LAST_ROWID=0
+LAST_DATE=0
+if [ "$FULL" -eq 0 ] && [ -f "$OUTPUT" ] && [ ! -f "$WATERMARK" ]; then
+  # CSV d'une version sans repère (export complet) : réécrit plutôt que tout ajouter en double
+  echo "$OUTPUT existe sans repère $WATERMARK : export complet."
+  FULL=1
+fi
+if [ "$FULL" -eq 1 ] || [ ! -f "$OUTPUT" ]; then
+  echo "date,direction,phone_number,message" > "$OUTPUT"
+else
+  read -r LAST_ROWID LAST_DATE < "$WATERMARK"
+fi
+if ! [[ "$LAST_ROWID" =~ ^[0-9]+$ && "$LAST_DATE" =~ ^[0-9]+$ ]]; then
+  echo "Erreur : repère invalide dans $WATERMARK (utilisez --full)"
+  exit 1
+fi
+
+echo "Extraction des SMS après le message $LAST_ROWID dans $OUTPUT"
 
-echo "date,direction,phone_number,message" > "$OUTPUT"
+# Bornes lues avant l'export : un message arrivé entre-temps (base ouverte ailleurs) sera pris au prochain passage
+read -r MAX_ROWID MAX_DATE < <(sqlite3 -separator ' ' "$SMS_DB" \
+  "SELECT coalesce(max(ROWID), 0), coalesce(max(date), 0) FROM message;")
+NEW_COUNT=$(sqlite3 "$SMS_DB" \
+  "SELECT count(*) FROM message WHERE (ROWID > $LAST_ROWID OR date > $LAST_DATE) AND ROWID <= $MAX_ROWID;")
 
-search_all_sms() {
-  local file="$1"
-  if sqlite3 "$file" "SELECT name FROM sqlite_master WHERE type='table' AND name='message';" 2>/dev/null | grep -q message; then
-    sqlite3 -csv "$file" <<EOF
+# Sortie en flux de sqlite3 vers le CSV (pas de chargement en mémoire). Les messages exportés ont tous
+# ROWID <= LAST_ROWID et date <= LAST_DATE : le filtre OR n'exporte jamais deux fois un message, et
+# rattrape ceux d'une base recréée (restauration de l'iPhone, ROWID repartis de 1).
+# date : nanosecondes depuis 2001 (iOS >= 11), secondes avant
+sqlite3 "$SMS_DB" <<EOF >> "$OUTPUT"
 .headers off
 .mode csv
 SELECT
-  datetime(message.date / 1000000000 + strftime('%s','2001-01-01'), 'unixepoch') AS date,
+  datetime(CASE WHEN message.date > 1000000000000 THEN message.date / 1000000000 ELSE message.date END
+           + strftime('%s','2001-01-01'), 'unixepoch') AS date,
   CASE WHEN message.is_from_me=1 THEN 'Sent' ELSE 'Received' END AS direction,
   handle.id AS phone_number,
   message.text AS message
 FROM message
 LEFT JOIN handle ON message.handle_id = handle.ROWID
-ORDER BY date DESC;
+WHERE (message.ROWID > $LAST_ROWID OR message.date > $LAST_DATE)
+  AND message.ROWID <= $MAX_ROWID
+ORDER BY message.ROWID;
 EOF
-  fi
-}
+if [ $? -ne 0 ]; then
+  echo "Erreur lors de l'extraction (repère inchangé)."
+  exit 1
+fi
 
-find "$BACKUP_DIR" -type f | while read -r file; do
-  results=$(search_all_sms "$file")
-  if [ -n "$results" ]; then
-    echo "$results"
-  fi
-done >> "$OUTPUT"
+[ "$MAX_ROWID" -lt "$LAST_ROWID" ] && MAX_ROWID="$LAST_ROWID"
+[ "$MAX_DATE" -lt "$LAST_DATE" ] && MAX_DATE="$LAST_DATE"
+echo "$MAX_ROWID $MAX_DATE" > "$WATERMARK"
 
-echo "Extraction terminée : $OUTPUT"
+echo "Extraction terminée : $OUTPUT ($NEW_COUNT message(s) ajouté(s), repère $WATERMARK)"
 
 kate "$OUTPUT" &
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Nom du script : jointSMSCONTACT.py
+Target usage : Jointure export_ALL_SMS.csv (exportSMS.sh) x export_ALL_CONTACTS.csv (exportContacts.sh)
+               en un passage, numéros normalisés E.164.
+Version : v1.0 - Date : 2025-08-26
+
+- Lecture CSV réelle (guillemets, virgules et retours à la ligne dans les messages)
+- Index unique : chaque numéro/adresse de chaque contact (colonne ContactInfo, valeurs séparées par
+  des virgules) -> contact ; numéros en E.164 (+32 par défaut pour les numéros nationaux 0xxx)
+- Repli sur les 9 derniers chiffres si le numéro n'est pas trouvé tel quel et qu'un seul contact correspond
+- SMS traités en flux (mémoire bornée par la taille du carnet), rapport taux de correspondance et débit
+"""
+
+import re
+import sys
+import csv
+import time
+import argparse
+from collections import Counter
+
+DEFAULT_COUNTRY = "32"
+SUFFIX_DIGITS = 9
+OUTPUT_HEADER = ["date", "direction", "first_name", "last_name", "contact_info", "contact_name", "phone_number", "message"]
+
+csv.field_size_limit(sys.maxsize)
+
+
+def normalize(value, country=DEFAULT_COUNTRY):
+    """Numéro -> E.164 (+<indicatif><numéro>), adresse e-mail -> minuscules, sinon chaîne vide."""
+    value = value.strip().strip('"')
+    if "@" in value:
+        return value.lower()
+    digits = re.sub(r"[^\d+]", "", value)
+    if digits.startswith("+"):
+        digits = "+" + digits[1:].replace("+", "")
+    elif digits.startswith("00"):
+        digits = "+" + digits[2:]
+    elif digits.startswith("0"):
+        digits = "+" + country + digits[1:]
+    elif len(digits) >= 10 and digits.startswith(country):
+        digits = "+" + digits
+    return digits if len(digits.lstrip("+")) >= 3 else ""
+
+
+def build_index(path, country):
+    """{clé normalisée: contact}, {9 derniers chiffres: contact ou None si ambigu}."""
+    exact, suffix = {}, {}
+    contacts = 0
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            row += [""] * (3 - len(row))
+            first, last, info = row[0], row[1], row[2]
+            contact = (first, last, info, f"{first} {last}".strip())
+            contacts += 1
+            for value in info.split(","):
+                key = normalize(value, country)
+                if not key:
+                    continue
+                exact.setdefault(key, contact)
+                if key.startswith("+") and len(key) > SUFFIX_DIGITS:
+                    tail = key[-SUFFIX_DIGITS:]
+                    suffix[tail] = contact if suffix.get(tail, contact) is contact else None
+    return exact, suffix, contacts
+
+
+def join(sms_path, output_path, exact, suffix, country):
+    stats = Counter()
+    unmatched = Counter()
+    with open(sms_path, "r", encoding="utf-8", errors="replace", newline="") as fin, \
+            open(output_path, "w", encoding="utf-8", newline="") as fout:
+        reader = csv.reader(fin)
+        writer = csv.writer(fout)
+        next(reader, None)
+        writer.writerow(OUTPUT_HEADER)
+        for row in reader:
+            if not row:
+                continue
+            row += [""] * (4 - len(row))
+            date, direction, number, message = row[0], row[1], row[2], ",".join(row[3:])
+            key = normalize(number, country)
+            contact = exact.get(key)
+            if contact:
+                stats["exact"] += 1
+            elif key.startswith("+") and suffix.get(key[-SUFFIX_DIGITS:]):
+                contact = suffix[key[-SUFFIX_DIGITS:]]
+                stats["suffix"] += 1
+            else:
+                contact = ("", "", "", "")
+                unmatched[number] += 1
+            stats["total"] += 1
+            writer.writerow([date, direction, *contact, number, message])
+    return stats, unmatched
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jointure SMS + contacts (numéros normalisés E.164).")
+    parser.add_argument('--contacts', default="export_ALL_CONTACTS.csv", help='CSV contacts (défaut: export_ALL_CONTACTS.csv).')
+    parser.add_argument('--sms', default="export_ALL_SMS.csv", help='CSV SMS (défaut: export_ALL_SMS.csv).')
+    parser.add_argument('--output', default="export_ALL_SMS_with_contacts.csv", help='CSV produit (défaut: export_ALL_SMS_with_contacts.csv).')
+    parser.add_argument('--country', default=DEFAULT_COUNTRY, help=f'Indicatif des numéros nationaux 0xxx (défaut: {DEFAULT_COUNTRY}).')
+    parser.add_argument('--top', type=int, default=10, help='Numéros sans contact les plus fréquents affichés (défaut: 10).')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.monotonic()
+    exact, suffix, contacts = build_index(args.contacts, args.country)
+    indexed = time.monotonic()
+    stats, unmatched = join(args.sms, args.output, exact, suffix, args.country)
+    elapsed = time.monotonic() - indexed
+    total = stats["total"]
+    matched = stats["exact"] + stats["suffix"]
+
+    print(f"Contacts : {contacts} ({len(exact)} numéros/adresses indexés en {indexed - start:.2f}s)")
+    print(f"SMS      : {total} en {elapsed:.2f}s ({total / elapsed if elapsed > 0 else 0:.0f} SMS/s)")
+    print(f"Associés : {matched} ({matched * 100.0 / total if total else 0:.1f}%) dont {stats['suffix']} "
+          f"par les {SUFFIX_DIGITS} derniers chiffres ; sans contact : {total - matched}")
+    if unmatched and args.top > 0:
+        print("Numéros sans contact les plus fréquents :")
+        for number, count in unmatched.most_common(args.top):
+            print(f"  {count:>6}  {number or '(vide)'}")
+
+
+if __name__ == "__main__":
+    main()
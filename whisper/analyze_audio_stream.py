@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auteur : Bruno DELNOZ
+Email : bruno.delnoz@protonmail.com
+Nom du script : analyze_audio_stream.py
+Target usage : Analyse de compatibilité Whisper en une seule passe de décodage (appelé par transcribe_mp4.sh --analyze).
+Version : v1.1 - Date : 2025-08-27
+
+Fonctionnement :
+- Un seul ffprobe (en-têtes) puis un seul ffmpeg qui décode la piste audio en flux PCM 16 kHz
+  (1 ou 2 canaux) sur stdout ; aucun fichier WAV temporaire
+- Le flux est lu par blocs et découpé en fenêtres de --window secondes ; RMS, crête, écrêtage,
+  silence, déséquilibre gauche/droite et vraisemblance de parole (énergie 250-4000 Hz,
+  planéité spectrale, passages par zéro) sont calculés par numpy sur tout le bloc à la fois
+- Verdict et solutions ffmpeg identiques à l'ancien --analyze (codec, fréquence, canaux, débit)
+  complétés par les mesures du signal
+- Cache JSON (--cache) indexé par empreinte du contenu (taille + SHA-1 de 3 blocs de 1 Mio) ;
+  un fichier dont taille et mtime n'ont pas changé n'est même pas relu
+
+Code retour : 0 fichier compatible (éventuellement avec réserves), 1 problématique ou incompatible.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+ANALYZER_VERSION = 1
+SAMPLE_RATE = 16000
+DEFAULT_WINDOW = 0.5
+DEFAULT_CACHE_FILE = "cache.analyze_audio.json"
+BLOCK_WINDOWS = 120               # Fenêtres décodées par bloc numpy (60 s avec --window 0.5)
+HASH_BLOCK = 1024 * 1024
+
+SILENCE_DBFS = -45.0              # Fenêtre silencieuse sous ce niveau RMS
+CLIP_LEVEL = 32700                # Échantillon considéré comme écrêté au-delà (sur 32767)
+SPEECH_BAND = (250.0, 4000.0)
+SPEECH_BAND_RATIO = 0.4           # Part minimale d'énergie dans la bande vocale
+SPEECH_MAX_FLATNESS = 0.45        # Bruit blanc ~1, voix bien plus tonale
+SPEECH_ZCR = (0.01, 0.35)         # Taux de passages par zéro plausible pour la voix à 16 kHz
+
+
+def dbfs(value):
+    return float(20.0 * np.log10(max(value, 1e-9) / 32768.0))
+
+
+# ---------------------------------------------------------------------------
+# Empreinte et cache
+# ---------------------------------------------------------------------------
+
+def content_hash(path, size):
+    """SHA-1 de la taille et de trois blocs (début, milieu, fin) : stable et lu en O(1)."""
+    h = hashlib.sha1(str(size).encode())
+    with open(path, 'rb') as f:
+        for offset in sorted({0, max(0, size // 2 - HASH_BLOCK // 2), max(0, size - HASH_BLOCK)}):
+            f.seek(offset)
+            h.update(f.read(HASH_BLOCK))
+    return h.hexdigest()
+
+
+def load_cache(cache_file):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get("version") == ANALYZER_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {"version": ANALYZER_VERSION, "paths": {}, "results": {}}
+
+
+def save_cache(cache_file, cache):
+    tmp = cache_file + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp, cache_file)
+
+
+def file_key(path, cache):
+    """Empreinte du fichier, réutilisée sans relecture si taille et mtime sont inchangés."""
+    st = os.stat(path)
+    abspath = os.path.abspath(path)
+    known = cache["paths"].get(abspath)
+    if known and known["size"] == st.st_size and known["mtime"] == st.st_mtime:
+        return known["hash"]
+    digest = content_hash(path, st.st_size)
+    cache["paths"][abspath] = {"size": st.st_size, "mtime": st.st_mtime, "hash": digest}
+    return digest
+
+
+# ---------------------------------------------------------------------------
+# Décodage et mesures
+# ---------------------------------------------------------------------------
+
+def probe(path):
+    """En-têtes du premier flux audio (une seule lecture ffprobe)."""
+    cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format",
+           "-show_streams", "-select_streams", "a", path]
+    try:
+        info = json.loads(subprocess.run(cmd, capture_output=True, text=True, check=False).stdout or "{}")
+    except ValueError:
+        info = {}
+    streams = info.get("streams", [])
+    if not streams:
+        return None
+    s = streams[0]
+
+    def num(value, default=0):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return default
+
+    duration = s.get("duration") or info.get("format", {}).get("duration")
+    try:
+        duration = float(duration)
+    except (TypeError, ValueError):
+        duration = 0.0
+    return {"audio_streams": len(streams), "codec": s.get("codec_name", "inconnu"),
+            "sample_rate": num(s.get("sample_rate")), "channels": num(s.get("channels")),
+            "bit_rate": num(s.get("bit_rate"), None), "bits_per_sample": num(s.get("bits_per_sample"), None),
+            "duration": duration}
+
+
+def window_stats(block, win):
+    """Mesures vectorisées sur un bloc (n_fenêtres * win, canaux) d'échantillons int16."""
+    n = block.shape[0] // win
+    x = block[:n * win].astype(np.float32).reshape(n, win, block.shape[1])
+    rms_ch = np.sqrt(np.mean(x * x, axis=1))                     # (n, canaux)
+    mono = x.mean(axis=2)                                        # (n, win)
+    rms = np.sqrt(np.mean(mono * mono, axis=1))
+    peak = np.abs(x).max(axis=(1, 2))
+    clipped = (np.abs(x) >= CLIP_LEVEL).sum(axis=(1, 2))
+
+    spec = np.abs(np.fft.rfft(mono * np.hanning(win), axis=1)) ** 2 + 1e-12
+    freqs = np.fft.rfftfreq(win, 1.0 / SAMPLE_RATE)
+    band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+    band_ratio = spec[:, band].sum(axis=1) / spec.sum(axis=1)
+    flatness = np.exp(np.mean(np.log(spec), axis=1)) / np.mean(spec, axis=1)
+    zcr = np.mean(np.abs(np.diff(np.signbit(mono), axis=1)), axis=1)
+
+    silent = 20.0 * np.log10(np.maximum(rms, 1e-9) / 32768.0) < SILENCE_DBFS
+    speech = (~silent & (band_ratio >= SPEECH_BAND_RATIO) & (flatness <= SPEECH_MAX_FLATNESS)
+              & (zcr >= SPEECH_ZCR[0]) & (zcr <= SPEECH_ZCR[1]))
+    return rms, rms_ch, peak, clipped, silent, speech
+
+
+def analyze_stream(path, channels, window):
+    """Décode la piste audio une seule fois et agrège les mesures par fenêtre."""
+    out_channels = 2 if channels >= 2 else 1
+    win = int(round(window * SAMPLE_RATE))
+    frame_bytes = 2 * out_channels
+    block_bytes = BLOCK_WINDOWS * win * frame_bytes
+    cmd = ["ffmpeg", "-v", "error", "-nostdin", "-i", path, "-map", "0:a:0", "-vn",
+           "-f", "s16le", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-ac", str(out_channels), "-"]
+    # stderr dans un fichier : un fichier abîmé peut produire plus d'erreurs de décodage que le pipe n'en
+    # contient (~64 Ko), ffmpeg bloquerait alors pendant que stdout est lu
+    errlog = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errlog)
+
+    n_windows = n_silent = n_speech = 0
+    samples = clipped = 0
+    peak = 0.0
+    energy = 0.0                     # Somme des RMS² des fenêtres non silencieuses
+    energy_ch = np.zeros(out_channels)
+    pending = b""
+    while True:
+        data = proc.stdout.read(block_bytes)
+        if not data:
+            break
+        pending += data
+        usable = len(pending) - len(pending) % (win * frame_bytes)
+        if usable == 0:
+            continue
+        block = np.frombuffer(pending[:usable], dtype='<i2').reshape(-1, out_channels)
+        pending = pending[usable:]
+        rms, rms_ch, w_peak, w_clipped, silent, speech = window_stats(block, win)
+        n_windows += len(rms)
+        n_silent += int(silent.sum())
+        n_speech += int(speech.sum())
+        samples += block.size
+        clipped += int(w_clipped.sum())
+        peak = max(peak, float(w_peak.max()))
+        energy += float((rms[~silent] ** 2).sum())
+        energy_ch += (rms_ch[~silent] ** 2).sum(axis=0)
+    # Queue du flux (< 1 fenêtre) comptée dans la durée seulement
+    samples += len(pending) // 2
+    returncode = proc.wait()
+    errlog.seek(max(0, errlog.seek(0, os.SEEK_END) - 4096))
+    stderr = errlog.read().decode("utf-8", errors="replace")
+    errlog.close()
+
+    voiced = n_windows - n_silent
+    imbalance = 0.0
+    if out_channels == 2 and voiced > 0 and energy_ch.min() > 0:
+        imbalance = float(10.0 * np.log10(energy_ch[0] / energy_ch[1]))
+    return {"decode_ok": returncode == 0, "decode_error": stderr.strip()[-300:],
+            "decoded_duration": samples / out_channels / SAMPLE_RATE, "windows": n_windows,
+            "rms_dbfs": dbfs(np.sqrt(energy / voiced)) if voiced else -120.0,
+            "peak_dbfs": dbfs(peak), "clipped_ratio": clipped / samples if samples else 0.0,
+            "silence_ratio": n_silent / n_windows if n_windows else 1.0,
+            "speech_ratio": n_speech / voiced if voiced else 0.0,
+            "imbalance_db": imbalance, "analyzed_channels": out_channels}
+
+
+# ---------------------------------------------------------------------------
+# Verdict et solutions (mêmes seuils que l'ancien --analyze de transcribe_mp4.sh)
+# ---------------------------------------------------------------------------
+
+def report(path, meta, m):
+    issues = 0
+    solutions = []
+    f = path
+
+    print(f"✅ Nombre de flux audio : {meta['audio_streams']}")
+    if meta["audio_streams"] > 1:
+        print("ℹ️  Note : Whisper utilisera automatiquement le premier flux audio")
+
+    print("\n📊 ANALYSE DÉTAILLÉE DU FLUX AUDIO PRINCIPAL :")
+    print(f"  Codec audio : {meta['codec']}")
+    print(f"  Fréquence échantillonnage : {meta['sample_rate']} Hz")
+    print(f"  Nombre de canaux : {meta['channels']}")
+    print(f"  Débit binaire : {meta['bit_rate'] if meta['bit_rate'] else 'inconnu'} bps")
+    print(f"  Profondeur bits : {meta['bits_per_sample'] if meta['bits_per_sample'] else 'inconnu'} bits")
+    if meta["duration"]:
+        print(f"  Durée audio : {meta['duration']:.1f}s")
+
+    print("\n✅ ANALYSE DE COMPATIBILITÉ WHISPER :")
+
+    print("\n🔧 CODEC AUDIO :")
+    codec = meta["codec"]
+    if codec == "aac":
+        print("  ✅ AAC : Codec optimal pour Whisper")
+    elif codec == "mp3":
+        print("  ✅ MP3 : Parfaitement supporté")
+    elif codec == "wav" or codec.startswith("pcm"):
+        print("  ✅ WAV/PCM : Format natif Whisper, aucune conversion nécessaire")
+    elif codec == "flac":
+        print("  ✅ FLAC : Excellente qualité, bien supporté")
+    elif codec in ("ogg", "vorbis", "opus"):
+        print("  ✅ OGG/Vorbis/Opus : Bien supporté")
+    elif codec in ("ac3", "eac3"):
+        print("  ⚠️  AC-3/E-AC-3 : Supporté mais conversion recommandée")
+        solutions.append(f"Convertir en AAC pour de meilleures performances : ffmpeg -i '{f}' -c:v copy -c:a aac -b:a 128k '{f}.aac.mp4'")
+        issues += 1
+    elif codec in ("dts", "truehd"):
+        print("  ⚠️  DTS/TrueHD : Format HD, conversion nécessaire")
+        solutions.append(f"Convertir obligatoirement : ffmpeg -i '{f}' -c:v copy -c:a aac -b:a 192k '{f}.converted.mp4'")
+        issues += 1
+    else:
+        print(f"  ❌ Codec non standard ou inconnu : {codec}")
+        solutions.append(f"SOLUTION URGENTE - Convertir le codec : ffmpeg -i '{f}' -c:v copy -c:a aac -b:a 128k '{f}.fixed.mp4'")
+        issues += 2
+
+    print("\n📡 FRÉQUENCE D'ÉCHANTILLONNAGE :")
+    sr = meta["sample_rate"]
+    if sr >= 44100:
+        print(f"  ✅ {sr} Hz : Excellente qualité (≥44.1kHz)")
+    elif sr >= 22050:
+        print(f"  ✅ {sr} Hz : Très bonne qualité (≥22kHz)")
+    elif sr >= 16000:
+        print(f"  ✅ {sr} Hz : Qualité correcte (≥16kHz requis minimum)")
+    elif sr >= 8000:
+        print(f"  ⚠️  {sr} Hz : Fréquence faible, qualité dégradée")
+        solutions.append(f"Améliorer la qualité : ffmpeg -i '{f}' -c:v copy -c:a aac -ar 22050 '{f}.22k.mp4'")
+        issues += 1
+    else:
+        print(f"  ❌ {sr} Hz : Fréquence très faible, transcription fortement compromise")
+        solutions.append(f"SOLUTION URGENTE - Réchantillonner : ffmpeg -i '{f}' -c:v copy -c:a aac -ar 16000 '{f}.16k.mp4'")
+        issues += 2
+
+    print("\n🔊 CONFIGURATION DES CANAUX :")
+    ch = meta["channels"]
+    if ch == 1:
+        print("  ✅ Audio MONO : Configuration optimale pour Whisper")
+    elif ch == 2:
+        print("  ✅ Audio STÉRÉO : Sera automatiquement converti en mono")
+        print("     ℹ️  Whisper mixe automatiquement les canaux L+R")
+    elif 2 < ch <= 8:
+        print(f"  ℹ️  Audio MULTICANAL ({ch} canaux) : Conversion automatique en mono")
+        print("     ℹ️  Pour préserver une piste spécifique :")
+        solutions.append(f"Extraire canal spécifique : ffmpeg -i '{f}' -af 'pan=mono|c0=0.5*c0+0.5*c1' -c:v copy '{f}.mono.mp4'")
+    else:
+        print(f"  ❌ Configuration de canaux invalide : {ch}")
+        solutions.append(f"SOLUTION - Forcer stéréo : ffmpeg -i '{f}' -c:v copy -ac 2 '{f}.stereo.mp4'")
+        issues += 1
+
+    print("\n💾 DÉBIT BINAIRE :")
+    if meta["bit_rate"]:
+        kb = meta["bit_rate"] // 1000
+        if kb >= 128:
+            print(f"  ✅ {kb} kbps : Débit excellent pour la transcription")
+        elif kb >= 64:
+            print(f"  ✅ {kb} kbps : Débit suffisant")
+        elif kb >= 32:
+            print(f"  ⚠️  {kb} kbps : Débit faible, qualité possiblement réduite")
+            solutions.append(f"Améliorer le débit : ffmpeg -i '{f}' -c:v copy -c:a aac -b:a 128k '{f}.128k.mp4'")
+            issues += 1
+        else:
+            print(f"  ❌ {kb} kbps : Débit très faible, qualité fortement compromise")
+            solutions.append(f"SOLUTION URGENTE - Augmenter le débit : ffmpeg -i '{f}' -c:v copy -c:a aac -b:a 128k '{f}.highq.mp4'")
+            issues += 2
+    else:
+        print("  ℹ️  Débit inconnu (format lossless probable)")
+
+    # Remplace les 3 extractions de test : le décodage complet a eu lieu une seule fois
+    print(f"\n🧪 DÉCODAGE COMPLET EN FLUX ({m['windows']} fenêtres analysées) :")
+    expected = meta["duration"]
+    if not m["decode_ok"]:
+        print("    ❌ ÉCHEC du décodage audio")
+        if m["decode_error"]:
+            print(f"       {m['decode_error'].splitlines()[-1]}")
+        solutions.append(f"ERREUR CRITIQUE - Vérifier l'intégrité : ffmpeg -v error -i '{f}' -f null - 2>error.log")
+        issues += 3
+    elif expected and m["decoded_duration"] < 0.9 * expected:
+        print(f"    ⚠️  Audio tronqué : {m['decoded_duration']:.1f}s décodées sur {expected:.1f}s annoncées")
+        solutions.append(f"Réencoder le fichier complet : ffmpeg -i '{f}' -c:v copy -c:a aac -ar 22050 -b:a 128k '{f}.reencoded.mp4'")
+        issues += 2
+    else:
+        print(f"    ✅ Décodage réussi : {m['decoded_duration']:.1f}s d'audio")
+
+    print("\n📈 MESURES DU SIGNAL :")
+    print(f"  Niveau RMS (hors silences) : {m['rms_dbfs']:.1f} dBFS")
+    print(f"  Crête : {m['peak_dbfs']:.1f} dBFS")
+    print(f"  Échantillons écrêtés : {m['clipped_ratio'] * 100:.3f}%")
+    print(f"  Part de silence : {m['silence_ratio'] * 100:.1f}%")
+    print(f"  Vraisemblance de parole (hors silences) : {m['speech_ratio'] * 100:.1f}%")
+    if m["analyzed_channels"] == 2:
+        print(f"  Déséquilibre gauche/droite : {m['imbalance_db']:+.1f} dB")
+
+    if m["windows"] and m["silence_ratio"] < 1.0:
+        if m["clipped_ratio"] > 0.01:
+            print("  ❌ Saturation importante : mots déformés probables")
+            solutions.append(f"Atténuer l'écrêtage : ffmpeg -i '{f}' -c:v copy -af adeclip -c:a aac -b:a 128k '{f}.declip.mp4'")
+            issues += 2
+        elif m["clipped_ratio"] > 0.001:
+            print("  ⚠️  Écrêtage ponctuel détecté")
+            solutions.append(f"Atténuer l'écrêtage : ffmpeg -i '{f}' -c:v copy -af adeclip -c:a aac -b:a 128k '{f}.declip.mp4'")
+            issues += 1
+        if m["rms_dbfs"] < -35.0:
+            print("  ⚠️  Niveau sonore faible")
+            solutions.append(f"Normaliser le volume : ffmpeg -i '{f}' -c:v copy -af loudnorm -c:a aac -b:a 128k '{f}.loudnorm.mp4'")
+            issues += 1
+        if abs(m["imbalance_db"]) > 6.0:
+            strong = 0 if m["imbalance_db"] > 0 else 1
+            print(f"  ⚠️  Voix surtout sur le canal {'gauche' if strong == 0 else 'droit'}")
+            solutions.append(f"Garder le canal utile : ffmpeg -i '{f}' -c:v copy -af 'pan=mono|c0=c{strong}' -c:a aac '{f}.mono.mp4'")
+            issues += 1
+        if m["speech_ratio"] < 0.2:
+            print("  ⚠️  Peu de fenêtres ressemblent à de la parole (musique ou bruit dominant)")
+            solutions.append(f"Filtrer la bande vocale : ffmpeg -i '{f}' -c:v copy -af 'highpass=f=200,lowpass=f=3500' -c:a aac '{f}.voice.mp4'")
+            issues += 1
+        if m["silence_ratio"] > 0.8:
+            print("  ⚠️  Enregistrement majoritairement silencieux")
+            solutions.append(f"Retirer les silences : ffmpeg -i '{f}' -c:v copy -af 'silenceremove=stop_periods=-1:stop_duration=1:stop_threshold=-45dB' -c:a aac '{f}.trim.mp4'")
+            issues += 1
+        elif m["silence_ratio"] > 0.5:
+            print("  ℹ️  Beaucoup de silences : --chunked découpera l'audio à ces endroits")
+    elif m["windows"]:
+        print("  ❌ Aucun signal audible dans tout le fichier")
+        issues += 3
+
+    print("\n========================================")
+    print("=== VERDICT FINAL DE COMPATIBILITÉ ===")
+    print("========================================")
+    if issues == 0:
+        print("✅ FICHIER PARFAITEMENT COMPATIBLE AVEC WHISPER")
+        print("   → Transcription possible avec qualité OPTIMALE")
+        print("   → Aucune modification nécessaire")
+        return issues, 0
+    if issues <= 2:
+        print(f"⚠️  FICHIER COMPATIBLE AVEC RÉSERVES ({issues} point(s) d'attention)")
+        print("   → Transcription possible, qualité BONNE à CORRECTE")
+        print("   → Améliorations recommandées mais optionnelles")
+        if solutions:
+            print("\n💡 SOLUTIONS RECOMMANDÉES POUR OPTIMISER :")
+            for i, s in enumerate(solutions, 1):
+                print(f"   {i}. {s}")
+        return issues, 0
+    if issues <= 4:
+        print(f"⚠️  FICHIER PROBLÉMATIQUE ({issues} problèmes détectés)")
+        print("   → Transcription DIFFICILE, qualité DÉGRADÉE probable")
+        print("   → Corrections FORTEMENT recommandées")
+        print("\n🔧 SOLUTIONS OBLIGATOIRES POUR CORRIGER :")
+        for i, s in enumerate(solutions, 1):
+            print(f"   {i}. {s}")
+        return issues, 1
+    print(f"❌ FICHIER INCOMPATIBLE AVEC WHISPER ({issues} problèmes critiques)")
+    print("   → Transcription IMPOSSIBLE en l'état")
+    print("   → Corrections OBLIGATOIRES avant utilisation")
+    print("\n🚨 SOLUTIONS D'URGENCE POUR RENDRE COMPATIBLE :")
+    for i, s in enumerate(solutions, 1):
+        print(f"   {i}. {s}")
+    print(f"   {len(solutions) + 1}. SOLUTION UNIVERSELLE (dernier recours) :")
+    print(f"       ffmpeg -i '{f}' -vn -acodec pcm_s16le -ar 16000 -ac 1 '{f}.whisper-ready.wav'")
+    print("       Puis utilisez directement le fichier WAV avec Whisper")
+    return issues, 1
+
+
+def analyze_file(path, cache, window, use_cache):
+    """Retourne (métadonnées, mesures, provenance) en passant par le cache si possible."""
+    key = f"{file_key(path, cache)}:{window}"
+    if use_cache and key in cache["results"]:
+        entry = cache["results"][key]
+        return entry["meta"], entry["metrics"], "cache"
+    meta = probe(path)
+    metrics = analyze_stream(path, meta["channels"], window) if meta else None
+    if meta and metrics["decode_ok"]:
+        cache["results"][key] = {"meta": meta, "metrics": metrics}
+    return meta, metrics, "décodage"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Analyse audio Whisper en une passe avec cache par empreinte.")
+    parser.add_argument('files', nargs='+', help='Fichiers vidéo/audio à analyser.')
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW, help=f'Taille de fenêtre en secondes (défaut: {DEFAULT_WINDOW}).')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_FILE, help=f'Fichier cache JSON (défaut: {DEFAULT_CACHE_FILE}).')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore le cache existant (les résultats sont quand même enregistrés).')
+    parser.add_argument('--json', action='store_true', help='Affiche les mesures brutes en JSON au lieu du rapport.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cache = load_cache(args.cache)
+    status = 0
+    for path in args.files:
+        start = time.monotonic()
+        print("")
+        print("=== ANALYSE AUDIO DETAILLEE POUR WHISPER ===")
+        print(f"Fichier analysé : {path}")
+        print("")
+        print("🔍 DÉTECTION DES FLUX AUDIO :")
+        meta, metrics, source = analyze_file(path, cache, args.window, not args.no_cache)
+        if meta is None:
+            print("❌ ERREUR CRITIQUE : AUCUN FLUX AUDIO DÉTECTÉ")
+            print("\n🚨 PROBLÈMES CRITIQUES DÉTECTÉS :")
+            print("   Le fichier ne contient pas de piste audio utilisable")
+            print("   SOLUTIONS POSSIBLES :")
+            print(f"     1. Vérifier que le fichier n'est pas corrompu : ffprobe -v error '{path}'")
+            print(f"     2. Essayer de réencoder : ffmpeg -i '{path}' -c:v copy -c:a aac '{path}.fixed.mp4'")
+            print("     3. Utiliser un autre fichier source avec audio")
+            status = 1
+            continue
+        if args.json:
+            print(json.dumps({"file": path, "meta": meta, "metrics": metrics}, ensure_ascii=False))
+            continue
+        _, code = report(path, meta, metrics)
+        print(f"\n⏱️  Analyse ({source}) en {time.monotonic() - start:.2f}s")
+        status = max(status, code)
+    save_cache(args.cache, cache)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@
 # Email : bruno.delnoz@protonmail.com
 # Nom du script : transcribe_mp4.sh
 # Target usage : Transcription d'un fichier MP4 en texte avec whisper.cpp
-# Version : v2.2 - Date : 2025-08-17
+# Version : v2.8 - Date : 2025-08-27
 # Changelog :
 #   v1.0 - 2025-08-10 - Script initial pour transcrire un MP4 avec whisper.cpp
 #   v1.1 - 2025-08-11 - Ajout gestion logs, help, et vérification binaire whisper
@@ -20,15 +20,62 @@
 #   v2.0 - 2025-08-17 - Ajout --folder pour traitement par lot + analyse détaillée avec solutions
 #   v2.1 - 2025-08-17 - Correction détection fichiers vidéo + debug amélioré
 #   v2.2 - 2025-08-17 - CORRECTION détection fichiers vidéo dans --folder mode
+#   v2.3 - 2025-08-18 - Ajout --chunked : découpage aux silences, whisper-cli parallèles, assemblage txt/srt/vtt
+#   v2.4 - 2025-08-19 - --folder : worker résident whisper-server (modèle chargé une fois), pré-extraction bornée,
+#                       mesures par fichier chargement/inférence dans timings.transcribe_mp4.tsv
+#   v2.5 - 2025-08-20 - --analyze en une passe (analyze_audio_stream.py, numpy) : RMS, écrêtage, silence,
+#                       déséquilibre, parole par fenêtre ; cache par empreinte ; plus de WAV de test
+#   v2.6 - 2025-08-25 - Index des médias partagé avec compress_videos.sh (media_index.py) : vidéo renommée,
+#                       déplacée, en double ou à l'audio identique -> transcription existante réutilisée
+#   v2.7 - 2025-08-27 - --analyze : prérequis (ffprobe, numpy) vérifiés avant les fichiers, un manque n'est
+#                       plus signalé comme fichier incompatible
+#   v2.8 - 2025-08-27 - Index des médias consulté seulement avec --use-index (contenu identique) ;
+#                       réutilisation à l'audio quasi identique (fpcalc) seulement avec --fuzzy-index ;
+#                       --chunked : doublons retirés seulement après une coupe forcée (recouvrement),
+#                       une répétition réelle de part et d'autre d'un silence est conservée ;
+#                       worker résident lancé avec --suppress-nst comme whisper-cli ; pré-extraction
+#                       d'un fichier finalement ignoré (--analyze, sortie réutilisée) arrêtée et supprimée
 
 set -e
 
 # Variables globales
 WHISPER_BIN="./whisper.cpp/build/bin/whisper-cli"
 MODELS_DIR="./whisper.cpp/models"
-LOG_FILE="log.transcribe_mp4.v2.2.log"
+LOG_FILE="log.transcribe_mp4.v2.8.log"
+TIMINGS_FILE="timings.transcribe_mp4.tsv"
 ACTIONS_LOG=()
 
+# Paramètres du mode --chunked
+CHUNK_MAX=300            # Durée max d'un segment en secondes (--chunk-max)
+CHUNK_MIN=30             # Durée min d'un segment avant de chercher un silence de coupe
+CHUNK_OVERLAP=1          # Recouvrement (s) des coupes forcées, faute de silence dans la fenêtre
+CHUNK_DEDUP_WORDS=8      # Nombre max de mots comparés aux frontières pour retirer les doublons
+CHUNK_WORKERS=""         # Nombre de whisper-cli simultanés (--workers, défaut: cœurs / threads)
+SILENCE_NOISE="-35dB"    # Seuil de silence pour ffmpeg silencedetect
+SILENCE_MIN_DUR=0.4      # Durée min (s) d'un silence utilisable comme point de coupe
+
+# Analyseur audio --analyze (une passe, cache par empreinte)
+ANALYZER_PY="$(dirname "$0")/analyze_audio_stream.py"
+ANALYZER_VENV="./whisper_env"     # Virtualenv créé par install_whisper.sh (numpy via openai-whisper)
+ANALYZE_CACHE="cache.analyze_audio.json"
+
+# Index des médias partagé avec compress_videos.sh (base : $MEDIA_INDEX_DB ou ~/.local/share/media_index/)
+MEDIA_INDEX_PY="${MEDIA_INDEX_PY:-$(dirname "$0")/../multimedia_tools/media_index.py}"
+declare -A INDEX_STATUS=()
+declare -A INDEX_REFS=()
+
+# Worker résident du mode --folder (whisper-server de whisper.cpp)
+RESIDENT_BIN="./whisper.cpp/build/bin/whisper-server"
+RESIDENT_HOST="127.0.0.1"
+RESIDENT_PORT=8910       # Port local du worker (--port)
+RESIDENT_QUEUE=2         # Fichiers pré-extraits d'avance au maximum (--queue)
+RESIDENT_START_TIMEOUT=600
+RESIDENT_PID=""
+RESIDENT_DIR=""
+RESIDENT_LOAD_S=""
+RESIDENT_FIRST_JOB=0
+declare -A PREFETCH_PID=()
+
 # Extensions vidéo supportées
 VIDEO_EXTENSIONS=("mp4" "avi" "mkv" "mov" "wmv" "flv" "webm" "m4v" "3gp" "ogv" "ts" "mts" "m2ts")
 
@@ -63,346 +110,22 @@ is_video_file() {
 }
 
 # Fonction d'analyse audio détaillée avec solutions précises
+# Une seule passe de décodage en flux par analyze_audio_stream.py (numpy), résultats
+# mis en cache par empreinte du fichier : une relance sur un dossier inchangé est immédiate
 analyze_audio() {
     local file="$1"
-    local audio_issues=0
-    local solutions=()
-    local critical_issues=()
-
-    echo ""
-    echo "=== ANALYSE AUDIO DETAILLEE POUR WHISPER ==="
-    echo "Fichier analysé : $file"
-    echo ""
 
     log_action "Début analyse audio détaillée '$file'"
 
-    # Vérification prérequis
-    if ! command -v ffprobe >/dev/null 2>&1; then
-        echo "❌ ERREUR CRITIQUE : ffprobe requis pour l'analyse"
-        critical_issues+=("Installer le paquet ffmpeg : sudo apt install ffmpeg (Ubuntu/Debian) ou brew install ffmpeg (macOS)")
-        return 1
-    fi
-
-    # Extraction infos audio avec ffprobe
-    echo "🔍 DÉTECTION DES FLUX AUDIO :"
-
-    local audio_streams=$(ffprobe -v quiet -select_streams a -show_streams "$file" 2>/dev/null || echo "")
-
-    if [ -z "$audio_streams" ]; then
-        echo "❌ ERREUR CRITIQUE : AUCUN FLUX AUDIO DÉTECTÉ"
-        critical_issues+=("Le fichier ne contient pas de piste audio utilisable")
-        critical_issues+=("SOLUTIONS POSSIBLES :")
-        critical_issues+=("  1. Vérifier que le fichier n'est pas corrompu : ffprobe -v error '$file'")
-        critical_issues+=("  2. Essayer de réencoder : ffmpeg -i '$file' -c:v copy -c:a aac '$file.fixed.mp4'")
-        critical_issues+=("  3. Utiliser un autre fichier source avec audio")
-        log_action "Erreur critique : aucun flux audio détecté"
-
-        echo ""
-        echo "🚨 PROBLÈMES CRITIQUES DÉTECTÉS :"
-        for issue in "${critical_issues[@]}"; do
-            echo "   $issue"
-        done
-        return 1
-    fi
-
-    # Compter les flux audio
-    local audio_count=$(ffprobe -v quiet -select_streams a -show_entries stream=index -of csv=p=0 "$file" 2>/dev/null | wc -l)
-    echo "✅ Nombre de flux audio : $audio_count"
-
-    if [ "$audio_count" -gt 1 ]; then
-        echo "ℹ️  Note : Whisper utilisera automatiquement le premier flux audio"
-    fi
-
-    # Analyse détaillée du premier flux audio
-    echo ""
-    echo "📊 ANALYSE DÉTAILLÉE DU FLUX AUDIO PRINCIPAL :"
-
-    local codec=$(ffprobe -v quiet -select_streams a:0 -show_entries stream=codec_name -of default=noprint_wrappers=1:nokey=1 "$file" 2>/dev/null || echo "inconnu")
-    local sample_rate=$(ffprobe -v quiet -select_streams a:0 -show_entries stream=sample_rate -of default=noprint_wrappers=1:nokey=1 "$file" 2>/dev/null || echo "0")
-    local channels=$(ffprobe -v quiet -select_streams a:0 -show_entries stream=channels -of default=noprint_wrappers=1:nokey=1 "$file" 2>/dev/null || echo "0")
-    local bit_rate=$(ffprobe -v quiet -select_streams a:0 -show_entries stream=bit_rate -of default=noprint_wrappers=1:nokey=1 "$file" 2>/dev/null || echo "inconnu")
-    local duration=$(ffprobe -v quiet -select_streams a:0 -show_entries stream=duration -of default=noprint_wrappers=1:nokey=1 "$file" 2>/dev/null || echo "0")
-    local bit_depth=$(ffprobe -v quiet -select_streams a:0 -show_entries stream=bits_per_sample -of default=noprint_wrappers=1:nokey=1 "$file" 2>/dev/null || echo "inconnu")
-
-    echo "  Codec audio : $codec"
-    echo "  Fréquence échantillonnage : ${sample_rate} Hz"
-    echo "  Nombre de canaux : $channels"
-    echo "  Débit binaire : ${bit_rate} bps"
-    echo "  Profondeur bits : ${bit_depth} bits"
-    if [ "$duration" != "0" ] && [ "$duration" != "N/A" ]; then
-        echo "  Durée audio : $(printf "%.1f" "$duration")s"
-    fi
-
-    echo ""
-    echo "✅ ANALYSE DE COMPATIBILITÉ WHISPER :"
-
-    # === ANALYSE CODEC ===
-    echo ""
-    echo "🔧 CODEC AUDIO :"
-    case "$codec" in
-        aac)
-            echo "  ✅ AAC : Codec optimal pour Whisper"
-            ;;
-        mp3)
-            echo "  ✅ MP3 : Parfaitement supporté"
-            ;;
-        wav|pcm*)
-            echo "  ✅ WAV/PCM : Format natif Whisper, aucune conversion nécessaire"
-            ;;
-        flac)
-            echo "  ✅ FLAC : Excellente qualité, bien supporté"
-            ;;
-        ogg|vorbis|opus)
-            echo "  ✅ OGG/Vorbis/Opus : Bien supporté"
-            ;;
-        ac3|eac3)
-            echo "  ⚠️  AC-3/E-AC-3 : Supporté mais conversion recommandée"
-            solutions+=("Convertir en AAC pour de meilleures performances : ffmpeg -i '$file' -c:v copy -c:a aac -b:a 128k '$file.aac.mp4'")
-            audio_issues=$((audio_issues + 1))
-            ;;
-        dts|truehd)
-            echo "  ⚠️  DTS/TrueHD : Format HD, conversion nécessaire"
-            solutions+=("Convertir obligatoirement : ffmpeg -i '$file' -c:v copy -c:a aac -b:a 192k '$file.converted.mp4'")
-            audio_issues=$((audio_issues + 1))
-            ;;
-        *)
-            echo "  ❌ Codec non standard ou inconnu : $codec"
-            solutions+=("SOLUTION URGENTE - Convertir le codec : ffmpeg -i '$file' -c:v copy -c:a aac -b:a 128k '$file.fixed.mp4'")
-            audio_issues=$((audio_issues + 2))
-            ;;
-    esac
-
-    # === ANALYSE FRÉQUENCE D'ÉCHANTILLONNAGE ===
-    echo ""
-    echo "📡 FRÉQUENCE D'ÉCHANTILLONNAGE :"
-    if [ "$sample_rate" -ge 44100 ]; then
-        echo "  ✅ ${sample_rate} Hz : Excellente qualité (≥44.1kHz)"
-    elif [ "$sample_rate" -ge 22050 ]; then
-        echo "  ✅ ${sample_rate} Hz : Très bonne qualité (≥22kHz)"
-    elif [ "$sample_rate" -ge 16000 ]; then
-        echo "  ✅ ${sample_rate} Hz : Qualité correcte (≥16kHz requis minimum)"
-    elif [ "$sample_rate" -ge 8000 ]; then
-        echo "  ⚠️  ${sample_rate} Hz : Fréquence faible, qualité dégradée"
-        solutions+=("Améliorer la qualité : ffmpeg -i '$file' -c:v copy -c:a aac -ar 22050 '$file.22k.mp4'")
-        audio_issues=$((audio_issues + 1))
-    else
-        echo "  ❌ ${sample_rate} Hz : Fréquence très faible, transcription fortement compromise"
-        solutions+=("SOLUTION URGENTE - Réchantillonner : ffmpeg -i '$file' -c:v copy -c:a aac -ar 16000 '$file.16k.mp4'")
-        audio_issues=$((audio_issues + 2))
-    fi
-
-    # === ANALYSE CANAUX ===
-    echo ""
-    echo "🔊 CONFIGURATION DES CANAUX :"
-    if [ "$channels" -eq 1 ]; then
-        echo "  ✅ Audio MONO : Configuration optimale pour Whisper"
-    elif [ "$channels" -eq 2 ]; then
-        echo "  ✅ Audio STÉRÉO : Sera automatiquement converti en mono"
-        echo "     ℹ️  Whisper mixe automatiquement les canaux L+R"
-    elif [ "$channels" -gt 2 ] && [ "$channels" -le 8 ]; then
-        echo "  ℹ️  Audio MULTICANAL ($channels canaux) : Conversion automatique en mono"
-        echo "     ℹ️  Pour préserver une piste spécifique :"
-        solutions+=("Extraire canal spécifique : ffmpeg -i '$file' -af 'pan=mono|c0=0.5*c0+0.5*c1' -c:v copy '$file.mono.mp4'")
-    else
-        echo "  ❌ Configuration de canaux invalide : $channels"
-        solutions+=("SOLUTION - Forcer stéréo : ffmpeg -i '$file' -c:v copy -ac 2 '$file.stereo.mp4'")
-        audio_issues=$((audio_issues + 1))
-    fi
-
-    # === ANALYSE DÉBIT BINAIRE ===
-    echo ""
-    echo "💾 DÉBIT BINAIRE :"
-    if [ "$bit_rate" != "inconnu" ] && [ "$bit_rate" != "N/A" ]; then
-        local bit_rate_kb=$((bit_rate / 1000))
-        if [ "$bit_rate_kb" -ge 128 ]; then
-            echo "  ✅ ${bit_rate_kb} kbps : Débit excellent pour la transcription"
-        elif [ "$bit_rate_kb" -ge 64 ]; then
-            echo "  ✅ ${bit_rate_kb} kbps : Débit suffisant"
-        elif [ "$bit_rate_kb" -ge 32 ]; then
-            echo "  ⚠️  ${bit_rate_kb} kbps : Débit faible, qualité possiblement réduite"
-            solutions+=("Améliorer le débit : ffmpeg -i '$file' -c:v copy -c:a aac -b:a 128k '$file.128k.mp4'")
-            audio_issues=$((audio_issues + 1))
-        else
-            echo "  ❌ ${bit_rate_kb} kbps : Débit très faible, qualité fortement compromise"
-            solutions+=("SOLUTION URGENTE - Augmenter le débit : ffmpeg -i '$file' -c:v copy -c:a aac -b:a 128k '$file.highq.mp4'")
-            audio_issues=$((audio_issues + 2))
-        fi
-    else
-        echo "  ℹ️  Débit inconnu (format lossless probable)"
-    fi
-
-    # Tests de conversion pratiques
-    echo ""
-    echo "🧪 TESTS DE CONVERSION WHISPER (3 échantillons de 20 secondes) :"
-
-    # Calcul de la durée totale
-    local total_duration=$(ffprobe -v quiet -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "$file" 2>/dev/null || echo "0")
-
-    if [ "$total_duration" = "0" ] || [ "$(echo "$total_duration < 60" | bc -l 2>/dev/null || echo "1")" = "1" ]; then
-        echo "  ⚠️  Vidéo courte (${total_duration%.*}s) - Test unique de 20 secondes"
-
-        # Test unique pour vidéos courtes
-        local test_wav="${file%.*}_whisper_test.wav"
-        echo "  🔄 Test extraction audio WAV 16kHz mono (20 premières secondes)..."
-
-        if ffmpeg -y -i "$file" -vn -acodec pcm_s16le -ar 16000 -ac 1 -t 20 "$test_wav" >/dev/null 2>&1; then
-            # Vérification qualité du fichier généré
-            if [ -f "$test_wav" ]; then
-                local wav_size=$(stat -c%s "$test_wav" 2>/dev/null || stat -f%z "$test_wav" 2>/dev/null || echo "0")
-                local wav_duration=$(ffprobe -v quiet -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "$test_wav" 2>/dev/null || echo "0")
-                local expected_size=$((20 * 16000 * 2)) # 20sec * 16kHz * 2bytes
-
-                if [ "$wav_size" -gt $((expected_size / 2)) ] && [ "${wav_duration%.*}" -ge 15 ]; then
-                    echo "    ✅ Conversion réussie - Taille: $(numfmt --to=iec "$wav_size" 2>/dev/null || echo "${wav_size}B") - Durée: ${wav_duration%.*}s"
-                else
-                    echo "    ❌ Fichier WAV défaillant - Taille: $(numfmt --to=iec "$wav_size" 2>/dev/null || echo "${wav_size}B")"
-                    solutions+=("PROBLÈME DE CONVERSION - Essayer : ffmpeg -i '$file' -vn -acodec pcm_s16le -ar 16000 -ac 1 '$file.debug.wav'")
-                    audio_issues=$((audio_issues + 2))
-                fi
-                rm -f "$test_wav"
-            fi
-        else
-            echo "    ❌ ÉCHEC TOTAL de la conversion audio"
-            solutions+=("ERREUR CRITIQUE - Vérifier l'intégrité : ffmpeg -v error -i '$file' -f null - 2>error.log")
-            audio_issues=$((audio_issues + 3))
-        fi
-    else
-        # Tests multiples pour vidéos longues
-        echo "  📏 Durée totale : ${total_duration%.*}s - Tests à 3 positions stratégiques"
-
-        # Calcul des 3 positions optimales
-        local pos1=$(echo "$total_duration * 0.10" | bc -l 2>/dev/null || echo "5")
-        local pos2=$(echo "$total_duration * 0.50" | bc -l 2>/dev/null || echo "$(echo "$total_duration / 2" | bc -l)")
-        local pos3=$(echo "$total_duration * 0.85" | bc -l 2>/dev/null || echo "$(echo "$total_duration - 25" | bc -l)")
-
-        # Sécuriser pos3 pour éviter de dépasser
-        if [ "$(echo "$pos3 + 20 > $total_duration" | bc -l 2>/dev/null || echo "0")" = "1" ]; then
-            pos3=$(echo "$total_duration - 25" | bc -l 2>/dev/null || echo "$pos3")
-        fi
-
-        local positions=("$pos1" "$pos2" "$pos3")
-        local position_names=("DÉBUT (10%)" "MILIEU (50%)" "FIN (85%)")
-        local test_passed=0
-        local test_issues=()
-
-        for i in "${!positions[@]}"; do
-            local pos="${positions[$i]}"
-            local pos_name="${position_names[$i]}"
-            local test_wav="${file%.*}_whisper_test_$((i+1)).wav"
-
-            echo "  🔄 Test $((i+1))/3 - ${pos_name} à ${pos%.*}s :"
-
-            if ffmpeg -y -i "$file" -vn -acodec pcm_s16le -ar 16000 -ac 1 -ss "$pos" -t 20 "$test_wav" >/dev/null 2>&1; then
-                if [ -f "$test_wav" ]; then
-                    local wav_size=$(stat -c%s "$test_wav" 2>/dev/null || stat -f%z "$test_wav" 2>/dev/null || echo "0")
-                    local wav_duration=$(ffprobe -v quiet -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "$test_wav" 2>/dev/null || echo "0")
-                    local expected_size=$((20 * 16000 * 2))
-
-                    if [ "$wav_size" -gt $((expected_size / 2)) ] && [ "${wav_duration%.*}" -ge 15 ]; then
-                        echo "    ✅ Test réussi - ${wav_size} bytes, ${wav_duration%.*}s"
-                        test_passed=$((test_passed + 1))
-                    else
-                        echo "    ⚠️  Test suspect - Taille: ${wav_size}B, Durée: ${wav_duration%.*}s"
-                        test_issues+=("Position ${pos_name}: fichier WAV anormalement petit")
-                        audio_issues=$((audio_issues + 1))
-                    fi
-                    rm -f "$test_wav"
-                else
-                    echo "    ❌ Fichier WAV non créé"
-                    test_issues+=("Position ${pos_name}: échec création WAV")
-                    audio_issues=$((audio_issues + 1))
-                fi
-            else
-                echo "    ❌ ÉCHEC conversion à cette position"
-                test_issues+=("Position ${pos_name}: erreur ffmpeg lors de la conversion")
-                audio_issues=$((audio_issues + 1))
-                rm -f "$test_wav" 2>/dev/null
-            fi
-        done
-
-        echo ""
-        echo "  📊 RÉSULTATS DÉTAILLÉS DES TESTS :"
-        echo "    Tests réussis : $test_passed/3"
-
-        if [ "$test_passed" -eq 3 ]; then
-            echo "    ✅ TOUS LES TESTS RÉUSSIS : Fichier parfaitement compatible"
-        elif [ "$test_passed" -eq 2 ]; then
-            echo "    ⚠️  2/3 tests réussis : Compatible avec quelques réserves"
-            for issue in "${test_issues[@]}"; do
-                echo "      • $issue"
-            done
-        elif [ "$test_passed" -eq 1 ]; then
-            echo "    ⚠️  1/3 test réussi : Problèmes fréquents détectés"
-            solutions+=("Réencoder le fichier complet : ffmpeg -i '$file' -c:v copy -c:a aac -ar 22050 -b:a 128k '$file.reencoded.mp4'")
-        else
-            echo "    ❌ AUCUN TEST RÉUSSI : Fichier incompatible ou corrompu"
-            solutions+=("SOLUTION D'URGENCE - Réencoder complètement : ffmpeg -i '$file' -c:v libx264 -c:a aac -ar 16000 -ac 1 -b:a 96k '$file.fixed.mp4'")
-            audio_issues=$((audio_issues + 3))
-        fi
-    fi
-
-    # === VERDICT FINAL AVEC SOLUTIONS ===
-    echo ""
-    echo "========================================"
-    echo "=== VERDICT FINAL DE COMPATIBILITÉ ==="
-    echo "========================================"
-
-    if [ "$audio_issues" -eq 0 ]; then
-        echo "✅ FICHIER PARFAITEMENT COMPATIBLE AVEC WHISPER"
-        echo "   → Transcription possible avec qualité OPTIMALE"
-        echo "   → Aucune modification nécessaire"
-        log_action "Analyse audio parfaite : fichier optimal pour Whisper"
-        return 0
-
-    elif [ "$audio_issues" -le 2 ]; then
-        echo "⚠️  FICHIER COMPATIBLE AVEC RÉSERVES ($audio_issues point(s) d'attention)"
-        echo "   → Transcription possible, qualité BONNE à CORRECTE"
-        echo "   → Améliorations recommandées mais optionnelles"
-
-        if [ "${#solutions[@]}" -gt 0 ]; then
-            echo ""
-            echo "💡 SOLUTIONS RECOMMANDÉES POUR OPTIMISER :"
-            for i in "${!solutions[@]}"; do
-                echo "   $((i+1)). ${solutions[$i]}"
-            done
-        fi
-
-        log_action "Analyse audio OK avec réserves : $audio_issues issues, ${#solutions[@]} solutions proposées"
-        return 0
-
-    elif [ "$audio_issues" -le 4 ]; then
-        echo "⚠️  FICHIER PROBLÉMATIQUE ($audio_issues problèmes détectés)"
-        echo "   → Transcription DIFFICILE, qualité DÉGRADÉE probable"
-        echo "   → Corrections FORTEMENT recommandées"
-
-        echo ""
-        echo "🔧 SOLUTIONS OBLIGATOIRES POUR CORRIGER :"
-        for i in "${!solutions[@]}"; do
-            echo "   $((i+1)). ${solutions[$i]}"
-        done
-
-        log_action "Analyse audio problématique : $audio_issues problèmes, corrections nécessaires"
-        return 1
+    local status=0
+    "$ANALYZER_PYTHON" "$ANALYZER_PY" --cache "$ANALYZE_CACHE" "$file" || status=$?
 
+    if [ "$status" -eq 0 ]; then
+        log_action "Analyse audio OK : fichier compatible Whisper"
     else
-        echo "❌ FICHIER INCOMPATIBLE AVEC WHISPER ($audio_issues problèmes critiques)"
-        echo "   → Transcription IMPOSSIBLE en l'état"
-        echo "   → Corrections OBLIGATOIRES avant utilisation"
-
-        echo ""
-        echo "🚨 SOLUTIONS D'URGENCE POUR RENDRE COMPATIBLE :"
-        for i in "${!solutions[@]}"; do
-            echo "   $((i+1)). ${solutions[$i]}"
-        done
-
-        # Ajouter une solution universelle de dernier recours
-        echo "   $((${#solutions[@]}+1)). SOLUTION UNIVERSELLE (dernier recours) :"
-        echo "       ffmpeg -i '$file' -vn -acodec pcm_s16le -ar 16000 -ac 1 '$file.whisper-ready.wav'"
-        echo "       Puis utilisez directement le fichier WAV avec Whisper"
-
-        log_action "Analyse audio critique : fichier incompatible, $audio_issues problèmes"
-        return 1
+        log_action "Analyse audio : fichier problématique ou incompatible (code $status)"
     fi
+    return "$status"
 }
 
 # Fonction --help mise à jour
@@ -422,6 +145,17 @@ OPTIONS FACULTATIVES:
   --threads <n>       Nombre de threads (défaut: auto)
   --output-format <f> Format de sortie (défaut: txt,srt,vtt)
   --analyze           Analyse la compatibilité audio avec solutions détaillées
+  --chunked           Découpe l'audio aux silences et transcrit les segments en parallèle
+  --chunk-max <s>     Durée max d'un segment en mode --chunked (entier > 30, défaut: 300)
+  --workers <n>       Nombre de whisper-cli parallèles en mode --chunked (défaut: cœurs / threads)
+  --no-resident       --folder : un whisper-cli par fichier au lieu du worker résident
+  --port <n>          Port local du worker résident (défaut: 8910)
+  --queue <n>         Fichiers audio pré-extraits d'avance pour le worker résident (défaut: 2)
+  --use-index         Réutilise les transcriptions d'un contenu identique (vidéo renommée, déplacée, copiée)
+                      trouvé dans l'index des médias
+  --fuzzy-index       Comme --use-index, réutilise aussi celles d'un audio quasi identique (empreinte fpcalc
+                      des 120 premières secondes, à vérifier : une même intro suffit à correspondre)
+  --no-index          N'utilise pas l'index des médias : ni consultation, ni enregistrement
   --delete            Supprime tous les fichiers générés
   --help              Affiche cette aide
 
@@ -481,6 +215,9 @@ EXEMPLES D'UTILISATION:
   # Transcription avec modèle spécifique
   $0 --folder "/path/videos" --exec --model large-v3 --lang en
 
+  # Enregistrement long découpé aux silences, 4 workers de 2 threads
+  $0 --file "/path/enregistrement_2h.mp4" --exec --chunked --workers 4 --threads 2
+
   # Supprimer tous les fichiers générés d'un dossier
   $0 --folder "/path/videos" --delete
 
@@ -493,20 +230,39 @@ Génère fichiers .txt, .srt, .vtt dans le même répertoire que les vidéos.
 
 ANALYSE DÉTAILLÉE (--analyze):
 - Détection précise des problèmes audio (codec, fréquence, canaux, débit)
+- Décodage complet en une seule passe, sans fichier WAV temporaire
+- Mesures par fenêtre de 0,5s : RMS, crête/écrêtage, silence, déséquilibre gauche/droite, parole
 - Solutions concrètes avec commandes ffmpeg prêtes à l'emploi
-- Tests de conversion à 3 positions différentes du fichier
 - Diagnostic complet avec verdict de compatibilité Whisper
+- Résultats en cache ($ANALYZE_CACHE) par empreinte : relance immédiate sur fichiers inchangés
+
+TRANSCRIPTION DÉCOUPÉE (--chunked):
+- Détection des silences en une passe (ffmpeg silencedetect)
+- Coupe au milieu du dernier silence avant --chunk-max, coupe forcée avec 1s de recouvrement sinon
+- Segments transcrits simultanément par --workers whisper-cli de --threads threads chacun
+- Assemblage txt/srt/vtt avec timestamps décalés et mots dupliqués retirés aux frontières
 
 TRAITEMENT PAR LOT (--folder):
 - Détection automatique des extensions vidéo supportées
 - Traitement séquentiel de tous les fichiers compatibles
+- Worker résident whisper-server : modèle chargé une seule fois pour tout le dossier,
+  extraction audio des fichiers suivants pendant l'inférence (au plus --queue d'avance)
+- Mesures par fichier (extraction, attente, chargement, inférence) dans $TIMINGS_FILE
+
+INDEX DES MÉDIAS (partagé avec compress_videos.sh, désactivable par --no-index):
+- Empreinte partielle du contenu, taille, durée et empreinte audio (fpcalc si installé)
+- Vidéo renommée, déplacée ou copiée déjà transcrite (même modèle et langue) : transcription copiée
+- Audio quasi identique (réencodage, autre conteneur) : transcription copiée
+- Doublons dans le même dossier : transcrits une seule fois
 - Logs détaillés pour chaque fichier traité
 - Résumé final avec statistiques de réussite/échec
 
 PRÉREQUIS:
 - whisper.cpp compilé dans ./whisper.cpp/build/bin/whisper-cli
+- whisper-server (même build) et curl pour le worker résident en mode --folder
+- python3 pour l'index des médias (../multimedia_tools/media_index.py), fpcalc (chromaprint) optionnel
 - ffmpeg installé (avec ffprobe pour --analyze)
-- bc (calculatrice) pour les calculs de positions temporelles
+- python3 + numpy pour --analyze (virtualenv whisper_env d'install_whisper.sh utilisé s'il existe)
 - Modèles téléchargés dans ./whisper.cpp/models/
 
 EOF
@@ -584,7 +340,7 @@ process_folder() {
 
         if [ "$is_video" = true ]; then
             video_files+=("$file")
-            ((total_files++))
+            total_files=$((total_files + 1))
             echo "   ✅ ACCEPTÉ: $filename (extension .$extension_lower)"
         else
             echo "   ➜ Ignoré (extension non supportée: .$extension_lower)"
@@ -653,6 +409,25 @@ process_folder() {
     local analysis_passed=0
     local analysis_failed=0
 
+    # Worker résident : le modèle est chargé une seule fois pour tout le dossier
+    local use_resident=0
+    local timings_start=$(cat "$TIMINGS_FILE" 2>/dev/null | wc -l)
+    if [ "$execute" -eq 1 ] && [ "$analyze_only" -eq 0 ] && [ "$RESIDENT" != "0" ] && [ "$CHUNKED" -eq 0 ]; then
+        echo ""
+        if [ ! -x "$RESIDENT_BIN" ] || ! command -v curl >/dev/null 2>&1; then
+            echo "ℹ️  Worker résident indisponible ($RESIDENT_BIN ou curl absent), un whisper-cli par fichier"
+        elif start_resident_worker; then
+            use_resident=1
+        else
+            echo "ℹ️  Repli sur un whisper-cli par fichier"
+        fi
+    fi
+
+    local reused=0
+    if [ "$execute" -eq 1 ] && [ "$analyze_only" -eq 0 ]; then
+        index_lookup_files "${video_files[@]}"
+    fi
+
     echo ""
     echo "=== DÉBUT DU TRAITEMENT ==="
 
@@ -669,26 +444,23 @@ process_folder() {
         processed=$((processed + 1))
 
         # Vérification si les fichiers de sortie existent déjà
-        local base_name="${file%.*}"
-        local output_exists=false
-
-        if [[ "$OUTPUT_FORMAT" == *"txt"* ]] && [ -f "${base_name}.txt" ]; then
-            output_exists=true
-        fi
-        if [[ "$OUTPUT_FORMAT" == *"srt"* ]] && [ -f "${base_name}.srt" ]; then
-            output_exists=true
-        fi
-        if [[ "$OUTPUT_FORMAT" == *"vtt"* ]] && [ -f "${base_name}.vtt" ]; then
-            output_exists=true
-        fi
-
-        if [ "$output_exists" = true ] && [ "$execute" -eq 1 ] && [ "$analyze_only" -eq 0 ]; then
+        if outputs_exist "$file" && [ "$execute" -eq 1 ] && [ "$analyze_only" -eq 0 ]; then
             echo "⏭️  Fichiers de transcription déjà présents, passage au suivant..."
             echo "   (Utilisez --delete pour supprimer les fichiers existants)"
+            discard_prefetch "$file"
             skipped=$((skipped + 1))
             continue
         fi
 
+        # Contenu déjà transcrit ailleurs (index des médias) : copie des sorties existantes
+        if [ "$execute" -eq 1 ] && [ "$analyze_only" -eq 0 ] && [[ "${INDEX_STATUS[$file]:-new}" =~ ^(found|similar|batchdup)$ ]]; then
+            if reuse_transcript "$file"; then
+                discard_prefetch "$file"
+                reused=$((reused + 1))
+                continue
+            fi
+        fi
+
         # Phase d'analyse
         if [ "$analyze_only" -eq 1 ] || ([ "$ANALYZE" -eq 1 ] && [ "$execute" -eq 1 ]); then
             echo "🔍 ANALYSE DE COMPATIBILITÉ AUDIO..."
@@ -708,6 +480,7 @@ process_folder() {
                 # En mode analyse + exec, arrêter le traitement de ce fichier si analyse échoue
                 if [ "$execute" -eq 1 ]; then
                     echo "⏭️  Transcription annulée pour ce fichier à cause des problèmes détectés"
+                    discard_prefetch "$file"
                     failed=$((failed + 1))
                     continue
                 else
@@ -722,8 +495,15 @@ process_folder() {
             echo ""
             echo "🎙️  LANCEMENT DE LA TRANSCRIPTION..."
 
-            if process_single_file "$file"; then
+            local transcribe_ok=0
+            if [ "$use_resident" -eq 1 ]; then
+                resident_transcribe "$file" "${video_files[@]:$((i + 1))}" || transcribe_ok=1
+            else
+                process_single_file "$file" || transcribe_ok=1
+            fi
+            if [ "$transcribe_ok" -eq 0 ]; then
                 successful=$((successful + 1))
+                index_record_transcript "$file"
                 echo "✅ Transcription réussie pour : $basename"
             else
                 failed=$((failed + 1))
@@ -749,12 +529,19 @@ process_folder() {
         echo "   • Transcriptions réussies : $successful"
         echo "   • Transcriptions échouées : $failed"
         echo "   • Fichiers ignorés (déjà traités) : $skipped"
+        echo "   • Transcriptions réutilisées (index) : $reused"
 
         local success_rate=0
         if [ "$processed" -gt 0 ]; then
-            success_rate=$(( (successful * 100) / processed ))
+            success_rate=$(( ((successful + reused) * 100) / processed ))
         fi
         echo "   • Taux de réussite : ${success_rate}%"
+        print_timing_summary "$timings_start"
+        echo "   • Mesures détaillées : $TIMINGS_FILE"
+    fi
+
+    if [ "$use_resident" -eq 1 ]; then
+        stop_resident_worker
     fi
 
     echo ""
@@ -771,6 +558,487 @@ process_folder() {
     return 0
 }
 
+# === MODE --chunked : découpage aux silences + transcription parallèle ===
+
+# Durée (s) d'un WAV PCM 16 bits 16kHz mono produit par process_single_file
+wav_duration() {
+    local size=$(stat -c%s "$1" 2>/dev/null || stat -f%z "$1" 2>/dev/null || echo "44")
+    awk -v s="$size" 'BEGIN { d = (s - 44) / 32000; if (d < 0) d = 0; printf "%.3f\n", d }'
+}
+
+# Liste des silences "début<TAB>fin" détectés par ffmpeg silencedetect (un seul décodage)
+detect_silences() {
+    local wav="$1"
+    ffmpeg -hide_banner -nostats -i "$wav" -af "silencedetect=noise=${SILENCE_NOISE}:d=${SILENCE_MIN_DUR}" -f null - 2>&1 \
+        | awk '/silence_start:/ { for (i = 1; i <= NF; i++) if ($i == "silence_start:") s = $(i+1) }
+               /silence_end:/   { for (i = 1; i <= NF; i++) if ($i == "silence_end:") print s "\t" $(i+1) }'
+}
+
+# Plan de découpe : "index<TAB>début<TAB>fin<TAB>type" où type = silence|force|end
+# Coupe au milieu du dernier silence situé dans ]début+CHUNK_MIN, début+CHUNK_MAX],
+# sinon coupe forcée à CHUNK_MAX avec CHUNK_OVERLAP secondes de recouvrement.
+plan_chunks() {
+    local silences_file="$1"
+    local total="$2"
+    awk -F'\t' -v total="$total" -v max="$CHUNK_MAX" -v min="$CHUNK_MIN" -v overlap="$CHUNK_OVERLAP" '
+        { mid[++n] = ($1 + $2) / 2 }
+        END {
+            pos = 0; idx = 0; type = "start"
+            while (total - pos > max) {
+                limit = pos + max; cut = -1
+                for (i = 1; i <= n; i++) if (mid[i] > pos + min && mid[i] <= limit) cut = mid[i]
+                if (cut > 0) { next_pos = cut; next_type = "silence" }
+                else { cut = limit; next_pos = cut - overlap; next_type = "force" }
+                printf "%04d\t%.3f\t%.3f\t%s\n", idx++, pos, cut, type
+                pos = next_pos; type = next_type
+            }
+            printf "%04d\t%.3f\t%.3f\t%s\n", idx, pos, total, type
+        }' "$silences_file"
+}
+
+# Job d'un worker : extraction du segment puis whisper-cli en sortie SRT seule
+run_chunk_job() {
+    local wav="$1" prefix="$2" start="$3" end="$4" threads="$5"
+    ffmpeg -y -v error -i "$wav" -ss "$start" -to "$end" -c copy "$prefix.wav" >"$prefix.log" 2>&1 || return 1
+    "$WHISPER_BIN" -m "$MODEL_FILE" -f "$prefix.wav" -l "$LANG" --suppress-nst -t "$threads" -osrt -of "$prefix" >>"$prefix.log" 2>&1 || return 1
+    rm -f "$prefix.wav"
+    : > "$prefix.done"
+}
+
+# Conversion d'un SRT de segment en TSV "chunk<TAB>type<TAB>début_ms<TAB>fin_ms<TAB>texte" décalé de offset
+srt_to_tsv() {
+    local srt="$1" chunk="$2" type="$3" offset="$4"
+    awk -v chunk="$chunk" -v type="$type" -v off="$offset" '
+        function ms(t,   p) { split(t, p, /[:,.]/); return ((p[1] * 60 + p[2]) * 60 + p[3]) * 1000 + p[4] }
+        BEGIN { RS = ""; FS = "\n"; off_ms = int(off * 1000 + 0.5) }
+        {
+            for (l = 1; l <= NF && $l !~ /-->/; l++) ;
+            if (l > NF) next
+            split($l, t, / --> /)
+            text = ""
+            for (j = l + 1; j <= NF; j++) text = text " " $j
+            gsub(/[ \t\r]+/, " ", text); sub(/^ /, "", text); sub(/ $/, "", text)
+            if (text == "") next
+            printf "%s\t%s\t%d\t%d\t%s\n", chunk, type, ms(t[1]) + off_ms, ms(t[2]) + off_ms, text
+        }' "$srt"
+}
+
+# Suppression des mots dupliqués aux frontières des coupes forcées (CHUNK_OVERLAP secondes
+# transcrites deux fois) : le plus long préfixe du premier segment du chunk égal à la fin du
+# segment précédent est retiré. Les coupes au silence n'ont pas de recouvrement : une
+# répétition de part et d'autre (« oui oui » / « oui oui ») est réelle et conservée.
+dedup_boundaries() {
+    awk -F'\t' -v OFS='\t' -v maxw="$CHUNK_DEDUP_WORDS" '
+        function norm(w) { w = tolower(w); gsub(/[[:punct:]]/, "", w); return w }
+        {
+            chunk = $1; type = $2; start = $3; end = $4; text = $5
+            if (chunk != prev_chunk && prev_text != "" && type == "force") {
+                n = split(text, cw, " "); pn = split(prev_text, pw, " ")
+                k = maxw; if (k > n) k = n; if (k > pn) k = pn
+                for (; k >= 1; k--) {
+                    same = 1
+                    for (i = 1; i <= k; i++) if (norm(pw[pn - k + i]) != norm(cw[i])) { same = 0; break }
+                    if (same) break
+                }
+                if (k >= 1) {
+                    text = ""
+                    for (i = k + 1; i <= n; i++) text = text (text == "" ? "" : " ") cw[i]
+                    dropped += k
+                }
+                prev_chunk = chunk
+                if (text == "") next
+            }
+            prev_chunk = chunk
+            if (start < prev_end) start = prev_end
+            if (end < start) end = start
+            print start, end, text
+            prev_text = text; prev_end = end
+        }
+        END { if (dropped > 0) printf "%d mot(s) dupliqué(s) retiré(s) aux frontières\n", dropped > "/dev/stderr" }'
+}
+
+# Écriture des sorties txt/srt/vtt depuis le TSV assemblé "début_ms<TAB>fin_ms<TAB>texte"
+write_stitched_outputs() {
+    local tsv="$1" base_name="$2"
+    local fmt_awk='function ts(ms, sep) { return sprintf("%02d:%02d:%02d%s%03d", int(ms / 3600000), int(ms / 60000) % 60, int(ms / 1000) % 60, sep, ms % 1000) }'
+    if [[ "$OUTPUT_FORMAT" == *"txt"* ]]; then
+        cut -f3 "$tsv" > "${base_name}.txt"
+    fi
+    if [[ "$OUTPUT_FORMAT" == *"srt"* ]]; then
+        awk -F'\t' "$fmt_awk"' { printf "%d\n%s --> %s\n%s\n\n", NR, ts($1, ","), ts($2, ","), $3 }' "$tsv" > "${base_name}.srt"
+    fi
+    if [[ "$OUTPUT_FORMAT" == *"vtt"* ]]; then
+        awk -F'\t' "$fmt_awk"' BEGIN { print "WEBVTT\n" } { printf "%s --> %s\n%s\n\n", ts($1, "."), ts($2, "."), $3 }' "$tsv" > "${base_name}.vtt"
+    fi
+}
+
+# Transcription découpée : silences → plan → N workers whisper-cli → assemblage
+transcribe_chunked() {
+    local audio_wav="$1"
+    local base_name="$2"
+    local t_start=$(date +%s)
+
+    local cores=$(nproc 2>/dev/null || echo 4)
+    local threads_per_worker="${THREADS:-4}"
+    if [ "$threads_per_worker" -gt "$cores" ]; then
+        threads_per_worker="$cores"
+    fi
+    local workers="${CHUNK_WORKERS:-$((cores / threads_per_worker))}"
+    if [ "$workers" -lt 1 ]; then
+        workers=1
+    fi
+
+    local work_dir
+    work_dir=$(mktemp -d "${TMPDIR:-/tmp}/transcribe_chunks.XXXXXX")
+
+    local total=$(wav_duration "$audio_wav")
+    echo "   Détection des silences (${SILENCE_NOISE}, ≥${SILENCE_MIN_DUR}s) sur ${total}s d'audio..."
+    detect_silences "$audio_wav" > "$work_dir/silences.tsv"
+    plan_chunks "$work_dir/silences.tsv" "$total" > "$work_dir/plan.tsv"
+
+    local nb_chunks=$(wc -l < "$work_dir/plan.tsv")
+    local nb_silences=$(wc -l < "$work_dir/silences.tsv")
+    echo "   $nb_silences silence(s) détecté(s) → $nb_chunks segment(s) de ≤${CHUNK_MAX}s, $workers worker(s) × $threads_per_worker thread(s)"
+    log_action "Découpage '$audio_wav' : $nb_chunks segments, $workers workers × $threads_per_worker threads"
+
+    local idx start end type
+    while IFS=$'\t' read -r idx start end type; do
+        while [ "$(jobs -rp | wc -l)" -ge "$workers" ]; do
+            wait -n || true
+        done
+        echo "   [$((10#$idx + 1))/$nb_chunks] Segment ${start}s → ${end}s ($type)"
+        run_chunk_job "$audio_wav" "$work_dir/chunk_$idx" "$start" "$end" "$threads_per_worker" &
+    done < "$work_dir/plan.tsv"
+    wait || true
+
+    # Vérification : tous les segments doivent être transcrits
+    local failed_chunks=0
+    while IFS=$'\t' read -r idx start end type; do
+        if [ ! -f "$work_dir/chunk_$idx.done" ] || [ ! -f "$work_dir/chunk_$idx.srt" ]; then
+            echo "   ❌ Segment $idx (${start}s → ${end}s) en échec, voir $work_dir/chunk_$idx.log"
+            failed_chunks=$((failed_chunks + 1))
+        fi
+    done < "$work_dir/plan.tsv"
+    if [ "$failed_chunks" -gt 0 ]; then
+        log_action "Transcription découpée en échec : $failed_chunks segment(s), logs conservés dans $work_dir"
+        return 1
+    fi
+
+    # Assemblage dans l'ordre avec décalage des timestamps
+    while IFS=$'\t' read -r idx start end type; do
+        srt_to_tsv "$work_dir/chunk_$idx.srt" "$idx" "$type" "$start"
+    done < "$work_dir/plan.tsv" | dedup_boundaries > "$work_dir/stitched.tsv"
+    write_stitched_outputs "$work_dir/stitched.tsv" "$base_name"
+
+    local elapsed=$(( $(date +%s) - t_start ))
+    echo "   Assemblage terminé : $(wc -l < "$work_dir/stitched.tsv") sous-titre(s) en ${elapsed}s (audio ${total}s)"
+    log_action "Transcription découpée terminée : $nb_chunks segments en ${elapsed}s pour ${total}s d'audio"
+    rm -rf "$work_dir"
+    return 0
+}
+
+# === WORKER RÉSIDENT (--folder) : modèle chargé une seule fois dans whisper-server ===
+
+# Horodatage en millisecondes et conversion en secondes pour les mesures de temps
+now_ms() {
+    echo $(( $(date +%s%N) / 1000000 ))
+}
+
+ms_to_s() {
+    awk -v ms="$1" 'BEGIN { printf "%.2f\n", ms / 1000 }'
+}
+
+# Vrai si les fichiers de sortie demandés existent déjà pour cette vidéo
+outputs_exist() {
+    local base_name="${1%.*}"
+    if [[ "$OUTPUT_FORMAT" == *"txt"* ]] && [ -f "${base_name}.txt" ]; then
+        return 0
+    fi
+    if [[ "$OUTPUT_FORMAT" == *"srt"* ]] && [ -f "${base_name}.srt" ]; then
+        return 0
+    fi
+    if [[ "$OUTPUT_FORMAT" == *"vtt"* ]] && [ -f "${base_name}.vtt" ]; then
+        return 0
+    fi
+    return 1
+}
+
+# Ligne du fichier de mesures : chargement du modèle séparé de l'inférence
+record_timing() {
+    local file="$1" mode="$2" audio_s="$3" extract_s="$4" wait_s="$5" load_s="$6" infer_s="$7"
+    if [ ! -f "$TIMINGS_FILE" ]; then
+        printf "date\tfichier\tmode\tmodele\taudio_s\textraction_s\tattente_s\tchargement_s\tinference_s\n" > "$TIMINGS_FILE"
+    fi
+    printf "%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n" "$(date '+%Y-%m-%d %H:%M:%S')" "$file" "$mode" "$MODEL" \
+        "$audio_s" "$extract_s" "$wait_s" "$load_s" "$infer_s" >> "$TIMINGS_FILE"
+}
+
+# Démarre whisper-server et attend que le modèle soit chargé (/health)
+start_resident_worker() {
+    RESIDENT_DIR=$(mktemp -d "${TMPDIR:-/tmp}/transcribe_resident.XXXXXX")
+    local t0=$(now_ms)
+    # Mêmes options de décodage que whisper-cli (process_single_file, run_chunk_job)
+    local server_args=(-m "$MODEL_FILE" -l "$LANG" --suppress-nst --host "$RESIDENT_HOST" --port "$RESIDENT_PORT")
+    if [ -n "$THREADS" ]; then
+        server_args+=(-t "$THREADS")
+    fi
+
+    echo "🧠 Chargement du modèle $MODEL dans le worker résident ($RESIDENT_HOST:$RESIDENT_PORT)..."
+    "$RESIDENT_BIN" "${server_args[@]}" > "$RESIDENT_DIR/server.log" 2>&1 &
+    RESIDENT_PID=$!
+    trap stop_resident_worker EXIT
+
+    local deadline=$(( t0 + RESIDENT_START_TIMEOUT * 1000 ))
+    until curl -sf "http://$RESIDENT_HOST:$RESIDENT_PORT/health" >/dev/null 2>&1; do
+        if ! kill -0 "$RESIDENT_PID" 2>/dev/null || [ "$(now_ms)" -gt "$deadline" ]; then
+            echo "   ❌ Le worker résident n'a pas démarré, extrait de $RESIDENT_DIR/server.log :"
+            tail -n 5 "$RESIDENT_DIR/server.log" 2>/dev/null | sed 's/^/      /'
+            log_action "Échec démarrage worker résident sur le port $RESIDENT_PORT"
+            stop_resident_worker
+            return 1
+        fi
+        sleep 0.2
+    done
+
+    RESIDENT_LOAD_S=$(ms_to_s $(( $(now_ms) - t0 )))
+    RESIDENT_FIRST_JOB=1
+    echo "   ✅ Modèle chargé en ${RESIDENT_LOAD_S}s, réutilisé pour tous les fichiers"
+    log_action "Worker résident prêt (PID $RESIDENT_PID) : modèle $MODEL chargé en ${RESIDENT_LOAD_S}s"
+    return 0
+}
+
+# Arrêt du serveur et des extractions encore en cours, nettoyage des WAV pré-extraits
+stop_resident_worker() {
+    local pid
+    for pid in "${PREFETCH_PID[@]}"; do
+        kill "$pid" 2>/dev/null || true
+    done
+    PREFETCH_PID=()
+    if [ -n "$RESIDENT_PID" ]; then
+        kill "$RESIDENT_PID" 2>/dev/null || true
+        wait "$RESIDENT_PID" 2>/dev/null || true
+        log_action "Arrêt worker résident (PID $RESIDENT_PID)"
+        RESIDENT_PID=""
+    fi
+    if [ -n "$RESIDENT_DIR" ]; then
+        rm -rf "$RESIDENT_DIR"
+        RESIDENT_DIR=""
+    fi
+}
+
+# Chemin du WAV pré-extrait d'une vidéo dans le répertoire du worker
+resident_wav_path() {
+    echo "$RESIDENT_DIR/$(printf '%s' "$1" | md5sum | cut -c1-16).wav"
+}
+
+# Extraction en arrière-plan ; le temps d'extraction est écrit dans <wav>.ms
+prefetch_audio() {
+    local file="$1"
+    local wav=$(resident_wav_path "$file")
+    (
+        t0=$(now_ms)
+        ffmpeg -y -i "$file" -vn -acodec pcm_s16le -ar 16000 -ac 1 "$wav.part.wav" >/dev/null 2>&1 || exit 1
+        mv "$wav.part.wav" "$wav"
+        echo $(( $(now_ms) - t0 )) > "$wav.ms"
+    ) &
+    PREFETCH_PID["$file"]=$!
+}
+
+# Abandon de la pré-extraction d'un fichier qui ne sera pas transcrit : libère sa place dans la file
+discard_prefetch() {
+    local file="$1"
+    local pid="${PREFETCH_PID[$file]:-}"
+    [ -n "$pid" ] || return 0
+    pkill -P "$pid" 2>/dev/null || true
+    kill "$pid" 2>/dev/null || true
+    wait "$pid" 2>/dev/null || true
+    unset 'PREFETCH_PID[$file]'
+    local wav=$(resident_wav_path "$file")
+    rm -f "$wav" "$wav.part.wav" "$wav.ms"
+}
+
+# Transcription d'une vidéo par le worker résident. Les fichiers suivants passés en
+# arguments sont pré-extraits pendant l'inférence, au plus RESIDENT_QUEUE à l'avance :
+# au-delà, l'extraction attend que le worker consomme la file (contre-pression).
+resident_transcribe() {
+    local file="$1"
+    shift
+    local base_name="${file%.*}"
+    local wav=$(resident_wav_path "$file")
+
+    if [ -z "${PREFETCH_PID[$file]:-}" ]; then
+        prefetch_audio "$file"
+    fi
+    local next
+    for next in "$@"; do
+        if [ "${#PREFETCH_PID[@]}" -gt "$RESIDENT_QUEUE" ]; then
+            break
+        fi
+        if [ -z "${PREFETCH_PID[$next]:-}" ] && ! outputs_exist "$next" \
+                && ! [[ "${INDEX_STATUS[$next]:-new}" =~ ^(found|similar|batchdup)$ ]]; then
+            prefetch_audio "$next"
+        fi
+    done
+
+    echo "1. Extraction audio en WAV 16kHz mono (file d'attente: ${#PREFETCH_PID[@]}/$((RESIDENT_QUEUE + 1)))..."
+    local t_wait=$(now_ms)
+    local extract_ok=0
+    wait "${PREFETCH_PID[$file]}" || extract_ok=1
+    unset 'PREFETCH_PID[$file]'
+    local wait_s=$(ms_to_s $(( $(now_ms) - t_wait )))
+    if [ "$extract_ok" -ne 0 ] || [ ! -f "$wav" ]; then
+        echo "❌ Erreur lors de l'extraction audio"
+        rm -f "$wav" "$wav.part.wav" "$wav.ms"
+        return 1
+    fi
+    local extract_s=$(ms_to_s "$(cat "$wav.ms")")
+    local audio_s=$(wav_duration "$wav")
+    log_action "Extraction audio '$file' en ${extract_s}s (attente ${wait_s}s)"
+
+    echo "2. Transcription par le worker résident (modèle: $MODEL déjà chargé, langue: $LANG)..."
+    if ! kill -0 "$RESIDENT_PID" 2>/dev/null; then
+        echo "❌ Le worker résident s'est arrêté, voir $RESIDENT_DIR/server.log"
+        rm -f "$wav" "$wav.ms"
+        return 1
+    fi
+    local t_infer=$(now_ms)
+    if ! curl -sf -H "Expect:" -X POST "http://$RESIDENT_HOST:$RESIDENT_PORT/inference" \
+            -F "file=@$wav" -F "response_format=srt" -F "language=$LANG" -F "temperature=0.0" \
+            -o "$wav.srt"; then
+        echo "❌ Erreur lors de la transcription par le worker résident"
+        rm -f "$wav" "$wav.ms" "$wav.srt"
+        return 1
+    fi
+    local infer_s=$(ms_to_s $(( $(now_ms) - t_infer )))
+
+    srt_to_tsv "$wav.srt" 0 start 0 | cut -f3- > "$wav.tsv"
+    write_stitched_outputs "$wav.tsv" "$base_name"
+
+    # Le coût de chargement est imputé au premier fichier uniquement
+    local load_s="0.00"
+    if [ "$RESIDENT_FIRST_JOB" -eq 1 ]; then
+        load_s="$RESIDENT_LOAD_S"
+        RESIDENT_FIRST_JOB=0
+    fi
+    record_timing "$file" "resident" "$audio_s" "$extract_s" "$wait_s" "$load_s" "$infer_s"
+    echo "   ⏱️  Audio ${audio_s}s : extraction ${extract_s}s, attente ${wait_s}s, inférence ${infer_s}s (chargement ${load_s}s)"
+    log_action "Transcription résidente '$file' : inférence ${infer_s}s pour ${audio_s}s d'audio"
+
+    if [ "$KEEP_AUDIO" -eq 0 ]; then
+        echo "3. Suppression fichier audio temporaire..."
+        rm -f "$wav"
+    else
+        echo "3. Conservation fichier audio (--keep-audio)"
+        mv "$wav" "${base_name}.wav"
+        log_action "Conservation audio '${base_name}.wav'"
+    fi
+    rm -f "$wav.ms" "$wav.srt" "$wav.tsv"
+    return 0
+}
+
+# Résumé des lignes ajoutées au fichier de mesures depuis la ligne skip :
+# chargement payé une fois (worker résident) contre inférence cumulée
+print_timing_summary() {
+    local skip="$1"
+    [ -f "$TIMINGS_FILE" ] || return 0
+    awk -F'\t' -v skip="$skip" '
+        FNR > 1 && FNR > skip {
+            n++; audio += $5; extract += $6; wait += $7; load += $8; infer += $9
+            if ($3 == "resident" && $8 > 0) one_load = $8
+        }
+        END {
+            if (n == 0) exit
+            printf "⏱️  Mesures (%d fichier(s), %.1fs d'\''audio) :\n", n, audio
+            printf "   • Chargement modèle : %.2fs\n", load
+            printf "   • Inférence cumulée : %.2fs (facteur temps réel %.2f)\n", infer, (audio > 0 ? infer / audio : 0)
+            printf "   • Extraction cumulée : %.2fs, attente effective : %.2fs\n", extract, wait
+            if (n > 1 && one_load > 0)
+                printf "   • Rechargements évités : %d × %.2fs ≈ %.2fs\n", n - 1, one_load, (n - 1) * one_load
+        }' "$TIMINGS_FILE"
+}
+
+# === INDEX DES MÉDIAS (partagé avec compress_videos.sh) ===
+
+# Clé des sorties dans l'index : une transcription n'est réutilisable qu'à modèle et langue identiques
+index_params_key() {
+    echo "$MODEL|$LANG"
+}
+
+# Consultation de l'index en un seul appel pour une liste de vidéos (--use-index) : remplit INDEX_STATUS
+# (found/batchdup/new, similar avec --fuzzy-index) et INDEX_REFS (sorties existantes ou premier fichier identique)
+index_lookup_files() {
+    INDEX_STATUS=()
+    INDEX_REFS=()
+    if [ "$USE_INDEX" -eq 0 ] || [ "$INDEX_LOOKUP" -eq 0 ] || ! command -v python3 >/dev/null 2>&1 || [ ! -f "$MEDIA_INDEX_PY" ]; then
+        return 0
+    fi
+    local path status refs fuzzy=()
+    [ "$INDEX_FUZZY" -eq 1 ] && fuzzy=(--fuzzy)
+    while IFS=$'\t' read -r path status refs; do
+        INDEX_STATUS["$path"]="$status"
+        INDEX_REFS["$path"]="$refs"
+    done < <(printf '%s\0' "$@" | python3 "$MEDIA_INDEX_PY" find --pipeline transcribe \
+                --params "$(index_params_key)" "${fuzzy[@]}" --stdin0 2>>"$LOG_FILE")
+    log_action "Index des médias consulté pour $# fichier(s)"
+}
+
+# Copie des transcriptions d'un contenu identique (ou à l'audio quasi identique) vers cette vidéo
+reuse_transcript() {
+    local file="$1"
+    local base_name="${file%.*}"
+    local refs=()
+    if [ "${INDEX_STATUS[$file]:-}" = "batchdup" ]; then
+        local first_base="${INDEX_REFS[$file]%.*}"
+        refs=("${first_base}.txt" "${first_base}.srt" "${first_base}.vtt")
+    else
+        IFS=$'\t' read -r -a refs <<< "${INDEX_REFS[$file]:-}"
+    fi
+
+    local ext ref source copies=()
+    for ext in txt srt vtt; do
+        [[ "$OUTPUT_FORMAT" == *"$ext"* ]] || continue
+        source=""
+        for ref in "${refs[@]}"; do
+            if [ "${ref##*.}" = "$ext" ] && [ -f "$ref" ]; then
+                source="$ref"
+                break
+            fi
+        done
+        if [ -z "$source" ]; then
+            return 1
+        fi
+        copies+=("$source")
+    done
+    for source in "${copies[@]}"; do
+        cp -f "$source" "${base_name}.${source##*.}"
+    done
+    echo "♻️  Transcription réutilisée (${INDEX_STATUS[$file]}) depuis : ${copies[0]%.*}"
+    if [ "${INDEX_STATUS[$file]}" = "similar" ]; then
+        echo "⚠️  Audio seulement proche (--fuzzy-index) : vérifiez la transcription copiée"
+    fi
+    log_action "Transcription réutilisée pour '$file' depuis '${copies[0]%.*}' (${INDEX_STATUS[$file]})"
+    index_record_transcript "$file"
+    return 0
+}
+
+# Enregistrement des transcriptions produites (empreinte audio calculée pour les recherches --fuzzy)
+index_record_transcript() {
+    local file="$1"
+    local base_name="${file%.*}"
+    if [ "$USE_INDEX" -eq 0 ] || ! command -v python3 >/dev/null 2>&1 || [ ! -f "$MEDIA_INDEX_PY" ]; then
+        return 0
+    fi
+    local outputs=() ext
+    for ext in txt srt vtt; do
+        if [[ "$OUTPUT_FORMAT" == *"$ext"* ]] && [ -f "${base_name}.${ext}" ]; then
+            outputs+=("${base_name}.${ext}")
+        fi
+    done
+    [ "${#outputs[@]}" -gt 0 ] || return 0
+    python3 "$MEDIA_INDEX_PY" record --pipeline transcribe --params "$(index_params_key)" --fingerprint \
+        "$file" "${outputs[@]}" 2>>"$LOG_FILE" || log_action "Enregistrement index impossible pour '$file'"
+}
+
 # Fonction de traitement d'un seul fichier (extraite pour réutilisation)
 process_single_file() {
     local file="$1"
@@ -779,39 +1047,63 @@ process_single_file() {
 
     # Extraction audio
     echo "1. Extraction audio en WAV 16kHz mono..."
+    local t_extract=$(now_ms)
     if ! ffmpeg -y -i "$file" -vn -acodec pcm_s16le -ar 16000 -ac 1 "$audio_wav" >/dev/null 2>&1; then
         echo "❌ Erreur lors de l'extraction audio"
         return 1
     fi
+    local extract_s=$(ms_to_s $(( $(now_ms) - t_extract )))
+    local audio_s=$(wav_duration "$audio_wav")
     log_action "Extraction audio vers '$audio_wav'"
 
     # Transcription
     echo "2. Transcription avec whisper.cpp (modèle: $MODEL, langue: $LANG)..."
 
-    # Construction commande whisper avec quotes pour gestion espaces
-    local whisper_cmd="\"$WHISPER_BIN\" -m \"$MODEL_FILE\" -f \"$audio_wav\" -l $LANG --suppress-nst"
+    local t_infer=$(now_ms)
+    if [ "$CHUNKED" -eq 1 ]; then
+        if ! transcribe_chunked "$audio_wav" "$base_name"; then
+            echo "❌ Erreur lors de la transcription découpée"
+            rm -f "$audio_wav" 2>/dev/null
+            return 1
+        fi
+        record_timing "$file" "chunked" "$audio_s" "$extract_s" "0.00" "" "$(ms_to_s $(( $(now_ms) - t_infer )))"
+    else
+        # Construction commande whisper avec quotes pour gestion espaces
+        local whisper_cmd="\"$WHISPER_BIN\" -m \"$MODEL_FILE\" -f \"$audio_wav\" -l $LANG --suppress-nst"
 
-    # Ajout options de sortie selon OUTPUT_FORMAT
-    if [[ "$OUTPUT_FORMAT" == *"txt"* ]]; then
-        whisper_cmd="$whisper_cmd -otxt"
-    fi
-    if [[ "$OUTPUT_FORMAT" == *"srt"* ]]; then
-        whisper_cmd="$whisper_cmd -osrt"
-    fi
-    if [[ "$OUTPUT_FORMAT" == *"vtt"* ]]; then
-        whisper_cmd="$whisper_cmd -ovtt"
-    fi
+        # Ajout options de sortie selon OUTPUT_FORMAT
+        if [[ "$OUTPUT_FORMAT" == *"txt"* ]]; then
+            whisper_cmd="$whisper_cmd -otxt"
+        fi
+        if [[ "$OUTPUT_FORMAT" == *"srt"* ]]; then
+            whisper_cmd="$whisper_cmd -osrt"
+        fi
+        if [[ "$OUTPUT_FORMAT" == *"vtt"* ]]; then
+            whisper_cmd="$whisper_cmd -ovtt"
+        fi
 
-    # Ajout threads si spécifié
-    if [ -n "$THREADS" ]; then
-        whisper_cmd="$whisper_cmd -t $THREADS"
-    fi
+        # Ajout threads si spécifié
+        if [ -n "$THREADS" ]; then
+            whisper_cmd="$whisper_cmd -t $THREADS"
+        fi
 
-    # Exécution avec eval pour gérer les quotes
-    if ! eval $whisper_cmd >/dev/null 2>&1; then
-        echo "❌ Erreur lors de la transcription Whisper"
-        rm -f "$audio_wav" 2>/dev/null
-        return 1
+        # Exécution avec eval pour gérer les quotes ; la sortie est gardée pour
+        # séparer le temps de chargement du modèle de l'inférence (whisper_print_timings)
+        local whisper_log="${audio_wav}.whisper.log"
+        if ! eval $whisper_cmd >"$whisper_log" 2>&1; then
+            echo "❌ Erreur lors de la transcription Whisper"
+            rm -f "$audio_wav" "$whisper_log" 2>/dev/null
+            return 1
+        fi
+        local wall_ms=$(( $(now_ms) - t_infer ))
+        local load_ms=$(awk '/load time =/ { for (i = 1; i <= NF; i++) if ($i == "=") { printf "%d", $(i+1); exit } }' "$whisper_log")
+        load_ms="${load_ms:-0}"
+        if [ "$load_ms" -gt "$wall_ms" ]; then
+            load_ms="$wall_ms"
+        fi
+        rm -f "$whisper_log"
+        record_timing "$file" "cli" "$audio_s" "$extract_s" "0.00" "$(ms_to_s "$load_ms")" "$(ms_to_s $(( wall_ms - load_ms )))"
+        echo "   ⏱️  Audio ${audio_s}s : extraction ${extract_s}s, chargement modèle $(ms_to_s "$load_ms")s, inférence $(ms_to_s $(( wall_ms - load_ms )))s"
     fi
 
     log_action "Transcription terminée avec modèle $MODEL, langue $LANG"
@@ -908,6 +1200,50 @@ delete_files() {
     exit 0
 }
 
+# Vérification prérequis pour --analyze (ffprobe, analyseur, numpy) - définit ANALYZER_PYTHON
+# Vérifiés une fois avant tout fichier : un prérequis manquant ne doit pas passer pour un média incompatible
+check_analyze_prereqs() {
+    if ! command -v ffprobe >/dev/null 2>&1; then
+        echo "❌ ERREUR CRITIQUE : ffprobe requis pour l'analyse"
+        echo "   Installer le paquet ffmpeg : sudo apt install ffmpeg (Ubuntu/Debian) ou brew install ffmpeg (macOS)"
+        exit 1
+    fi
+    if [ ! -f "$ANALYZER_PY" ]; then
+        echo "❌ ERREUR CRITIQUE : analyseur introuvable ($ANALYZER_PY)"
+        exit 1
+    fi
+
+    ANALYZER_PYTHON="python3"
+    if [ -x "$ANALYZER_VENV/bin/python3" ]; then
+        ANALYZER_PYTHON="$ANALYZER_VENV/bin/python3"
+    fi
+    if ! "$ANALYZER_PYTHON" -c 'import numpy' >/dev/null 2>&1; then
+        echo "❌ ERREUR CRITIQUE : numpy requis pour l'analyse (introuvable pour $ANALYZER_PYTHON)"
+        echo "   Lancer install_whisper.sh (whisper_env) ou installer numpy : pip install numpy"
+        exit 1
+    fi
+}
+
+# Vérification prérequis pour transcription (ffmpeg, whisper-cli, modèle) - définit MODEL_FILE
+check_transcription_prereqs() {
+    command -v ffmpeg >/dev/null 2>&1 || { echo "❌ Erreur : ffmpeg requis"; exit 1; }
+
+    if [ ! -x "$WHISPER_BIN" ]; then
+        echo "❌ Erreur : binaire whisper-cli introuvable ($WHISPER_BIN)"
+        echo "Lancez d'abord install_whisper.sh"
+        exit 1
+    fi
+
+    # Vérification modèle
+    MODEL_FILE="$MODELS_DIR/ggml-${MODEL}.bin"
+    if [ ! -f "$MODEL_FILE" ]; then
+        echo "❌ Erreur : modèle '$MODEL_FILE' introuvable"
+        echo "Modèles disponibles dans $MODELS_DIR :"
+        ls -1 "$MODELS_DIR"/*.bin 2>/dev/null || echo "Aucun modèle trouvé"
+        exit 1
+    fi
+}
+
 # Parse arguments mis à jour
 if [ $# -eq 0 ]; then
     show_help
@@ -923,6 +1259,11 @@ LANG="fr"
 KEEP_AUDIO=0
 THREADS=""
 OUTPUT_FORMAT="txt,srt,vtt"
+CHUNKED=0
+RESIDENT=1
+USE_INDEX=1
+INDEX_LOOKUP=0
+INDEX_FUZZY=0
 
 while [[ "$#" -gt 0 ]]; do
     case "$1" in
@@ -935,6 +1276,15 @@ while [[ "$#" -gt 0 ]]; do
         --keep-audio) KEEP_AUDIO=1; shift ;;
         --threads) THREADS="$2"; shift 2 ;;
         --output-format) OUTPUT_FORMAT="$2"; shift 2 ;;
+        --chunked) CHUNKED=1; shift ;;
+        --chunk-max) CHUNK_MAX="$2"; shift 2 ;;
+        --workers) CHUNK_WORKERS="$2"; shift 2 ;;
+        --no-resident) RESIDENT=0; shift ;;
+        --port) RESIDENT_PORT="$2"; shift 2 ;;
+        --queue) RESIDENT_QUEUE="$2"; shift 2 ;;
+        --use-index) INDEX_LOOKUP=1; shift ;;
+        --fuzzy-index) INDEX_LOOKUP=1; INDEX_FUZZY=1; shift ;;
+        --no-index) USE_INDEX=0; shift ;;
         --delete)
             if [ -n "$FILE" ]; then
                 delete_files "$FILE"
@@ -963,6 +1313,16 @@ if [ -n "$FILE" ] && [ -n "$FOLDER" ]; then
     exit 1
 fi
 
+# Découpage : une coupe forcée avance de CHUNK_MAX - CHUNK_OVERLAP, qui doit rester positif
+if ! [[ "$CHUNK_MAX" =~ ^[0-9]+$ ]] || [ "$CHUNK_MAX" -le "$CHUNK_OVERLAP" ] || [ "$CHUNK_MAX" -le "$CHUNK_MIN" ]; then
+    echo "❌ Erreur : --chunk-max doit être un entier (secondes) > $CHUNK_MIN (durée min d'un segment)"
+    exit 1
+fi
+if [ -n "$CHUNK_WORKERS" ] && { ! [[ "$CHUNK_WORKERS" =~ ^[0-9]+$ ]] || [ "$CHUNK_WORKERS" -lt 1 ]; }; then
+    echo "❌ Erreur : --workers doit être un entier >= 1"
+    exit 1
+fi
+
 # Vérification existence fichier/dossier
 if [ -n "$FILE" ] && [ ! -f "$FILE" ]; then
     echo "❌ Erreur : fichier '$FILE' introuvable"
@@ -974,8 +1334,15 @@ if [ -n "$FOLDER" ] && [ ! -d "$FOLDER" ]; then
     exit 1
 fi
 
+if [ "$ANALYZE" -eq 1 ]; then
+    check_analyze_prereqs
+fi
+
 # Mode dossier
 if [ -n "$FOLDER" ]; then
+    if [ "$EXECUTE" -eq 1 ]; then
+        check_transcription_prereqs
+    fi
     if [ "$ANALYZE" -eq 1 ] && [ "$EXECUTE" -eq 0 ]; then
         # Mode analyse seule du dossier
         process_folder "$FOLDER" 1 0
@@ -1021,22 +1388,7 @@ if [ "$ANALYZE" -eq 1 ]; then
 fi
 
 # Vérification prérequis pour transcription
-command -v ffmpeg >/dev/null 2>&1 || { echo "❌ Erreur : ffmpeg requis"; exit 1; }
-
-if [ ! -x "$WHISPER_BIN" ]; then
-    echo "❌ Erreur : binaire whisper-cli introuvable ($WHISPER_BIN)"
-    echo "Lancez d'abord install_whisper.sh"
-    exit 1
-fi
-
-# Vérification modèle
-MODEL_FILE="$MODELS_DIR/ggml-${MODEL}.bin"
-if [ ! -f "$MODEL_FILE" ]; then
-    echo "❌ Erreur : modèle '$MODEL_FILE' introuvable"
-    echo "Modèles disponibles dans $MODELS_DIR :"
-    ls -1 "$MODELS_DIR"/*.bin 2>/dev/null || echo "Aucun modèle trouvé"
-    exit 1
-fi
+check_transcription_prereqs
 
 log_action "Début transcription fichier '$FILE' avec modèle $MODEL, langue $LANG"
 
@@ -1047,11 +1399,22 @@ if [ "$EXECUTE" -eq 0 ]; then
     if [ -n "$THREADS" ]; then
         echo "  avec $THREADS threads"
     fi
+    if [ "$CHUNKED" -eq 1 ]; then
+        echo "  en mode découpé : segments de ≤${CHUNK_MAX}s, ${CHUNK_WORKERS:-auto} worker(s)"
+    fi
+    exit 0
+fi
+
+# Contenu déjà transcrit (index des médias) : copie des sorties existantes
+index_lookup_files "$FILE"
+if [[ "${INDEX_STATUS[$FILE]:-new}" =~ ^(found|similar)$ ]] && reuse_transcript "$FILE"; then
+    show_actions
     exit 0
 fi
 
 # Traitement du fichier unique
 if process_single_file "$FILE"; then
+    index_record_transcript "$FILE"
     # Variables fichiers pour affichage final
     BASE_NAME="${FILE%.*}"
 
@@ -1076,6 +1439,9 @@ if process_single_file "$FILE"; then
     echo "  - Modèle : $MODEL"
     echo "  - Langue : $LANG"
     echo "  - Threads : ${THREADS:-auto}"
+    if [ "$CHUNKED" -eq 1 ]; then
+        echo "  - Découpage : segments ≤${CHUNK_MAX}s, workers ${CHUNK_WORKERS:-auto}"
+    fi
     echo "  - Formats : $OUTPUT_FORMAT"
 
     show_actions